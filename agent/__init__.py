@@ -2,8 +2,10 @@
 
 Exports:
 - run: start the multi-turn conversational REPL with tool-calling.
+- run_async_repl: the same REPL on the asyncio client with async tools.
 """
 
 from .runner import run  # noqa: F401
+from .async_runner import run_async_repl  # noqa: F401
 
 
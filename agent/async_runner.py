@@ -0,0 +1,99 @@
+"""Asyncio flavour of the agent loop.
+
+Uses the async google-genai chat (`client.aio.chats`) together with the
+coroutine tools from `tools.aio`, so one event loop can drive many
+conversations at once: while one conversation waits on the model or on a
+tool's storage I/O (offloaded to the tool thread pool) the others proceed.
+Function calls are dispatched by `DISPATCHER`, so calls the model emits in
+one response are awaited concurrently.
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from agent.dispatch import ToolDispatcher, asend_message, manual_config
+from agent.gemini_client import create_client
+from agent.router import aanswer as fast_path_answer
+from agent.logging_config import init_logging
+from agent.runner import WELCOME, print_stream_event
+from agent.streaming import astream_turn
+from agent.system_prompt import SYSTEM_PROMPT
+from google.genai import errors, types
+from tools._metrics import start_periodic_dump
+from tools.aio import ASYNC_TOOLS
+
+
+DISPATCHER = ToolDispatcher(ASYNC_TOOLS)
+
+
+def build_async_config() -> types.GenerateContentConfig:
+    """Per-turn config declaring the coroutine tools; `DISPATCHER` executes their calls."""
+    return manual_config(
+        types.GenerateContentConfig(
+            tools=list(ASYNC_TOOLS),
+            system_instruction=SYSTEM_PROMPT,
+        )
+    )
+
+
+def response_text(resp: Any) -> str:
+    """Final text of a model response, or a JSON view when there is none."""
+    try:
+        return resp.text  # type: ignore[attr-defined]
+    except Exception:
+        return json.dumps(resp.to_dict() if hasattr(resp, "to_dict") else str(resp))
+
+
+async def send_turn(chat: Any, message: str, config: types.GenerateContentConfig) -> str:
+    """Send one user turn on an async chat and return the reply text.
+
+    Errors are returned as bracketed text, like the sync REPL prints them,
+    so one failing conversation never takes down the others. Requests
+    `agent.router` recognizes are answered without the model.
+    """
+    try:
+        reply = await fast_path_answer(chat, message, DISPATCHER)
+        if reply is not None:
+            return reply
+        resp = await asend_message(chat, message, config, DISPATCHER)
+    except errors.APIError as e:
+        return f"[APIError] {getattr(e, 'message', str(e))}"
+    except Exception as e:
+        return f"[Error] {e}"
+    return response_text(resp)
+
+
+async def run_async(stream: bool = False) -> None:
+    """Async REPL: same behaviour as `run`, driven by an event loop."""
+    print(WELCOME)
+    init_logging()
+    start_periodic_dump()
+    client = create_client()
+    chat = client.start_async_chat()
+    config = build_async_config()
+
+    while True:
+        try:
+            # input() blocks, so read the terminal off the event loop
+            user = (await asyncio.to_thread(input, "> ")).strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if user.lower() in {"exit", "quit"}:
+            break
+        if not user:
+            continue
+        if stream:
+            async for event in astream_turn(chat, user, config, DISPATCHER):
+                print_stream_event(event)
+            continue
+        print(await send_turn(chat, user, config))
+
+
+def run_async_repl(stream: bool = False) -> None:
+    """Blocking entry point for `python main.py repl --async`."""
+    try:
+        asyncio.run(run_async(stream))
+    except KeyboardInterrupt:
+        print()
@@ -0,0 +1,181 @@
+"""Manual function-call dispatch with parallel execution.
+
+The SDK's automatic function calling runs the calls of one model response
+one after another. Here automatic calling is disabled (`manual_config`) and
+the runner dispatches the calls itself: every call the model emitted in the
+same response runs concurrently (on the shared tool thread pool, or as
+concurrent coroutines for async tools) and all function responses are sent
+back together in one message, in call order.
+
+A user turn gets at most `MAX_TOOL_ROUNDS` rounds of tool calls. Calls the
+model makes after that are not run: each is answered with a "tool round
+limit reached" error and the model is asked once more, with function
+calling off, to reply in text, so the chat's history never ends on an
+unanswered function call.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from agent import history
+from google.genai import types
+from tools import _metrics
+from tools.aio import executor, run_blocking
+
+
+# Same cap the SDK applies to automatic function calling per user turn.
+MAX_TOOL_ROUNDS = 10
+ROUND_LIMIT_ERROR = f"Tool round limit reached ({MAX_TOOL_ROUNDS} rounds per turn); the call was not run."
+
+logger = logging.getLogger(__name__)
+
+
+def manual_config(config: types.GenerateContentConfig) -> types.GenerateContentConfig:
+    """Copy of `config` with automatic function calling turned off."""
+    return config.model_copy(
+        update={"automatic_function_calling": types.AutomaticFunctionCallingConfig(disable=True)}
+    )
+
+
+class ToolRoundLimitError(RuntimeError):
+    """The model kept calling tools after the round limit, with function calling off."""
+
+
+def final_config(config: types.GenerateContentConfig) -> types.GenerateContentConfig:
+    """Copy of `config` that lets the model answer only in text (function calling mode NONE)."""
+    return config.model_copy(
+        update={"tool_config": types.ToolConfig(
+            function_calling_config=types.FunctionCallingConfig(mode=types.FunctionCallingConfigMode.NONE)
+        )}
+    )
+
+
+def refuse(calls: List[types.FunctionCall]) -> List[types.Part]:
+    """Error responses for calls past the round limit; the tools are not run."""
+    logger.warning("Tool round limit reached; not running %s", ", ".join(str(c.name) for c in calls))
+    return [_response_part(call, {"error": ROUND_LIMIT_ERROR}) for call in calls]
+
+
+def check_answered(resp: Any) -> Any:
+    """`resp` if it has no function calls; raises ToolRoundLimitError otherwise."""
+    if resp.function_calls:
+        raise ToolRoundLimitError(f"model still called tools after {MAX_TOOL_ROUNDS} rounds with function calling off")
+    return resp
+
+
+def _coerce_numbers(value: Any) -> Any:
+    # JSON numbers arrive as floats; integral ones are meant as ints (e.g. limit=5).
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _coerce_numbers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_coerce_numbers(v) for v in value]
+    return value
+
+
+def _response_part(call: types.FunctionCall, response: Dict[str, Any]) -> types.Part:
+    return types.Part(function_response=types.FunctionResponse(id=call.id, name=call.name, response=response))
+
+
+class ToolDispatcher:
+    """Executes a response's function calls concurrently and builds the reply parts."""
+
+    def __init__(self, functions: Iterable[Callable[..., Any]]) -> None:
+        self._functions: Dict[str, Callable[..., Any]] = {f.__name__: f for f in functions}
+
+    def _invoke(self, call: types.FunctionCall) -> Dict[str, Any]:
+        func = self._functions.get(call.name or "")
+        if func is None:
+            return {"error": f"Unknown function {call.name!r}"}
+        try:
+            return {"result": func(**_coerce_numbers(call.args or {}))}
+        except Exception as e:
+            logger.warning("Tool %s failed: %s", call.name, e)
+            return {"error": str(e)}
+
+    def run(self, calls: List[types.FunctionCall]) -> List[types.Part]:
+        """Run sync tools for one model response; results keep call order."""
+        if len(calls) == 1:
+            return [_response_part(calls[0], self._invoke(calls[0]))]
+        pool = executor()
+        # Each call gets the caller's contextvars (e.g. the tool progress listener).
+        futures = [pool.submit(contextvars.copy_context().run, self._invoke, call) for call in calls]
+        return [_response_part(call, future.result()) for call, future in zip(calls, futures)]
+
+    async def _ainvoke(self, call: types.FunctionCall) -> Dict[str, Any]:
+        func = self._functions.get(call.name or "")
+        if func is None or not inspect.iscoroutinefunction(func):
+            return await run_blocking(self._invoke, call)
+        try:
+            return {"result": await func(**_coerce_numbers(call.args or {}))}
+        except Exception as e:
+            logger.warning("Tool %s failed: %s", call.name, e)
+            return {"error": str(e)}
+
+    async def arun(self, calls: List[types.FunctionCall]) -> List[types.Part]:
+        """Async counterpart of `run`: all calls are awaited concurrently."""
+        results = await asyncio.gather(*(self._ainvoke(call) for call in calls))
+        return [_response_part(call, result) for call, result in zip(calls, results)]
+
+
+def _send(chat: Any, message: Any, config: types.GenerateContentConfig) -> Any:
+    started = time.perf_counter()
+    try:
+        resp = chat.send_message(message, config=config)
+    except Exception:
+        _metrics.record_model("send", time.perf_counter() - started, False)
+        raise
+    _metrics.record_model("send", time.perf_counter() - started, True, getattr(resp, "usage_metadata", None))
+    return resp
+
+
+async def _asend(chat: Any, message: Any, config: types.GenerateContentConfig) -> Any:
+    started = time.perf_counter()
+    try:
+        resp = await chat.send_message(message, config=config)
+    except Exception:
+        _metrics.record_model("send", time.perf_counter() - started, False)
+        raise
+    _metrics.record_model("send", time.perf_counter() - started, True, getattr(resp, "usage_metadata", None))
+    return resp
+
+
+def send_message(chat: Any, message: Any, config: types.GenerateContentConfig, dispatcher: ToolDispatcher) -> Any:
+    """`chat.send_message` that resolves function calls via `dispatcher`.
+
+    `config` must have automatic function calling disabled (`manual_config`).
+    A new user message first compacts the chat's history (`agent.history`).
+    Returns the final response (the model's answer after all tool rounds),
+    which never has pending function calls.
+    """
+    if isinstance(message, str):
+        history.compact(chat)
+    resp = _send(chat, message, config)
+    for _ in range(MAX_TOOL_ROUNDS):
+        calls: Optional[List[types.FunctionCall]] = resp.function_calls
+        if not calls:
+            return resp
+        resp = _send(chat, dispatcher.run(calls), config)
+    if resp.function_calls:
+        resp = _send(chat, refuse(resp.function_calls), final_config(config))
+    return check_answered(resp)
+
+
+async def asend_message(chat: Any, message: Any, config: types.GenerateContentConfig, dispatcher: ToolDispatcher) -> Any:
+    """Async counterpart of `send_message` for `client.aio` chats."""
+    if isinstance(message, str):
+        history.compact(chat)
+    resp = await _asend(chat, message, config)
+    for _ in range(MAX_TOOL_ROUNDS):
+        calls: Optional[List[types.FunctionCall]] = resp.function_calls
+        if not calls:
+            return resp
+        resp = await _asend(chat, await dispatcher.arun(calls), config)
+    if resp.function_calls:
+        resp = await _asend(chat, refuse(resp.function_calls), final_config(config))
+    return check_answered(resp)
@@ -28,4 +28,25 @@ class GeminiClient:
         # A chat keeps context across turns so the model can remember prior messages
         return self._client.chats.create(model=self._model_name)
 
+    def start_async_chat(self) -> Any:
+        """Start a multi-turn chat on the asyncio client (`await chat.send_message(...)`)."""
+        # The aio client shares the connection settings but never blocks the event loop
+        return self._client.aio.chats.create(model=self._model_name)
 
+
+def create_client() -> Any:
+    """`GeminiClient`, or an offline `ReplayGeminiClient` when `SHOPTALK_REPLAY_SCRIPT` is set.
+
+    `SHOPTALK_REPLAY_SCRIPT` is a script path (see `agent.replay_client`) or
+    `default` for the built-in one; `SHOPTALK_REPLAY_LATENCY_MS` simulates the
+    model round trip.
+    """
+    script = os.getenv("SHOPTALK_REPLAY_SCRIPT", "").strip()
+    if not script:
+        return GeminiClient()
+    from agent.replay_client import ReplayGeminiClient, load_script
+
+    return ReplayGeminiClient(
+        None if script == "default" else load_script(script),
+        latency_s=float(os.getenv("SHOPTALK_REPLAY_LATENCY_MS", "0")) / 1000,
+    )
@@ -0,0 +1,289 @@
+"""Token-bounded chat history.
+
+A chat resends its whole curated history with every request, tool
+responses included, so each turn of a long session costs more than the
+last. `compact(chat)` runs before every user turn (`send_message`,
+`stream_turn` and their async counterparts). It estimates the history's
+size (4 characters per token, as `agent.replay_client` does) and, once it
+exceeds `SHOPTALK_HISTORY_TOKENS`, shrinks it in place:
+
+1. Tool responses older than the last `SHOPTALK_HISTORY_KEEP_TURNS` turns
+   are elided to a digest of their ids, SKUs, names and prices. Responses of
+   `FACT_TOOLS` (estimates, stock, reservations, orders, destinations) are
+   kept as they are.
+2. If that is not enough, the oldest turns are dropped. Their fact-tool
+   results and the user's questions move into a short summary at the start
+   of the first remaining user message, so a pending cart, estimate or
+   reservation survives.
+
+The SDK chat also keeps a comprehensive history (every turn, including
+ones the model answered invalidly) that is never sent but would otherwise
+grow for the chat's lifetime. `compact` makes it a copy of the curated one
+after every turn, so both stay bounded; invalid turns are dropped.
+
+The last turns are never touched, so the budget is a soft bound: a single
+recent turn can exceed it. Every turn's report (history tokens before and
+after, what was elided or dropped) is logged, counted in `tools._metrics`
+and returned; streamed turns add `historyTokens`/`savedTokens` to their
+`done` event.
+"""
+
+import json
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai import types
+from tools import _metrics
+
+
+BUDGET_TOKENS = int(os.getenv("SHOPTALK_HISTORY_TOKENS", "8000"))
+KEEP_TURNS = max(1, int(os.getenv("SHOPTALK_HISTORY_KEEP_TURNS", "2")))
+
+# Tools whose results describe the state of the user's cart or order, kept verbatim or summarized.
+FACT_TOOLS = frozenset({
+    "check_inventory",
+    "check_inventory_many",
+    "estimate_price",
+    "estimate_price_many",
+    "reserve_stock",
+    "create_order",
+    "get_order_status",
+    "validate_destination",
+    "validate_sku",
+    "get_price_for_sku",
+})
+
+SUMMARY_HEADER = "[Earlier in this conversation]"
+# Bounds on what the summary carries forward, so it cannot grow without limit.
+_MAX_FACTS = 20
+_MAX_QUESTIONS = 5
+_DIGEST_KEYS = frozenset({
+    "id", "sku", "name", "category", "listPrice", "unitPriceCents", "minPrice", "maxPrice", "currency",
+    "representativeSku", "representativePrice", "stock", "availability", "total", "error",
+})
+_DIGEST_ITEMS = 10
+_TEXT_CHARS = 200
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(content: types.Content) -> int:
+    return len(content.model_dump_json(exclude_none=True)) // 4
+
+
+def _digest(value: Any, depth: int = 0) -> Any:
+    """Identifying fields of a tool result (ids, SKUs, names, prices); None when nothing is left."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                if depth < 3:
+                    item = _digest(item, depth + 1)
+                    if item:
+                        out[key] = item
+            elif key in _DIGEST_KEYS:
+                out[key] = item
+        return out or None
+    if isinstance(value, list):
+        items = [d for d in (_digest(v, depth + 1) for v in value[:_DIGEST_ITEMS]) if d is not None]
+        if len(value) > _DIGEST_ITEMS:
+            items.append(f"... {len(value) - _DIGEST_ITEMS} more")
+        return items or None
+    return value if depth == 0 else None
+
+
+def _is_user_message(content: types.Content) -> bool:
+    return content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def _split_turns(history: List[types.Content]) -> List[List[types.Content]]:
+    """Group contents into turns, each starting at a user message (not at function responses)."""
+    turns: List[List[types.Content]] = []
+    for content in history:
+        if _is_user_message(content) or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _elide(content: types.Content) -> Tuple[types.Content, int]:
+    """Copy of `content` with non-fact tool responses digested; also returns how many were."""
+    parts, elided = [], 0
+    for part in content.parts or []:
+        response = part.function_response
+        if response is None or response.name in FACT_TOOLS or (response.response or {}).get("elided"):
+            parts.append(part)
+            continue
+        body = response.response or {}
+        summary = {"elided": True, "digest": _digest(body.get("result"))}
+        if "error" in body:
+            summary["error"] = body["error"]
+        parts.append(types.Part(function_response=types.FunctionResponse(id=response.id, name=response.name, response=summary)))
+        elided += 1
+    if not elided:
+        return content, 0
+    return types.Content(role=content.role, parts=parts), elided
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _Summary:
+    """Questions and fact-tool results of dropped turns."""
+
+    def __init__(self) -> None:
+        self.questions: List[str] = []
+        self.facts: List[str] = []
+
+    @classmethod
+    def parse(cls, part: types.Part) -> Optional["_Summary"]:
+        lines = (part.text or "").splitlines()
+        if not lines or lines[0] != SUMMARY_HEADER:
+            return None
+        summary = cls()
+        for line in lines[1:]:
+            if line.startswith("User asked: "):
+                summary.questions.append(line[len("User asked: "):])
+            elif line.startswith("- "):
+                summary.facts.append(line[2:])
+        return summary
+
+    def add_turn(self, turn: List[types.Content]) -> None:
+        calls: Dict[Optional[str], types.FunctionCall] = {}
+        for content in turn:
+            for part in content.parts or []:
+                if part.function_call is not None:
+                    calls[part.function_call.id] = part.function_call
+                response = part.function_response
+                # Failed calls left nothing behind worth carrying forward.
+                if response is not None and response.name in FACT_TOOLS and "result" in (response.response or {}):
+                    call = calls.get(response.id)
+                    args = _compact_json(dict(call.args or {})) if call is not None else ""
+                    self.facts.append(f"{response.name}({args}) -> {_compact_json(response.response)}")
+                elif part.text and content.role == "user" and SUMMARY_HEADER not in part.text:
+                    self.questions.append(" ".join(part.text.split())[:_TEXT_CHARS])
+
+    def part(self) -> types.Part:
+        lines = [SUMMARY_HEADER]
+        lines.extend(f"User asked: {q}" for q in self.questions[-_MAX_QUESTIONS:])
+        if self.facts:
+            lines.append("Tool results still relevant (latest last):")
+            lines.extend(f"- {fact}" for fact in self.facts[-_MAX_FACTS:])
+        return types.Part(text="\n".join(lines))
+
+
+class HistoryState:
+    """Per-chat token estimates and turn reports."""
+
+    def __init__(self) -> None:
+        self.turns = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+        # id(content) -> (content, tokens); the content is kept so its id is not reused.
+        self._tokens: Dict[int, Tuple[types.Content, int]] = {}
+
+    def tokens(self, history: List[types.Content]) -> int:
+        memo: Dict[int, Tuple[types.Content, int]] = {}
+        total = 0
+        for content in history:
+            hit = self._tokens.get(id(content))
+            if hit is None or hit[0] is not content:
+                hit = (content, estimate_tokens(content))
+            memo[id(content)] = hit
+            total += hit[1]
+        self._tokens = memo
+        return total
+
+
+_states: "weakref.WeakKeyDictionary[Any, HistoryState]" = weakref.WeakKeyDictionary()
+_states_lock = threading.Lock()
+
+
+def _state(chat: Any) -> HistoryState:
+    with _states_lock:
+        state = _states.get(chat)
+        if state is None:
+            state = _states[chat] = HistoryState()
+        return state
+
+
+def compact_history(
+    history: List[types.Content], state: HistoryState, budget_tokens: int, keep_turns: int
+) -> Dict[str, Any]:
+    """Shrink `history` in place to about `budget_tokens`; returns the turn's report."""
+    before = after = state.tokens(history)
+    elided = dropped = 0
+    if budget_tokens > 0 and before > budget_tokens:
+        turns = _split_turns(history)
+        old = max(0, len(turns) - keep_turns)
+        for turn in turns[:old]:
+            for i, content in enumerate(turn):
+                turn[i], count = _elide(content)
+                elided += count
+        after = state.tokens([c for turn in turns for c in turn])
+
+        if after > budget_tokens and old:
+            first = turns[0][0]
+            summary = (_Summary.parse(first.parts[0]) if first.parts else None) or _Summary()
+            while old and after > budget_tokens:
+                summary.add_turn(turns.pop(0))
+                old -= 1
+                dropped += 1
+                head = turns[0][0]
+                rest = [p for p in head.parts or [] if _Summary.parse(p) is None]
+                candidate = [types.Content(role="user", parts=[summary.part(), *rest]), *turns[0][1:]]
+                after = state.tokens(candidate + [c for turn in turns[1:] for c in turn])
+            turns[0] = candidate
+        history[:] = [c for turn in turns for c in turn]
+        state.tokens(history)
+
+    state.turns += 1
+    report = {
+        "turn": state.turns,
+        "historyTokens": before,
+        "sentTokens": after,
+        "savedTokens": before - after,
+        "elidedResponses": elided,
+        "droppedTurns": dropped,
+    }
+    state.last_report = report
+    _metrics.record_history(before, after)
+    if elided or dropped:
+        logger.info(
+            "Compacted history: turn=%d tokens %d -> %d (elided %d responses, dropped %d turns)",
+            state.turns, before, after, elided, dropped,
+        )
+    return report
+
+
+def compact(chat: Any, budget_tokens: Optional[int] = None, keep_turns: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Compact `chat`'s curated history before a new user turn.
+
+    Returns the turn's report, or None for chats without `get_history`.
+    """
+    get_history = getattr(chat, "get_history", None)
+    if get_history is None:
+        return None
+    # The SDK returns its live list, which is what the next request sends.
+    history = get_history(curated=True)
+    report = compact_history(
+        history,
+        _state(chat),
+        BUDGET_TOKENS if budget_tokens is None else budget_tokens,
+        KEEP_TURNS if keep_turns is None else max(1, keep_turns),
+    )
+    full = get_history(curated=False)
+    if full is not history and full != history:
+        # Only curated turns are ever resent; keep the comprehensive list in step.
+        full[:] = history
+    return report
+
+
+def last_report(chat: Any) -> Optional[Dict[str, Any]]:
+    """Report of the chat's latest turn, or None before its first."""
+    with _states_lock:
+        state = _states.get(chat)
+    return state.last_report if state is not None else None
@@ -1,31 +1,144 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional
 
 
-def init_logging() -> None:
-    """Initialize file-based logging once per process.
+# Record attributes set by tools._shared.log_tool_call via `extra=`.
+_TOOL_FIELDS = ("tool", "ok", "ms", "params", "result", "error")
+
+_LISTENER: Optional[QueueListener] = None
+
+
+def _truncated(value: Any, limit: int) -> Any:
+    """Serialize value, cutting the text at `limit` chars (0 = no limit)."""
+    text = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    if limit and len(text) > limit:
+        return f"{text[:limit]}...(+{len(text) - limit} chars)"
+    return value
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record; tool payloads are truncated to `max_chars`."""
+
+    def __init__(self, max_chars: int) -> None:
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in _TOOL_FIELDS:
+            if hasattr(record, field):
+                value = getattr(record, field)
+                out[field] = _truncated(value, self.max_chars) if field in ("params", "result") else value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class ToolEchoFormatter(logging.Formatter):
+    """Human-readable echo of tool calls for the terminal in debug mode."""
+
+    def __init__(self, max_chars: int) -> None:
+        super().__init__()
+        self.max_chars = max_chars
+
+    def _render(self, value: Any) -> str:
+        text = json.dumps(value, ensure_ascii=False, indent=2, default=str)
+        if self.max_chars and len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}...(+{len(text) - self.max_chars} chars)"
+        return text
+
+    def format(self, record: logging.LogRecord) -> str:
+        tool = getattr(record, "tool", record.name)
+        head = f"```calling {tool} with params: ```\n```{self._render(getattr(record, 'params', None))}```\n"
+        if getattr(record, "ok", True):
+            return head + f"```{tool} responded:\n{self._render(getattr(record, 'result', None))}```"
+        return head + f"```{tool} responded:\n <raised {getattr(record, 'error', record.getMessage())}>```"
+
+
+class _ToolRecords(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, "tool")
+
+
+class _AppRecords(logging.Filter):
+    # Successful tool calls only go to tools.jsonl; failures show up in both.
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not hasattr(record, "tool") or record.levelno >= logging.WARNING
 
-    Uses a rotating file handler under `logs/app.log` and avoids
-    duplicate handler setup on repeat calls.
+
+class _LazyQueueHandler(QueueHandler):
+    """Enqueue records without formatting them on the caller's thread.
+
+    The stock handler renders the message (and drops `args`) before
+    enqueueing; here the record goes over as-is so tool payloads are only
+    serialized by the listener thread.
     """
-    os.makedirs("logs", exist_ok=True)
-    log_path = os.path.join("logs", "app.log")
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def debug_enabled() -> bool:
+    return os.getenv("SHOPTALK_DEBUG", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def init_logging() -> None:
+    """Initialize logging once per process.
+
+    Records from every logger go through a queue to a background listener
+    thread, which writes them to `logs/app.log` (text) and tool calls to
+    `logs/tools.jsonl` (JSON lines). Setting `SHOPTALK_DEBUG=1` also echoes
+    tool calls to stdout. Repeat calls are no-ops.
+    """
+    global _LISTENER
+    if _LISTENER is not None:
+        return
     logger = logging.getLogger()
-    if any(isinstance(h, RotatingFileHandler) for h in logger.handlers):
+    if any(isinstance(h, (RotatingFileHandler, QueueHandler)) for h in logger.handlers):
         return
 
-    logger.setLevel(logging.INFO)
+    os.makedirs("logs", exist_ok=True)
+    max_chars = int(os.getenv("SHOPTALK_TOOL_LOG_MAX_CHARS", "2000"))
 
-    file_handler = RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+    file_handler = RotatingFileHandler(
+        os.path.join("logs", "app.log"), maxBytes=1_000_000, backupCount=3, encoding="utf-8"
+    )
     file_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(
+    file_handler.addFilter(_AppRecords())
+    file_handler.setFormatter(logging.Formatter(
         fmt="%(asctime)s %(levelname)s [%(name)s] %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
+    ))
+
+    tools_handler = RotatingFileHandler(
+        os.path.join("logs", "tools.jsonl"), maxBytes=5_000_000, backupCount=3, encoding="utf-8"
     )
-    file_handler.setFormatter(formatter)
+    tools_handler.setLevel(logging.INFO)
+    tools_handler.addFilter(_ToolRecords())
+    tools_handler.setFormatter(JsonLinesFormatter(max_chars))
 
-    logger.addHandler(file_handler)
+    handlers = [file_handler, tools_handler]
+    if debug_enabled():
+        echo = logging.StreamHandler(sys.stdout)
+        echo.addFilter(_ToolRecords())
+        echo.setFormatter(ToolEchoFormatter(max_chars))
+        handlers.append(echo)
 
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _LISTENER = QueueListener(records, *handlers, respect_handler_level=True)
+    _LISTENER.start()
+    atexit.register(_LISTENER.stop)
 
+    logger.setLevel(logging.INFO)
+    logger.addHandler(_LazyQueueHandler(records))
@@ -0,0 +1,394 @@
+"""Offline stand-in for `GeminiClient` that replays scripted conversations.
+
+`ReplayGeminiClient` has the same surface as `GeminiClient`
+(`start_chat()` / `start_async_chat()`), but its chats never touch the
+network: each user message starts the next turn of a script, and the
+"model" answers with that turn's function calls, round by round, then with
+its reply text. Everything around the model (tool dispatch, logging,
+metrics, the request/response objects) is the real code path, so the whole
+agent can be run and load-tested offline.
+
+A script is a list of turns:
+
+    {"user": "...", "rounds": [[{"name": "search_products", "args": {...}}, ...], ...], "reply": "..."}
+
+Each round's calls arrive in one model response (so they run in parallel).
+Scripts are JSON (a list, or `{"turns": [...]}`) and can be recorded from a
+live session with `RecordingChat`. Turns are replayed in order and wrap
+around; the user's actual text is not matched against the script. A
+request with function calling off (mode NONE) gets the turn's reply, like
+the real model, however many rounds are left.
+
+Chats also keep per-stage timings in the client's `ReplayStats`: simulated
+model time, request serialization, and the time the caller spent between
+receiving function calls and sending their results back (dispatch).
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from google.genai import types
+
+
+Turn = Dict[str, Any]
+
+DEFAULT_SCRIPT: List[Turn] = [
+    {
+        "user": "Do you have wireless headphones?",
+        "rounds": [[{"name": "search_products", "args": {"query": "wireless", "limit": 10}}]],
+        "reply": "Yes: the Aurora Wireless Headphones come in black and white.",
+    },
+    {
+        "user": "Is the black one in stock, and what would two cost shipped to Austin?",
+        "rounds": [
+            [
+                {"name": "get_product_details", "args": {"product_id": "hp-aurora-100"}},
+                {"name": "check_inventory", "args": {"sku": "HP-AUR-100-BLK"}},
+            ],
+            [
+                {
+                    "name": "estimate_price",
+                    "args": {
+                        "items": [{"sku": "HP-AUR-100-BLK", "quantity": 2}],
+                        "destination_city": "Austin",
+                        "destination_country": "US",
+                    },
+                }
+            ],
+        ],
+        "reply": "The black Aurora is in stock. Two shipped to Austin come to the total shown above, tax included.",
+    },
+    {
+        "user": "Anything cheaper that pairs well with a speaker?",
+        "rounds": [
+            [
+                {"name": "suggest_alternatives", "args": {"reference_product_id": "hp-aurora-100", "max_price_cents": 15000}},
+                {"name": "check_inventory_many", "args": {"skus": ["SP-NEO-10-CH", "EB-SON-200-BLK"]}},
+            ]
+        ],
+        "reply": "The Sonic Lite Earbuds are cheaper, and the Neo Smart Speaker is in stock in charcoal.",
+    },
+]
+
+
+def load_script(path: str) -> List[Turn]:
+    """Read a replay script (a JSON list of turns, or `{"turns": [...]}`)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    turns = data["turns"] if isinstance(data, dict) else data
+    if not turns:
+        raise ValueError(f"Replay script {path} has no turns")
+    return turns
+
+
+class ReplayStats:
+    """Per-stage time accumulated by every chat of one client (thread-safe)."""
+
+    STAGES = ("model", "serialize", "dispatch")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seconds: Dict[str, float] = dict.fromkeys(self.STAGES, 0.0)
+        self.requests = 0
+        self.turns = 0
+        self.function_calls = 0
+        self.prompt_chars = 0
+        self.declaration_chars = 0
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[stage] += seconds
+
+    def count(
+        self, *, requests: int = 0, turns: int = 0, function_calls: int = 0, prompt_chars: int = 0, declaration_chars: int = 0
+    ) -> None:
+        with self._lock:
+            self.requests += requests
+            self.turns += turns
+            self.function_calls += function_calls
+            self.prompt_chars += prompt_chars
+            self.declaration_chars += declaration_chars
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "seconds": {stage: round(s, 6) for stage, s in self.seconds.items()},
+                "requests": self.requests,
+                "turns": self.turns,
+                "functionCalls": self.function_calls,
+                "promptChars": self.prompt_chars,
+                "declarationChars": self.declaration_chars,
+            }
+
+
+def _usage(prompt_chars: int, reply_chars: int) -> types.GenerateContentResponseUsageMetadata:
+    # Rough 4-chars-per-token estimate so token metrics have plausible values.
+    prompt, candidates = prompt_chars // 4, reply_chars // 4
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt, candidates_token_count=candidates, total_token_count=prompt + candidates
+    )
+
+
+class _Replay:
+    """Script position and history of one chat; shared by the sync and async chats."""
+
+    def __init__(self, script: Sequence[Turn], stats: ReplayStats, start: int) -> None:
+        self._script = script
+        self._stats = stats
+        self._next_turn = start
+        self._turn: Optional[Turn] = None
+        self._round = 0
+        self._calls_sent_at: Optional[float] = None
+        self._history: List[types.Content] = []
+        self._call_ids = 0
+        self._calls_allowed = True
+
+    def request(self, message: Any, config: Optional[types.GenerateContentConfig]) -> int:
+        """Advance the script for an outgoing message; returns the serialized request size."""
+        now = time.perf_counter()
+        if self._calls_sent_at is not None:
+            self._stats.add("dispatch", now - self._calls_sent_at)
+            self._calls_sent_at = None
+        if isinstance(message, str):
+            self._turn = self._script[self._next_turn % len(self._script)]
+            self._next_turn += 1
+            self._round = 0
+            self._stats.count(turns=1)
+            content = types.Content(role="user", parts=[types.Part(text=message)])
+        else:
+            self._round += 1
+            content = types.Content(role="user", parts=list(message))
+        self._history.append(content)
+        calling = config.tool_config.function_calling_config if config and config.tool_config else None
+        self._calls_allowed = calling is None or calling.mode != types.FunctionCallingConfigMode.NONE
+        # What the SDK does per request: declare the tools and serialize the whole history.
+        declarations = [
+            types.FunctionDeclaration.from_callable_with_api_option(callable=tool).model_dump_json(exclude_none=True)
+            for tool in (config.tools if config and config.tools else [])
+            if callable(tool)
+        ]
+        payload = [c.model_dump_json(exclude_none=True) for c in self._history]
+        declared = sum(map(len, declarations))
+        size = declared + sum(map(len, payload))
+        self._stats.add("serialize", time.perf_counter() - now)
+        self._stats.count(requests=1, prompt_chars=size, declaration_chars=declared)
+        return size
+
+    def response(self, prompt_chars: int) -> types.GenerateContentResponse:
+        turn = self._turn or {}
+        rounds = turn.get("rounds") or []
+        if self._calls_allowed and self._round < len(rounds):
+            parts = []
+            for call in rounds[self._round]:
+                self._call_ids += 1
+                parts.append(types.Part(function_call=types.FunctionCall(
+                    id=f"replay-{self._call_ids}", name=call["name"], args=dict(call.get("args") or {})
+                )))
+            self._stats.count(function_calls=len(parts))
+            reply_chars = 0
+        else:
+            parts = [types.Part(text=turn.get("reply", ""))]
+            reply_chars = len(parts[0].text or "")
+        content = types.Content(role="model", parts=parts)
+        self._history.append(content)
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=content, finish_reason=types.FinishReason.STOP)],
+            usage_metadata=_usage(prompt_chars, reply_chars),
+        )
+
+    def calls_sent(self, resp: types.GenerateContentResponse) -> None:
+        if resp.function_calls:
+            self._calls_sent_at = time.perf_counter()
+
+    def history(self) -> List[types.Content]:
+        return self._history
+
+    def record(self, user_input: types.Content, model_output: List[types.Content]) -> None:
+        """Append a turn answered without the model; the script does not advance."""
+        self._history.append(user_input)
+        self._history.extend(model_output)
+
+
+def _stream_chunks(resp: types.GenerateContentResponse, chunk_chars: int) -> List[types.GenerateContentResponse]:
+    """Split a text reply into streamed chunks (function calls come in one chunk)."""
+    text = resp.text if not resp.function_calls else None
+    if not text or chunk_chars <= 0:
+        return [resp]
+    pieces = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+    chunks = [
+        types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text=p)]))])
+        for p in pieces
+    ]
+    chunks[-1].usage_metadata = resp.usage_metadata
+    return chunks
+
+
+class ReplayChat:
+    """Sync chat with the `send_message` / `send_message_stream` surface the agent uses."""
+
+    def __init__(self, replay: _Replay, latency_s: float, stats: ReplayStats, chunk_chars: int) -> None:
+        self._replay = replay
+        self._latency_s = latency_s
+        self._stats = stats
+        self._chunk_chars = chunk_chars
+
+    def get_history(self, curated: bool = False) -> List[types.Content]:
+        """The live history list (every request resends all of it), like the SDK chats'."""
+        return self._replay.history()
+
+    def record_history(self, user_input: types.Content, model_output: List[types.Content], is_valid: bool) -> None:
+        self._replay.record(user_input, model_output)
+
+    def _respond(self, message: Any, config: Optional[types.GenerateContentConfig]) -> types.GenerateContentResponse:
+        prompt_chars = self._replay.request(message, config)
+        started = time.perf_counter()
+        if self._latency_s:
+            time.sleep(self._latency_s)
+        resp = self._replay.response(prompt_chars)
+        self._stats.add("model", time.perf_counter() - started)
+        return resp
+
+    def send_message(self, message: Any, config: Optional[types.GenerateContentConfig] = None) -> types.GenerateContentResponse:
+        resp = self._respond(message, config)
+        self._replay.calls_sent(resp)
+        return resp
+
+    def send_message_stream(self, message: Any, config: Optional[types.GenerateContentConfig] = None) -> Iterator[types.GenerateContentResponse]:
+        resp = self._respond(message, config)
+        yield from _stream_chunks(resp, self._chunk_chars)
+        self._replay.calls_sent(resp)
+
+
+class AsyncReplayChat:
+    """Async chat mirroring `client.aio.chats` (`await send_message`, `async for ... in await send_message_stream`)."""
+
+    def __init__(self, replay: _Replay, latency_s: float, stats: ReplayStats, chunk_chars: int) -> None:
+        self._replay = replay
+        self._latency_s = latency_s
+        self._stats = stats
+        self._chunk_chars = chunk_chars
+
+    def get_history(self, curated: bool = False) -> List[types.Content]:
+        """The live history list (every request resends all of it), like the SDK chats'."""
+        return self._replay.history()
+
+    def record_history(self, user_input: types.Content, model_output: List[types.Content], is_valid: bool) -> None:
+        self._replay.record(user_input, model_output)
+
+    async def _respond(self, message: Any, config: Optional[types.GenerateContentConfig]) -> types.GenerateContentResponse:
+        prompt_chars = self._replay.request(message, config)
+        started = time.perf_counter()
+        if self._latency_s:
+            await asyncio.sleep(self._latency_s)
+        resp = self._replay.response(prompt_chars)
+        self._stats.add("model", time.perf_counter() - started)
+        return resp
+
+    async def send_message(self, message: Any, config: Optional[types.GenerateContentConfig] = None) -> types.GenerateContentResponse:
+        resp = await self._respond(message, config)
+        self._replay.calls_sent(resp)
+        return resp
+
+    async def send_message_stream(self, message: Any, config: Optional[types.GenerateContentConfig] = None) -> AsyncIterator[types.GenerateContentResponse]:
+        resp = await self._respond(message, config)
+
+        async def chunks() -> AsyncIterator[types.GenerateContentResponse]:
+            for chunk in _stream_chunks(resp, self._chunk_chars):
+                yield chunk
+            self._replay.calls_sent(resp)
+
+        return chunks()
+
+
+class ReplayGeminiClient:
+    def __init__(
+        self,
+        script: Optional[Sequence[Turn]] = None,
+        *,
+        latency_s: float = 0.0,
+        chunk_chars: int = 16,
+    ) -> None:
+        """Create an offline client whose chats replay `script`.
+
+        - `script` defaults to `DEFAULT_SCRIPT` (a browse/stock/price flow on `data/`).
+        - `latency_s` is slept (or awaited) per model round trip.
+        - `chunk_chars` is the size of streamed text chunks.
+        Successive chats start at successive turns, so concurrent
+        conversations do not all replay the same turn at the same time.
+        """
+        self.script = list(script or DEFAULT_SCRIPT)
+        self.latency_s = latency_s
+        self.chunk_chars = chunk_chars
+        self.stats = ReplayStats()
+        self._chats = 0
+        self._lock = threading.Lock()
+
+    def _replay(self) -> _Replay:
+        with self._lock:
+            start = self._chats
+            self._chats += 1
+        return _Replay(self.script, self.stats, start)
+
+    def start_chat(self) -> ReplayChat:
+        return ReplayChat(self._replay(), self.latency_s, self.stats, self.chunk_chars)
+
+    def start_async_chat(self) -> AsyncReplayChat:
+        return AsyncReplayChat(self._replay(), self.latency_s, self.stats, self.chunk_chars)
+
+
+class RecordingChat:
+    """Wrap a live sync chat and record each turn's function calls as a replay script.
+
+    Call `save(path)` to write the turns recorded so far; the file can be
+    passed to `load_script`.
+    """
+
+    def __init__(self, chat: Any) -> None:
+        self._chat = chat
+        self.turns: List[Turn] = []
+
+    def _observe(self, message: Any, calls: Sequence[types.FunctionCall], text: str) -> None:
+        if isinstance(message, str):
+            self.turns.append({"user": message, "rounds": [], "reply": ""})
+        if not self.turns:
+            return
+        turn = self.turns[-1]
+        if calls:
+            turn["rounds"].append([{"name": c.name, "args": dict(c.args or {})} for c in calls])
+        else:
+            turn["reply"] = text
+
+    def get_history(self, curated: bool = False) -> List[Any]:
+        return self._chat.get_history(curated=curated)
+
+    def record_history(self, user_input: Any, model_output: List[Any], is_valid: bool) -> None:
+        self._chat.record_history(user_input, model_output, is_valid)
+        calls = [p.function_call for c in model_output for p in c.parts or [] if p.function_call is not None]
+        text = "".join(p.text for c in model_output if c.role == "model" for p in c.parts or [] if p.text)
+        turn: Turn = {"user": "".join(p.text or "" for p in user_input.parts or []), "rounds": [], "reply": text}
+        if calls:
+            turn["rounds"].append([{"name": c.name, "args": dict(c.args or {})} for c in calls])
+        self.turns.append(turn)
+
+    def send_message(self, message: Any, config: Optional[types.GenerateContentConfig] = None) -> Any:
+        resp = self._chat.send_message(message, config=config)
+        self._observe(message, resp.function_calls or [], "" if resp.function_calls else (resp.text or ""))
+        return resp
+
+    def send_message_stream(self, message: Any, config: Optional[types.GenerateContentConfig] = None) -> Iterator[Any]:
+        calls: List[types.FunctionCall] = []
+        texts: List[str] = []
+        for chunk in self._chat.send_message_stream(message, config=config):
+            calls.extend(chunk.function_calls or [])
+            if not chunk.function_calls and chunk.text:
+                texts.append(chunk.text)
+            yield chunk
+        self._observe(message, calls, "".join(texts))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"turns": self.turns}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
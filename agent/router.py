@@ -0,0 +1,197 @@
+"""Fast path for simple, well-formed requests.
+
+A message like "status of order 135228ef" normally costs a model round
+trip to pick the tool, the tool call itself, and a second round trip to
+phrase the answer. `answer` recognizes a few such requests with anchored
+patterns, calls the tool through the turn's `ToolDispatcher`, renders a
+templated reply and records the exchange (user message, function call,
+function response, reply) in the chat's history as if the model had
+produced it, so later turns see the same context. Anything else, or any
+result a template cannot phrase with confidence (e.g. an unknown SKU),
+goes to the model as usual.
+
+Routes:
+- `order_status`: "status of order 135228ef", "track order #135228ef", "where is my order 135228ef"
+- `stock`: "is HP-AUR-100-BLK in stock?", "stock for HP-AUR-100-BLK"
+- `categories`: "what categories do you have?", "list categories"
+
+Every user turn is counted by route (`shoptalk_routed_turns_total`, with
+`model` for the rest). Time saved is estimated as the two model round
+trips a routed turn skips (at the mean round trip observed so far) minus
+the fast path's own time. `SHOPTALK_FAST_PATH=0` turns routing off.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent.dispatch import ToolDispatcher
+from google.genai import types
+from tools import _metrics
+
+
+ENABLED = os.getenv("SHOPTALK_FAST_PATH", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+Route = Tuple[str, str, Dict[str, Any]]  # (intent, tool, args)
+
+_ORDER_ID = r"#?(?P<id>[0-9a-f]{8})"
+_ORDER = r"(?:my |the )?order(?: id| number| no\.?)?"
+# A SKU has at least one hyphen and one digit, so "over-ear" is not one.
+_SKU = r"(?:sku )?(?P<sku>(?=[a-z-]*\d)[a-z0-9]+(?:-[a-z0-9]+)+)"
+
+_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    (intent, re.compile(pattern, re.IGNORECASE))
+    for intent, pattern in [
+        ("order_status", rf"(?:what(?:'s| is) the )?status (?:of|for) {_ORDER} {_ORDER_ID}"),
+        ("order_status", rf"(?:track|check)(?: the status of)? {_ORDER} {_ORDER_ID}"),
+        ("order_status", rf"where(?:'s| is) {_ORDER} {_ORDER_ID}"),
+        ("order_status", rf"{_ORDER} {_ORDER_ID} status"),
+        ("stock", rf"(?:is|are) (?:the )?{_SKU} (?:in stock|available)"),
+        ("stock", rf"do you have {_SKU} in stock"),
+        ("stock", rf"(?:check )?(?:stock|inventory|availability) (?:for|of) {_SKU}"),
+        ("categories", r"(?:what|which) (?:product )?categories (?:do you (?:have|carry|sell|offer)|are (?:there|available))"),
+        ("categories", r"(?:list|show)(?: me)?(?: all)?(?: the| your)?(?: product)? categories"),
+    ]
+]
+_POLITE_RE = re.compile(r"^(?:please |can you |could you )+|(?: please)+$", re.IGNORECASE)
+
+logger = logging.getLogger(__name__)
+
+
+def match(message: str) -> Optional[Route]:
+    """The fast-path route for a message, or None when it should go to the model."""
+    text = _POLITE_RE.sub("", " ".join(message.split()).rstrip("?!. "))
+    for intent, pattern in _PATTERNS:
+        m = pattern.fullmatch(text)
+        if m is None:
+            continue
+        if intent == "order_status":
+            return intent, "get_order_status", {"order_id": m.group("id").lower()}
+        if intent == "stock":
+            return intent, "check_inventory", {"sku": m.group("sku").upper()}
+        return intent, "list_categories", {}
+    return None
+
+
+def _order_status(args: Dict[str, Any], result: Any) -> Optional[str]:
+    if result is None:
+        return f"I couldn't find an order with id {args['order_id']}. Please check the id and try again."
+    placed = f", placed {result['createdAt']}" if result.get("createdAt") else ""
+    return f"Order {result['orderId']} is {result.get('status') or 'unknown'}{placed}."
+
+
+def _stock(args: Dict[str, Any], result: Any) -> Optional[str]:
+    if result is None:
+        # Possibly a typo: the model can look for similar SKUs.
+        return None
+    if result.get("availability") == "in_stock":
+        return f"Yes, {result['sku']} is in stock ({result['stock']} available)."
+    eta = result.get("restockEtaDays")
+    restock = f"; a restock is expected in about {eta} days" if eta else ""
+    return f"{result['sku']} is out of stock{restock}."
+
+
+def _categories(args: Dict[str, Any], result: Any) -> Optional[str]:
+    if not result:
+        return None
+    return f"We carry these categories: {', '.join(result)}."
+
+
+_RENDERERS: Dict[str, Callable[[Dict[str, Any], Any], Optional[str]]] = {
+    "order_status": _order_status,
+    "stock": _stock,
+    "categories": _categories,
+}
+
+
+class RouterStats:
+    """Turns seen, turns answered per intent, and estimated model time saved (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.routed: Dict[str, int] = {}
+        self.saved_s = 0.0
+
+    def add(self, route: str, saved_s: float = 0.0) -> None:
+        with self._lock:
+            self.turns += 1
+            if route != "model":
+                self.routed[route] = self.routed.get(route, 0) + 1
+                self.saved_s += saved_s
+        _metrics.record_route(route, saved_s)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(self.routed.values())
+            return {
+                "turns": self.turns,
+                "routed": dict(self.routed),
+                "hitRate": round(hits / self.turns, 4) if self.turns else None,
+                "savedMs": round(self.saved_s * 1000, 1),
+            }
+
+
+STATS = RouterStats()
+
+
+def router_stats() -> Dict[str, Any]:
+    """Fast-path hit rate and estimated time saved, for `GET /healthz`."""
+    return STATS.snapshot()
+
+
+def _finish(chat: Any, message: str, route: Route, call: types.FunctionCall, part: types.Part, started: float) -> Optional[str]:
+    intent, _, args = route
+    response = part.function_response
+    body = (response.response if response is not None else None) or {}
+    reply = None if "error" in body else _RENDERERS[intent](args, body.get("result"))
+    if reply is None:
+        STATS.add("model")
+        return None
+    chat.record_history(
+        types.Content(role="user", parts=[types.Part(text=message)]),
+        [
+            types.Content(role="model", parts=[types.Part(function_call=call)]),
+            types.Content(role="user", parts=[part]),
+            types.Content(role="model", parts=[types.Part(text=reply)]),
+        ],
+        True,
+    )
+    elapsed = time.perf_counter() - started
+    round_trip = _metrics.model_round_trip_s()
+    # Before any model call there is nothing to compare against.
+    saved = max(0.0, 2 * round_trip - elapsed) if round_trip is not None else 0.0
+    STATS.add(intent, saved)
+    logger.info("Routed turn: intent=%s ms=%.1f saved_ms=%.0f", intent, elapsed * 1000, saved * 1000)
+    return reply
+
+
+def _route(chat: Any, message: str) -> Optional[Route]:
+    # Without record_history the exchange could not be added to the chat's context.
+    route = match(message) if ENABLED and hasattr(chat, "record_history") else None
+    if route is None:
+        STATS.add("model")
+    return route
+
+
+def answer(chat: Any, message: str, dispatcher: ToolDispatcher) -> Optional[str]:
+    """Reply to `message` without the model when it is a fast-path request; None otherwise."""
+    route = _route(chat, message)
+    if route is None:
+        return None
+    started = time.perf_counter()
+    call = types.FunctionCall(name=route[1], args=route[2])
+    return _finish(chat, message, route, call, dispatcher.run([call])[0], started)
+
+
+async def aanswer(chat: Any, message: str, dispatcher: ToolDispatcher) -> Optional[str]:
+    """Async counterpart of `answer` for `client.aio` chats."""
+    route = _route(chat, message)
+    if route is None:
+        return None
+    started = time.perf_counter()
+    call = types.FunctionCall(name=route[1], args=route[2])
+    return _finish(chat, message, route, call, (await dispatcher.arun([call]))[0], started)
@@ -1,15 +1,25 @@
 import json
+import os
 
-from agent.gemini_client import GeminiClient
+from agent.gemini_client import create_client
+from agent.replay_client import RecordingChat
 from agent.system_prompt import SYSTEM_PROMPT
 from agent.logging_config import init_logging
+from agent.dispatch import ToolDispatcher, manual_config, send_message
+from agent.router import answer as fast_path_answer
+from agent.streaming import stream_turn
+from tools._metrics import start_periodic_dump
 from google.genai import types, errors
 from tools import (
     search_products,
+    filter_products,
     get_product_details,
     check_inventory,
+    check_inventory_many,
     estimate_price,
+    estimate_price_many,
     suggest_alternatives,
+    reserve_stock,
     create_order,
     get_order_status,
     list_supported_destinations,
@@ -28,47 +38,81 @@ WELCOME = (
     "Welcome to ShopTalk! Ask about products, availability, price, or orders. Type 'exit' to quit."
 )
 
+# Tools are regular Python functions the model can call to fetch real data or perform actions
+TOOL_FUNCTIONS = [
+    search_products,
+    filter_products,
+    get_product_details,
+    check_inventory,
+    check_inventory_many,
+    estimate_price,
+    estimate_price_many,
+    suggest_alternatives,
+    reserve_stock,
+    create_order,
+    get_order_status,
+    list_supported_destinations,
+    validate_destination,
+    list_categories,
+    list_products_by_category,
+    list_products,
+    list_products_count,
+    list_variants,
+    validate_sku,
+    get_price_for_sku,
+]
+
+
+def build_config() -> types.GenerateContentConfig:
+    """Per-turn config declaring `TOOL_FUNCTIONS`; function calls are dispatched by the runner."""
+    return manual_config(  # We dispatch function calls ourselves (see agent.dispatch) instead of the SDK
+        types.GenerateContentConfig(
+            tools=list(TOOL_FUNCTIONS),  # Give the model the toolbox so it can function-call when needed
+            system_instruction=SYSTEM_PROMPT,  # High-level role/guardrails so outputs stay on-task and safe
+        )
+    )
+
+
+def print_stream_event(event: dict) -> None:
+    """Render one streaming event (see `agent.streaming`) on the terminal."""
+    if event["type"] == "delta":
+        print(event["text"], end="", flush=True)
+    elif event["type"] == "tool" and event["phase"] == "start":
+        print(f"[{event['tool']}...]", flush=True)
+    elif event["type"] == "tool":
+        print(f"[{event['tool']} {'done' if event['ok'] else 'failed'} in {event['ms']:.0f} ms]", flush=True)
+    elif event["type"] == "done":
+        print()
+    elif event["type"] == "error":
+        print(f"\n[Error] {event['error']}")
 
-def run() -> None:
+
+def run(stream: bool = False) -> None:
     """Run the REPL that powers the multi-turn conversational agent.
 
     This function wires the Gemini chat session with the available Python
     tool functions. The model decides when to call tools based on the
-    provided type hints and docstrings.
+    provided type hints and docstrings. With `stream=True` the reply is
+    printed as it arrives, with tool-call progress lines in between.
+    Simple, well-formed requests skip the model (see `agent.router`).
     """
     print(WELCOME)  # Tell the user what this demo does and how to exit
     init_logging()  # Create a file logger so we can inspect behavior after runs
-    client = GeminiClient()  # Create an API client using the GEMINI_API_KEY from environment
+    start_periodic_dump()  # Write tool/model metrics to a file when SHOPTALK_METRICS_DUMP_S is set
+    client = create_client()  # Create an API client using the GEMINI_API_KEY from environment (or a replay client)
     chat = client.start_chat()  # Start a persistent chat so the model remembers context across turns
+    record_path = os.getenv("SHOPTALK_RECORD_SCRIPT")
+    if record_path:
+        chat = RecordingChat(chat)  # Save each turn's function calls as a replay script for offline runs
 
-    # Tools are regular Python functions the model can call to fetch real data or perform actions
-    tool_functions = [
-        search_products,
-        get_product_details,
-        check_inventory,
-        estimate_price,
-        suggest_alternatives,
-        create_order,
-        get_order_status,
-        list_supported_destinations,
-        validate_destination,
-        list_categories,
-        list_products_by_category,
-        list_products,
-        list_products_count,
-        list_variants,
-        validate_sku,
-        get_price_for_sku,
-    ]
-
-    # This configuration is sent with each turn so behavior is consistent and guarded by a system prompt
-    common_config = types.GenerateContentConfig(
-        tools=tool_functions,  # Give the model the toolbox so it can function-call when needed
-        system_instruction=SYSTEM_PROMPT,  # High-level role/guardrails so outputs stay on-task and safe
-    )
+    common_config = build_config()  # Sent with each turn so behavior is consistent and guarded by a system prompt
+    # Runs the function calls of one model response concurrently and replies with all results at once
+    dispatcher = ToolDispatcher(TOOL_FUNCTIONS)
 
     # The REPL (read–eval–print loop) keeps asking for input and sending it to the chat session
     while True:
+        if record_path:
+            chat.save(record_path)  # Rewritten before every prompt so finished turns survive a crash
         try:
             user = input("> ").strip()  # Read input from the terminal and trim whitespace
         except (EOFError, KeyboardInterrupt):
@@ -78,9 +122,23 @@ def run() -> None:
             break
         if not user:
             continue  # Ignore empty inputs to avoid accidental tool calls
+        if stream:
+            try:
+                # Print partial text as it arrives; time-to-first-token is logged per turn
+                stream_turn(chat, user, common_config, print_stream_event, dispatcher)
+            except errors.APIError as e:
+                print(f"\n[APIError] {getattr(e, 'message', str(e))}")
+            except Exception as e:
+                print(f"\n[Error] {e}")
+            continue
         try:
-            # Send a new user turn; the model may plan and call tools automatically
-            resp = chat.send_message(user, config=common_config)
+            # Simple requests (order status, stock for a SKU, categories) are answered without the model
+            reply = fast_path_answer(chat, user, dispatcher)
+            if reply is not None:
+                print(reply)
+                continue
+            # Send a new user turn; tool calls the model asks for are executed until it answers
+            resp = send_message(chat, user, common_config, dispatcher)
         except errors.APIError as e:
             print(f"[APIError] {getattr(e, 'message', str(e))}")  # Surface API issues without crashing the REPL
             continue
@@ -93,6 +151,6 @@ def run() -> None:
         except Exception:
             # If text is unavailable, print a JSON view so learners can inspect raw structures
             text = json.dumps(resp.to_dict() if hasattr(resp, "to_dict") else str(resp))
-        print(text)  # Show the model's answer (and any tool summaries emitted by tools)
-
-
+        print(text)  # Show the model's answer (tool calls are echoed too when SHOPTALK_DEBUG=1)
+    if record_path:
+        chat.save(record_path)
@@ -0,0 +1,176 @@
+"""HTTP/WebSocket server exposing ShopTalk chat sessions.
+
+One event loop serves every session: chats use the async Gemini client and
+tools run through `tools.aio`, so a slow model round trip or storage call
+in one conversation does not hold up the others.
+
+Endpoints:
+- `POST /sessions` -> `{"sessionId"}` (201)
+- `POST /sessions/{id}/messages` with `{"message": "..."}` -> `{"sessionId", "reply"}`
+- `GET /sessions/{id}/ws`: WebSocket; send a message (plain text or
+  `{"message": "..."}`), receive the turn's streaming events (see
+  `agent.streaming`): `delta` text frames and `tool` progress frames as they
+  happen, then a final `done` frame with the full text and its TTFT. A
+  message for a session that has since expired gets an `error` frame and
+  the socket is closed.
+- `DELETE /sessions/{id}` (204)
+- `GET /healthz` -> `{"status", "sessions", "toolCache", "fastPath"}` (cache hit/miss counters,
+  fast-path hit rate and estimated time saved, see `agent.router`)
+- `GET /metrics`: Prometheus text (tool and model latency, errors, sizes, tokens)
+
+`aiohttp` is only needed for this mode; `main.py` imports this module only
+for `serve`. The app's `SessionTable` is `app[SESSIONS]`.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Optional
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+from agent.async_runner import DISPATCHER, build_async_config, send_turn
+from agent.router import router_stats
+from agent.sessions import Session, SessionTable, SessionTableFull
+from agent.streaming import astream_turn
+from tools import _metrics
+from tools._shared import tool_cache_stats
+
+
+MAX_SESSIONS = int(os.getenv("SHOPTALK_MAX_SESSIONS", "1000"))
+SESSION_IDLE_S = float(os.getenv("SHOPTALK_SESSION_IDLE_S", "1800"))
+
+SESSIONS = web.AppKey("sessions", SessionTable)
+
+
+def _dumps(value: Any) -> str:
+    # Tool params may hold values json cannot encode natively.
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def create_app(
+    chat_factory: Optional[Callable[[], Any]] = None,
+    *,
+    max_sessions: int = MAX_SESSIONS,
+    idle_s: float = SESSION_IDLE_S,
+) -> Any:
+    """Build the aiohttp application.
+
+    `chat_factory` returns a new async chat per session; by default one
+    client (`create_client`) is created up front and shared by every session.
+    """
+    if chat_factory is None:
+        from agent.gemini_client import create_client
+
+        chat_factory = create_client().start_async_chat
+
+    config = build_async_config()
+    routes = web.RouteTableDef()
+
+    def lookup(request: Any) -> Session:
+        session = request.app[SESSIONS].get(request.match_info["session_id"])
+        if session is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"error": "unknown or expired session"}), content_type="application/json"
+            )
+        return session
+
+    def bad_request(message: str) -> Any:
+        return web.HTTPBadRequest(text=json.dumps({"error": message}), content_type="application/json")
+
+    @routes.get("/healthz")
+    async def healthz(request: Any) -> Any:
+        return web.json_response(
+            {"status": "ok", "sessions": len(request.app[SESSIONS]), "toolCache": tool_cache_stats(), "fastPath": router_stats()}
+        )
+
+    @routes.get("/metrics")
+    async def metrics(request: Any) -> Any:
+        return web.Response(text=_metrics.REGISTRY.render(), content_type="text/plain", charset="utf-8")
+
+    @routes.post("/sessions")
+    async def create_session(request: Any) -> Any:
+        table = request.app[SESSIONS]
+        try:
+            session = table.create()
+        except SessionTableFull as e:
+            return web.json_response({"error": str(e)}, status=503)
+        return web.json_response({"sessionId": session.id, "idleTimeoutS": table.idle_s}, status=201)
+
+    @routes.delete("/sessions/{session_id}")
+    async def delete_session(request: Any) -> Any:
+        if not request.app[SESSIONS].remove(request.match_info["session_id"]):
+            raise web.HTTPNotFound()
+        return web.Response(status=204)
+
+    @routes.post("/sessions/{session_id}/messages")
+    async def post_message(request: Any) -> Any:
+        session = lookup(request)
+        try:
+            body = await request.json()
+        except ValueError:
+            raise bad_request("body must be JSON")
+        message = str((body or {}).get("message") or "").strip() if isinstance(body, dict) else ""
+        if not message:
+            raise bad_request("message is required")
+        async with session.lock:
+            reply = await send_turn(session.chat, message, config)
+            session.turns += 1
+        return web.json_response({"sessionId": session.id, "reply": reply})
+
+    @routes.get("/sessions/{session_id}/ws")
+    async def websocket(request: Any) -> Any:
+        session_id = lookup(request).id
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        async for frame in ws:
+            if frame.type != WSMsgType.TEXT:
+                continue
+            message = frame.data
+            try:
+                parsed = json.loads(message)
+                if isinstance(parsed, dict):
+                    message = parsed.get("message") or ""
+            except ValueError:
+                pass
+            message = str(message).strip()
+            if not message:
+                await ws.send_json({"type": "error", "error": "message is required"})
+                continue
+            # The session may have expired, been evicted or deleted since the last message.
+            session = request.app[SESSIONS].get(session_id)
+            if session is None:
+                await ws.send_json({"type": "error", "error": "unknown or expired session"})
+                await ws.close(code=WSCloseCode.GOING_AWAY, message=b"session expired")
+                break
+            async with session.lock:
+                session.last_used = time.monotonic()
+                async for event in astream_turn(session.chat, message, config, DISPATCHER):
+                    await ws.send_json(event, dumps=_dumps)
+                session.turns += 1
+        return ws
+
+    async def sweeper(app: Any) -> Any:
+        table = app[SESSIONS]
+        task = asyncio.create_task(table.sweep_forever(max(1.0, min(60.0, table.idle_s / 2))))
+        yield
+        task.cancel()
+
+    app = web.Application()
+    app.add_routes(routes)
+    app.cleanup_ctx.append(sweeper)
+    app[SESSIONS] = SessionTable(chat_factory, max_sessions=max_sessions, idle_s=idle_s)
+    return app
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080) -> None:
+    """Run the server until interrupted (`python main.py serve`)."""
+    from agent.logging_config import init_logging
+
+    init_logging()
+    _metrics.start_periodic_dump()
+    app = create_app()
+    logging.info("Serving ShopTalk on http://%s:%d (max %d sessions)", host, port, app[SESSIONS].max_sessions)
+    web.run_app(app, host=host, port=port)
@@ -0,0 +1,106 @@
+"""Bounded table of live chat sessions for the server.
+
+Each session owns one async Gemini chat. The table holds at most
+`max_sessions` entries in least-recently-used order: creating a session
+when full evicts the least recently used idle one, and a periodic sweep
+drops sessions unused for `idle_s` seconds. Sessions in the middle of a
+turn are never evicted.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class Session:
+    """One conversation: its chat plus a lock serializing its turns."""
+
+    __slots__ = ("id", "chat", "lock", "created", "last_used", "turns")
+
+    def __init__(self, session_id: str, chat: Any) -> None:
+        self.id = session_id
+        self.chat = chat
+        self.lock = asyncio.Lock()
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.turns = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+
+class SessionTableFull(Exception):
+    """Every slot is held by a session that is mid-turn."""
+
+
+class SessionTable:
+    """LRU session map with a size bound and idle eviction."""
+
+    def __init__(self, chat_factory: Callable[[], Any], *, max_sessions: int, idle_s: float) -> None:
+        self._chat_factory = chat_factory
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.max_sessions = max(1, max_sessions)
+        self.idle_s = idle_s
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self) -> Session:
+        if len(self._sessions) >= self.max_sessions and not self._evict_lru():
+            raise SessionTableFull(f"all {self.max_sessions} sessions are busy")
+        session = Session(uuid.uuid4().hex, self._chat_factory())
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return a live session and mark it most recently used."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if not session.busy and now - session.last_used > self.idle_s:
+            self._drop(session_id)
+            return None
+        session.last_used = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle longer than `idle_s`; returns how many were dropped."""
+        cutoff = time.monotonic() - self.idle_s
+        # Oldest first, so stop at the first session used after the cutoff.
+        stale = []
+        for sid, session in self._sessions.items():
+            if session.last_used > cutoff:
+                break
+            if not session.busy:
+                stale.append(sid)
+        for sid in stale:
+            self._drop(sid)
+        return len(stale)
+
+    async def sweep_forever(self, interval_s: float) -> None:
+        while True:
+            await asyncio.sleep(interval_s)
+            dropped = self.evict_idle()
+            if dropped:
+                logging.info("Evicted %d idle sessions (%d live)", dropped, len(self._sessions))
+
+    def _evict_lru(self) -> bool:
+        for sid, session in self._sessions.items():
+            if not session.busy:
+                self._drop(sid)
+                return True
+        return False
+
+    def _drop(self, session_id: str) -> None:
+        del self._sessions[session_id]
+        self.evicted += 1
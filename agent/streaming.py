@@ -0,0 +1,229 @@
+"""Streaming turns: partial reply text plus tool progress, with TTFT.
+
+Both helpers send a user turn with the SDK's streaming send and report
+events as they happen:
+
+- `{"type": "delta", "text"}`: the next piece of reply text.
+- `{"type": "tool", "phase": "start" | "end", "tool", ...}`: a function
+  call starting or finishing (see `tools._shared.listen_tool_calls`).
+- `{"type": "done", "text", "ttftMs", "totalMs", "toolCalls", "historyTokens",
+  "savedTokens"}`: the turn finished; `ttftMs` is the time to the first reply
+  text (None if there was none), `historyTokens` the estimated history sent
+  with it and `savedTokens` what compaction removed (see `agent.history`).
+
+Function calls are dispatched by an `agent.dispatch.ToolDispatcher` (calls
+from one streamed response run concurrently), so `config` must have
+automatic function calling disabled. Calls past `MAX_TOOL_ROUNDS` are
+answered with errors instead of run, as in `agent.dispatch.send_message`.
+Requests `agent.router` recognizes are answered without the model: their
+tool events, then the templated reply as one delta. Every finished turn is
+logged with its time-to-first-token.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from agent import history, router
+from agent.dispatch import MAX_TOOL_ROUNDS, ToolDispatcher, ToolRoundLimitError, final_config, refuse
+from google.genai import types
+from tools import _metrics
+from tools._shared import listen_tool_calls
+
+
+Event = Dict[str, Any]
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_text(chunk: Any) -> str:
+    """Text carried by one streamed chunk, ignoring function-call parts."""
+    candidates = getattr(chunk, "candidates", None) or []
+    content = candidates[0].content if candidates else None
+    parts = getattr(content, "parts", None) or []
+    return "".join(part.text for part in parts if getattr(part, "text", None))
+
+
+class _Hop:
+    """Metrics for one streamed model round trip (usage arrives on the last chunks)."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.usage: Any = None
+
+    def seen(self, chunk: Any) -> None:
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage is not None:
+            self.usage = usage
+
+    def finish(self, ok: bool) -> None:
+        _metrics.record_model("stream", time.perf_counter() - self.started, ok, self.usage)
+
+
+class TurnStats:
+    """Timing of one streamed turn."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.tool_calls = 0
+        self.parts: List[str] = []
+        self.history: Optional[Dict[str, Any]] = None
+
+    def on_text(self, text: str) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.parts.append(text)
+
+    def on_tool(self, event: Event) -> None:
+        if event.get("phase") == "start":
+            self.tool_calls += 1
+
+    def done(self) -> Event:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        ttft_ms = None if self.first_token is None else (self.first_token - self.started) * 1000
+        logger.info(
+            "Streamed turn: ttft_ms=%s total_ms=%.1f tool_calls=%d",
+            "n/a" if ttft_ms is None else f"{ttft_ms:.1f}", total_ms, self.tool_calls,
+        )
+        return {
+            "type": "done",
+            "text": "".join(self.parts),
+            "ttftMs": None if ttft_ms is None else round(ttft_ms, 1),
+            "totalMs": round(total_ms, 1),
+            "toolCalls": self.tool_calls,
+            "historyTokens": self.history["sentTokens"] if self.history else None,
+            "savedTokens": self.history["savedTokens"] if self.history else None,
+        }
+
+
+def _next_round(
+    sent: int, calls: List[types.FunctionCall], config: types.GenerateContentConfig
+) -> Optional[Tuple[List[types.Part], types.GenerateContentConfig]]:
+    """What to send for `calls` once the round limit is reached; None while they may still run.
+
+    `sent` counts the model requests of this turn before the one that
+    returned `calls`.
+    """
+    if sent < MAX_TOOL_ROUNDS:
+        return None
+    if sent > MAX_TOOL_ROUNDS:
+        raise ToolRoundLimitError(f"model still called tools after {MAX_TOOL_ROUNDS} rounds with function calling off")
+    return refuse(calls), final_config(config)
+
+
+def stream_turn(
+    chat: Any,
+    message: str,
+    config: types.GenerateContentConfig,
+    on_event: Callable[[Event], None],
+    dispatcher: ToolDispatcher,
+) -> Event:
+    """Stream one turn on a sync chat, calling `on_event` for every event.
+
+    Returns the final `done` event (also passed to `on_event`).
+    """
+    stats = TurnStats()
+
+    def on_tool(event: Event) -> None:
+        stats.on_tool(event)
+        on_event(event)
+
+    with listen_tool_calls(on_tool):
+        reply = router.answer(chat, message, dispatcher)
+        if reply is not None:
+            stats.on_text(reply)
+            on_event({"type": "delta", "text": reply})
+        else:
+            stats.history = history.compact(chat)
+            outgoing: Any = message
+            send_config = config
+            for sent in range(MAX_TOOL_ROUNDS + 2):
+                calls: List[types.FunctionCall] = []
+                hop = _Hop()
+                try:
+                    for chunk in chat.send_message_stream(outgoing, config=send_config):
+                        hop.seen(chunk)
+                        calls.extend(chunk.function_calls or [])
+                        text = chunk_text(chunk)
+                        if text:
+                            stats.on_text(text)
+                            on_event({"type": "delta", "text": text})
+                except Exception:
+                    hop.finish(ok=False)
+                    raise
+                hop.finish(ok=True)
+                if not calls:
+                    break
+                outgoing, send_config = _next_round(sent, calls, config) or (dispatcher.run(calls), config)
+    done = stats.done()
+    on_event(done)
+    return done
+
+
+async def astream_turn(
+    chat: Any, message: str, config: types.GenerateContentConfig, dispatcher: ToolDispatcher
+) -> AsyncIterator[Event]:
+    """Stream one turn on an async chat, yielding events as they happen.
+
+    Tool events are raised on the tool thread pool and handed back to the
+    event loop, so they interleave with the text deltas in real time. A
+    failure ends the stream with `{"type": "error", "error"}` instead of
+    `done`.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+    stats = TurnStats()
+
+    def on_tool(event: Event) -> None:
+        stats.on_tool(event)
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def pump() -> None:
+        try:
+            with listen_tool_calls(on_tool):
+                reply = await router.aanswer(chat, message, dispatcher)
+                if reply is not None:
+                    stats.on_text(reply)
+                    queue.put_nowait({"type": "delta", "text": reply})
+                else:
+                    stats.history = history.compact(chat)
+                    outgoing: Any = message
+                    send_config = config
+                    for sent in range(MAX_TOOL_ROUNDS + 2):
+                        calls: List[types.FunctionCall] = []
+                        hop = _Hop()
+                        try:
+                            async for chunk in await chat.send_message_stream(outgoing, config=send_config):
+                                hop.seen(chunk)
+                                calls.extend(chunk.function_calls or [])
+                                text = chunk_text(chunk)
+                                if text:
+                                    stats.on_text(text)
+                                    queue.put_nowait({"type": "delta", "text": text})
+                        except Exception:
+                            hop.finish(ok=False)
+                            raise
+                        hop.finish(ok=True)
+                        if not calls:
+                            break
+                        limited = _next_round(sent, calls, config)
+                        outgoing, send_config = limited or (await dispatcher.arun(calls), config)
+        except Exception as e:
+            logger.exception("Streamed turn failed")
+            queue.put_nowait({"type": "error", "error": str(e)})
+        else:
+            queue.put_nowait(stats.done())
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        task.cancel()
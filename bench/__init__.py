@@ -0,0 +1,6 @@
+"""Benchmarks and stress tests for the ShopTalk tools.
+
+Run modules with `python -m bench.<name> --help`. Each benchmark works on a
+temporary copy of `data/` (selected via `SHOPTALK_DATA_DIR`), so the real
+data files are never modified.
+"""
@@ -0,0 +1,41 @@
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict, Iterator
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def copy_data_dir(src: str = os.path.join(ROOT, "data")) -> str:
+    """Copy the data directory to a fresh temp dir and return the copy's path."""
+    dst = os.path.join(tempfile.mkdtemp(prefix="shoptalk-bench-"), "data")
+    shutil.copytree(src, dst, ignore=shutil.ignore_patterns("shoptalk.db*", "*.lock", "reservations.json"))
+    return dst
+
+
+def use_data_dir(data_dir: str, storage: str) -> None:
+    """Point the tools at data_dir; must run before `tools` is imported."""
+    if "tools" in sys.modules:
+        raise RuntimeError("configure the data dir before importing tools")
+    os.environ["SHOPTALK_DATA_DIR"] = data_dir
+    os.environ["SHOPTALK_STORAGE"] = storage
+    os.environ.pop("SHOPTALK_SQLITE_PATH", None)
+
+
+@contextlib.contextmanager
+def quiet_stdout() -> Iterator[None]:
+    """Silence tool-call echo so it does not dominate timings."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def write_report(report: Dict[str, Any], path: str | None) -> None:
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
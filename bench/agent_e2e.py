@@ -0,0 +1,184 @@
+"""End-to-end agent throughput with an offline replay model.
+
+Drives many concurrent conversations through the real agent pipeline
+(`agent.dispatch` / `agent.streaming`, the tools, queued logging and metrics)
+with `agent.replay_client.ReplayGeminiClient` standing in for Gemini, so no
+API key or network is needed. Modes:
+
+- `sync`: one thread per conversation running `send_message` with the sync tools (the REPL path);
+- `async`: one event loop, `send_turn` with `tools.aio` (the server's request path);
+- `stream`: one event loop, `astream_turn` (the server's WebSocket path).
+
+Besides turns/second and turn latency, each mode reports where the time went:
+simulated model wait, request serialization (tool declarations and history,
+as the SDK builds them), tool execution, and dispatch overhead: the time
+between the model's function calls and their results minus the tools
+themselves, i.e. the dispatcher plus thread-pool and event-loop queueing.
+
+    python -m bench.agent_e2e --conversations 50 --turns 6 --model-latency-ms 200
+    python -m bench.agent_e2e --script recorded.json --modes async,stream
+    python -m bench.agent_e2e --turns 30 --history-tokens 0     # unbounded history, for comparison
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from bench._common import copy_data_dir, quiet_stdout, use_data_dir, write_report
+
+
+class _ToolTime:
+    """Thread-safe sum of tool execution time from progress events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        if event.get("phase") != "end":
+            return
+        with self._lock:
+            self.seconds += event["ms"] / 1000
+            self.calls += 1
+
+
+def _summary(mode: str, elapsed: float, latencies: List[float], client: Any, tool_time: _ToolTime) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    stats = client.stats.snapshot()
+    stages = dict(stats["seconds"])
+    stages["tools"] = tool_time.seconds
+    # Dispatch as seen by the model includes the tools; keep only the dispatcher's own share.
+    stages["dispatch"] = max(0.0, stages["dispatch"] - tool_time.seconds)
+    stages["other"] = max(0.0, sum(latencies) - sum(stages.values()))
+    turns = len(latencies)
+    return {
+        "mode": mode,
+        "turns": turns,
+        "modelRequests": stats["requests"],
+        "toolCalls": tool_time.calls,
+        "elapsedS": round(elapsed, 3),
+        "turnsPerS": round(turns / elapsed, 1) if elapsed else None,
+        "turnP50Ms": round(statistics.median(latencies) * 1000, 2),
+        "turnP95Ms": round(latencies[int(0.95 * (turns - 1))] * 1000, 2),
+        "stageMsPerTurn": {stage: round(s * 1000 / turns, 3) for stage, s in stages.items()},
+        # History plus tool declarations, as serialized per model request (see agent.history).
+        "promptCharsPerRequest": round(stats["promptChars"] / stats["requests"]) if stats["requests"] else None,
+    }
+
+
+def run_sync(client: Any, conversations: int, turns: int) -> Dict[str, Any]:
+    from agent.dispatch import ToolDispatcher, send_message
+    from agent.runner import TOOL_FUNCTIONS, build_config
+    from tools._shared import listen_tool_calls
+
+    config = build_config()
+    dispatcher = ToolDispatcher(TOOL_FUNCTIONS)
+    tool_time = _ToolTime()
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def conversation() -> None:
+        chat = client.start_chat()
+        with listen_tool_calls(tool_time):
+            for turn in range(turns):
+                t0 = time.perf_counter()
+                send_message(chat, f"turn {turn}", config, dispatcher).text
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=conversation) for _ in range(conversations)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return _summary("sync", time.perf_counter() - started, latencies, client, tool_time)
+
+
+async def _run_async(client: Any, conversations: int, turns: int, stream: bool) -> Dict[str, Any]:
+    from agent.async_runner import DISPATCHER, build_async_config, send_turn
+    from agent.streaming import astream_turn
+    from tools._shared import listen_tool_calls
+
+    config = build_async_config()
+    tool_time = _ToolTime()
+    latencies: List[float] = []
+
+    async def conversation() -> None:
+        chat = client.start_async_chat()
+        with listen_tool_calls(tool_time):
+            for turn in range(turns):
+                t0 = time.perf_counter()
+                if stream:
+                    # astream_turn installs its own tool listener; tool timings come back as events.
+                    async for event in astream_turn(chat, f"turn {turn}", config, DISPATCHER):
+                        if event["type"] == "tool":
+                            tool_time(event)
+                        elif event["type"] == "error":
+                            raise RuntimeError(event["error"])
+                else:
+                    text = await send_turn(chat, f"turn {turn}", config)
+                    if text.startswith(("[Error]", "[APIError]")):
+                        raise RuntimeError(text)
+                latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation() for _ in range(conversations)))
+    return _summary("stream" if stream else "async", time.perf_counter() - started, latencies, client, tool_time)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=6, help="user turns per conversation")
+    parser.add_argument("--model-latency-ms", type=float, default=200.0, help="simulated model round trip")
+    parser.add_argument("--modes", default="sync,async,stream")
+    parser.add_argument("--script", default=None, help="replay script (JSON); defaults to the built-in browse/stock/price flow")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--history-tokens", type=int, default=None, help="history budget per chat (0 = unbounded)")
+    parser.add_argument("--report", default=None)
+    args = parser.parse_args()
+
+    if args.history_tokens is not None:
+        os.environ["SHOPTALK_HISTORY_TOKENS"] = str(args.history_tokens)
+
+    use_data_dir(copy_data_dir(), args.storage)
+    report_path: Optional[str] = os.path.abspath(args.report) if args.report else None
+    script_path: Optional[str] = os.path.abspath(args.script) if args.script else None
+    # Logging is part of the pipeline under test; keep its files out of the working tree.
+    os.chdir(tempfile.mkdtemp(prefix="shoptalk-e2e-"))
+
+    from agent.logging_config import init_logging
+    from agent.replay_client import ReplayGeminiClient, load_script
+
+    init_logging()
+    script = load_script(script_path) if script_path else None
+    latency_s = args.model_latency_ms / 1000
+    results = []
+    with quiet_stdout():
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            client = ReplayGeminiClient(script, latency_s=latency_s)
+            if mode == "sync":
+                results.append(run_sync(client, args.conversations, args.turns))
+            elif mode in ("async", "stream"):
+                results.append(asyncio.run(_run_async(client, args.conversations, args.turns, mode == "stream")))
+            else:
+                raise SystemExit(f"unknown mode {mode!r}")
+    write_report({
+        "conversations": args.conversations,
+        "turnsPerConversation": args.turns,
+        "modelLatencyMs": args.model_latency_ms,
+        "storage": args.storage,
+        "historyTokens": int(os.environ.get("SHOPTALK_HISTORY_TOKENS", "8000")),
+        "results": results,
+    }, report_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Throughput of the sync agent loop vs the asyncio runner.
+
+Simulates many concurrent conversations. Each turn waits a fixed "model"
+latency (standing in for the Gemini round trip) and then runs a typical
+browse/stock/price tool chain. The sync mode serves conversations the way
+`agent.runner.run` does, one blocking turn after another; the async mode
+drives every conversation on one event loop with `tools.aio`, offloading
+storage work to the tool thread pool.
+
+    python -m bench.async_throughput --conversations 50 --turns 4 --model-latency-ms 200
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any, Dict, List
+
+from bench._common import copy_data_dir, quiet_stdout, use_data_dir, write_report
+
+
+QUERIES = ["wireless headphones", "speaker", "keyboard", "usb-c charger", "earbuds", "smart watch"]
+CART = [{"sku": "HP-AUR-100-BLK", "quantity": 1}, {"sku": "SP-NEO-10-CH", "quantity": 2}]
+
+
+def _sync_turn(tools: Any, conv: int, turn: int, latency_s: float) -> None:
+    time.sleep(latency_s)
+    tools.search_products(QUERIES[(conv + turn) % len(QUERIES)], limit=5)
+    tools.check_inventory_many([item["sku"] for item in CART])
+    tools.estimate_price(CART, destination_city="Austin", destination_country="US")
+
+
+async def _async_turn(aio: Any, conv: int, turn: int, latency_s: float) -> None:
+    await asyncio.sleep(latency_s)
+    await aio.search_products(QUERIES[(conv + turn) % len(QUERIES)], limit=5)
+    await aio.check_inventory_many([item["sku"] for item in CART])
+    await aio.estimate_price(CART, destination_city="Austin", destination_country="US")
+
+
+def _summary(mode: str, elapsed: float, latencies: List[float]) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "mode": mode,
+        "turns": len(latencies),
+        "elapsedS": round(elapsed, 3),
+        "turnsPerS": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "turnP50Ms": round(statistics.median(latencies) * 1000, 2),
+        "turnP95Ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2),
+    }
+
+
+def run_sync(conversations: int, turns: int, latency_s: float) -> Dict[str, Any]:
+    import tools
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    # Round-robin turns: a blocking loop can only ever work on one conversation.
+    for turn in range(turns):
+        for conv in range(conversations):
+            t0 = time.perf_counter()
+            _sync_turn(tools, conv, turn, latency_s)
+            latencies.append(time.perf_counter() - t0)
+    return _summary("sync", time.perf_counter() - started, latencies)
+
+
+async def _run_async(conversations: int, turns: int, latency_s: float) -> Dict[str, Any]:
+    from tools import aio
+
+    latencies: List[float] = []
+
+    async def conversation(conv: int) -> None:
+        for turn in range(turns):
+            t0 = time.perf_counter()
+            await _async_turn(aio, conv, turn, latency_s)
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation(c) for c in range(conversations)))
+    return _summary("async", time.perf_counter() - started, latencies)
+
+
+def run_async(conversations: int, turns: int, latency_s: float) -> Dict[str, Any]:
+    return asyncio.run(_run_async(conversations, turns, latency_s))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=4, help="turns per conversation")
+    parser.add_argument("--model-latency-ms", type=float, default=200.0, help="simulated model round trip per turn")
+    parser.add_argument("--report", default=None, help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    use_data_dir(copy_data_dir(), args.storage)
+    logging.basicConfig(level=logging.ERROR)
+    latency_s = args.model_latency_ms / 1000.0
+
+    with quiet_stdout():
+        sync = run_sync(args.conversations, args.turns, latency_s)
+        async_ = run_async(args.conversations, args.turns, latency_s)
+
+    write_report(
+        {
+            "storage": args.storage,
+            "conversations": args.conversations,
+            "turnsPerConversation": args.turns,
+            "modelLatencyMs": args.model_latency_ms,
+            "sync": sync,
+            "async": async_,
+            "speedup": round(sync["elapsedS"] / async_["elapsedS"], 2) if async_["elapsedS"] else None,
+        },
+        args.report,
+    )
+
+
+if __name__ == "__main__":
+    main()
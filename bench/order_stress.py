@@ -0,0 +1,152 @@
+"""Concurrent create_order stress test: no oversell, no lost orders.
+
+Fires many concurrent `create_order` calls from several processes and
+threads at one SKU with limited stock. Half of the calls go through
+`reserve_stock` first and a share of those reservations are abandoned. The
+run then checks that stock never went negative, that the stock taken equals
+the number of accepted orders, and that every accepted order is readable.
+Finally it verifies that an expired reservation releases its stock.
+
+    python -m bench.order_stress --storage json --processes 4 --threads 8 --orders 2000 --stock 500
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from bench._common import copy_data_dir, quiet_stdout, use_data_dir, write_report
+
+
+SKU = "KB-M75-LIN-GRY"
+
+
+def _set_stock(data_dir: str, sku: str, stock: int) -> None:
+    path = os.path.join(data_dir, "inventory", "inventory.json")
+    with open(path, "r", encoding="utf-8") as f:
+        rows = json.load(f)
+    for row in rows:
+        if row["sku"] == sku:
+            row["stock"] = stock
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+
+def _one_order(i: int, abandon_rate: float) -> Dict[str, Any]:
+    import tools
+
+    items = [{"sku": SKU, "quantity": 1, "unitPriceCents": 7999, "currency": "USD"}]
+    kwargs: Dict[str, Any] = {}
+    if i % 2:
+        held = tools.reserve_stock(items)
+        if "error" in held:
+            return {"ok": False, "error": held["error"]}
+        if random.random() < abandon_rate:
+            return {"ok": False, "error": "abandoned", "reservationId": held["reservationId"]}
+        kwargs["reservation_id"] = held["reservationId"]
+    res = tools.create_order(
+        items=items, destination_city="Austin", destination_country="US", breakdown={}, **kwargs
+    )
+    if res and "orderId" in res:
+        return {"ok": True, "orderId": res["orderId"]}
+    return {"ok": False, "error": (res or {}).get("error")}
+
+
+def _worker(data_dir: str, storage: str, threads: int, calls: int, abandon_rate: float, seed: int) -> List[Dict[str, Any]]:
+    use_data_dir(data_dir, storage)
+    logging.basicConfig(level=logging.ERROR)
+    # Abandoned reservations must expire within the run for their stock to be sold.
+    os.environ["SHOPTALK_RESERVATION_TTL_S"] = "1"
+    random.seed(seed)
+    with quiet_stdout(), ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda i: _one_order(i, abandon_rate), range(calls)))
+
+
+def _verify(data_dir: str, storage: str, initial_stock: int, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    use_data_dir(data_dir, storage)
+    import tools
+    from tools._shared import get_backend
+
+    with quiet_stdout():
+        accepted = [r["orderId"] for r in results if r["ok"]]
+        final_stock = int(tools.check_inventory(SKU)["stock"])
+        missing = [oid for oid in accepted if tools.get_order_status(oid) is None]
+
+        # Reservation expiry: once abandoned holds have lapsed, hold everything
+        # left, check it is unavailable, then available again after expiry.
+        expiry_ok = True
+        if final_stock > 0:
+            time.sleep(1.1)
+            backend = get_backend()
+            held = backend.reserve_stock([{"sku": SKU, "quantity": final_stock}], ttl_seconds=0.5)
+            blocked = backend.reserve_stock([{"sku": SKU, "quantity": 1}], ttl_seconds=0.5)
+            time.sleep(0.7)
+            freed = backend.reserve_stock([{"sku": SKU, "quantity": final_stock}], ttl_seconds=0.1)
+            expiry_ok = "reservationId" in held and "error" in blocked and "reservationId" in freed
+
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            errors[str(r["error"])] = errors.get(str(r["error"]), 0) + 1
+    sold = initial_stock - final_stock
+    return {
+        "accepted": len(accepted),
+        "rejected": errors,
+        "finalStock": final_stock,
+        "stockTaken": sold,
+        "duplicateOrderIds": len(accepted) - len(set(accepted)),
+        "missingOrders": len(missing),
+        "noOversell": final_stock >= 0 and sold == len(accepted),
+        "noLostOrders": not missing,
+        "reservationExpiryOk": expiry_ok,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=2000, help="total create_order attempts")
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--abandon-rate", type=float, default=0.1)
+    parser.add_argument("--report", default=None, help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    data_dir = copy_data_dir()
+    _set_stock(data_dir, SKU, args.stock)
+    per_proc = [args.orders // args.processes + (1 if i < args.orders % args.processes else 0) for i in range(args.processes)]
+
+    ctx = mp.get_context("spawn")
+    started = time.perf_counter()
+    with ctx.Pool(args.processes) as pool:
+        chunks = pool.starmap(
+            _worker,
+            [(data_dir, args.storage, args.threads, n, args.abandon_rate, i) for i, n in enumerate(per_proc)],
+        )
+    elapsed = time.perf_counter() - started
+    results = [r for chunk in chunks for r in chunk]
+
+    report = {
+        "storage": args.storage,
+        "processes": args.processes,
+        "threads": args.threads,
+        "attempts": len(results),
+        "initialStock": args.stock,
+        "elapsedS": round(elapsed, 3),
+        "attemptsPerS": round(len(results) / elapsed, 1) if elapsed else None,
+        "dataDir": data_dir,
+    }
+    report.update(_verify(data_dir, args.storage, args.stock, results))
+    write_report(report, args.report)
+    if not (report["noOversell"] and report["noLostOrders"] and report["reservationExpiryOk"]):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Serial vs parallel dispatch of the function calls in one model response.
+
+Builds the function calls a model typically emits for a multi-SKU cart
+(`check_inventory` and `get_price_for_sku` per SKU plus one
+`validate_destination`) and times dispatching them one after another (what
+automatic function calling does) against `agent.dispatch.ToolDispatcher`,
+which runs them concurrently on the tool thread pool.
+
+The local JSON store answers in microseconds, so `--io-latency-ms` adds a
+blocking sleep to every call to stand in for a remote or cold storage
+backend; the report covers both the real tools and the simulated latency.
+
+    python -m bench.parallel_tools --storage sqlite --carts 3,5,10 --io-latency-ms 5
+"""
+
+import argparse
+import functools
+import logging
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from bench._common import copy_data_dir, quiet_stdout, use_data_dir, write_report
+
+
+SKUS = [
+    "HP-AUR-100-BLK", "EB-SON-200-BLU", "SP-NEO-10-CH", "KB-M75-LIN-GRY", "MS-PRO-9-GRY",
+    "MN-VIS-27-4K-BLK", "PB-CORE-20K-BLK", "SW-TRK-LTE-RED", "TB-N11-128-GRY", "TB-N11-256-GRY",
+]
+
+
+def _cart_calls(size: int) -> List[Any]:
+    from google.genai import types
+
+    skus = [SKUS[i % len(SKUS)] for i in range(size)]
+    calls = [types.FunctionCall(name="check_inventory", args={"sku": sku}) for sku in skus]
+    calls += [types.FunctionCall(name="get_price_for_sku", args={"sku": sku}) for sku in skus]
+    calls.append(types.FunctionCall(name="validate_destination", args={"city": "Austin", "country": "US"}))
+    return calls
+
+
+def _with_latency(func: Callable[..., Any], latency_s: float) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(latency_s)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _time_ms(fn: Callable[[], Any], repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _scenario(functions: List[Callable[..., Any]], size: int, repeats: int) -> Dict[str, Any]:
+    from agent.dispatch import ToolDispatcher
+
+    dispatcher = ToolDispatcher(functions)
+    calls = _cart_calls(size)
+    serial = _time_ms(lambda: [dispatcher.run([call]) for call in calls], repeats)
+    parallel = _time_ms(lambda: dispatcher.run(calls), repeats)
+    return {
+        "cartSkus": size,
+        "calls": len(calls),
+        "serialMs": round(serial, 3),
+        "parallelMs": round(parallel, 3),
+        "savedMs": round(serial - parallel, 3),
+        "speedup": round(serial / parallel, 2) if parallel else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--carts", default="3,5,10", help="comma-separated cart sizes (SKUs per cart)")
+    parser.add_argument("--io-latency-ms", type=float, default=5.0, help="simulated blocking storage latency per call")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--report", default=None, help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    use_data_dir(copy_data_dir(), args.storage)
+    logging.basicConfig(level=logging.ERROR)
+    import tools
+
+    real = [tools.check_inventory, tools.get_price_for_sku, tools.validate_destination]
+    slow = [_with_latency(f, args.io_latency_ms / 1000.0) for f in real]
+    sizes = [int(s) for s in args.carts.split(",") if s.strip()]
+
+    with quiet_stdout():
+        report = {
+            "storage": args.storage,
+            "repeats": args.repeats,
+            "ioLatencyMs": args.io_latency_ms,
+            "realTools": [_scenario(real, n, args.repeats) for n in sizes],
+            "withIoLatency": [_scenario(slow, n, args.repeats) for n in sizes],
+        }
+    write_report(report, args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Token cost of tool results: verbose vs compact response shapes.
+
+Replays the benchmark conversation (`agent.replay_client.DEFAULT_SCRIPT`, or
+`--script`) twice against a copy of `data/`, first with
+`SHOPTALK_COMPACT_RESPONSES=0` (full variant lists, raw product objects, no
+budget) and then with the compact defaults (`tools._shaping`). For each
+mode it reports the serialized size of every scripted tool result and the
+prompt size the model would be sent over the whole conversation. Chat
+history is resent with every request, so a large early result is paid for
+again on each later request. Tokens are estimated at 4 bytes per token.
+
+    python -m bench.payload_size
+    python -m bench.payload_size --script recorded.json --report payload.json
+"""
+
+import argparse
+import os
+from typing import Any, Dict, List
+
+from bench._common import copy_data_dir, quiet_stdout, use_data_dir, write_report
+
+
+BYTES_PER_TOKEN = 4
+
+
+def _measure(script: List[Dict[str, Any]], compact: bool) -> Dict[str, Any]:
+    import tools
+    from agent.dispatch import ToolDispatcher, send_message
+    from agent.replay_client import ReplayGeminiClient
+    from agent.runner import TOOL_FUNCTIONS, build_config
+    from tools._shaping import json_size
+
+    os.environ["SHOPTALK_COMPACT_RESPONSES"] = "1" if compact else "0"
+    tool_bytes: Dict[str, int] = {}
+    for turn in script:
+        for round_calls in turn.get("rounds") or []:
+            for call in round_calls:
+                result = getattr(tools, call["name"])(**(call.get("args") or {}))
+                tool_bytes[call["name"]] = tool_bytes.get(call["name"], 0) + json_size(result)
+
+    client = ReplayGeminiClient(script)
+    chat = client.start_chat()
+    config = build_config()
+    dispatcher = ToolDispatcher(TOOL_FUNCTIONS)
+    for n in range(len(script)):
+        send_message(chat, f"turn {n}", config, dispatcher)
+    stats = client.stats.snapshot()
+    return {
+        "toolResultBytes": dict(sorted(tool_bytes.items())),
+        "toolResultBytesTotal": sum(tool_bytes.values()),
+        "modelRequests": stats["requests"],
+        "promptTokensEstimate": stats["promptChars"] // BYTES_PER_TOKEN,
+        # The same without the tool declarations, which do not depend on the response shapes.
+        "historyTokensEstimate": (stats["promptChars"] - stats["declarationChars"]) // BYTES_PER_TOKEN,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", default=None, help="replay script (JSON); defaults to the built-in conversation")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--report", default=None)
+    args = parser.parse_args()
+
+    use_data_dir(copy_data_dir(), args.storage)
+    # Results must be recomputed in each mode, not served from the tool cache.
+    os.environ["SHOPTALK_TOOL_CACHE_SIZE"] = "0"
+    from agent.replay_client import DEFAULT_SCRIPT, load_script
+
+    script = load_script(args.script) if args.script else DEFAULT_SCRIPT
+    with quiet_stdout():
+        verbose = _measure(script, compact=False)
+        compact = _measure(script, compact=True)
+    write_report({
+        "turns": len(script),
+        "verbose": verbose,
+        "compact": compact,
+        "toolBytesSavedPct": round(100 * (1 - compact["toolResultBytesTotal"] / verbose["toolResultBytesTotal"]), 1)
+        if verbose["toolResultBytesTotal"] else None,
+        "promptTokensSavedPct": round(100 * (1 - compact["promptTokensEstimate"] / verbose["promptTokensEstimate"]), 1)
+        if verbose["promptTokensEstimate"] else None,
+        "historyTokensSavedPct": round(100 * (1 - compact["historyTokensEstimate"] / verbose["historyTokensEstimate"]), 1)
+        if verbose["historyTokensEstimate"] else None,
+    }, args.report)
+
+
+if __name__ == "__main__":
+    main()
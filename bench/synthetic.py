@@ -0,0 +1,225 @@
+"""Synthetic catalog, inventory and order data at any size.
+
+Writes a `data/`-shaped directory (see `data/*/README.md` for the schemas):
+`catalog/products.json`, `inventory/inventory.json`,
+`orders/orders.jsonl` and optionally `shipping/destinations.json`. Output
+is streamed, so million-product catalogs do not need to fit in memory
+while generating, and a fixed seed makes runs reproducible.
+
+    python -m bench.synthetic --products 100000 --variants 3 --orders 10000 --out /tmp/shoptalk-100k
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import Any, Dict, Iterator, List
+
+from bench._common import ROOT
+
+
+CATEGORIES = [
+    "Headphones", "Earbuds", "Speakers", "Keyboards", "Mice", "Monitors", "Power", "Smart Home",
+    "Tablets", "Wearables", "Cameras", "Chargers", "Cables", "Storage", "Routers", "Microphones",
+    "Webcams", "Docks", "Laptops", "Phones", "Gaming", "Drones", "Projectors", "Printers",
+]
+ADJECTIVES = [
+    "Aurora", "Nova", "Pulse", "Echo", "Vertex", "Zenith", "Orbit", "Flux", "Quantum", "Prism",
+    "Summit", "Apex", "Drift", "Stellar", "Titan", "Vista", "Lumen", "Core", "Swift", "Halo",
+]
+NOUNS = {
+    "Headphones": "Headphones", "Earbuds": "Earbuds", "Speakers": "Speaker", "Keyboards": "Keyboard",
+    "Mice": "Mouse", "Monitors": "Monitor", "Power": "Power Bank", "Smart Home": "Hub", "Tablets": "Tablet",
+    "Wearables": "Watch", "Cameras": "Camera", "Chargers": "Charger", "Cables": "Cable", "Storage": "SSD",
+    "Routers": "Router", "Microphones": "Microphone", "Webcams": "Webcam", "Docks": "Dock", "Laptops": "Laptop",
+    "Phones": "Phone", "Gaming": "Controller", "Drones": "Drone", "Projectors": "Projector", "Printers": "Printer",
+}
+FEATURES = [
+    "wireless", "bluetooth", "usb-c", "noise cancelling", "waterproof", "fast charging", "compact",
+    "ergonomic", "rgb", "4k", "long battery", "lightweight", "premium", "travel", "studio", "gaming",
+]
+COLORS = ["Black", "White", "Silver", "Blue", "Red", "Green", "Gray", "Rose"]
+CAPACITIES = ["64GB", "128GB", "256GB", "512GB", "1TB"]
+SIZES = ["S", "M", "L", "XL"]
+CITIES = [("New York", "US"), ("Austin", "US"), ("Boston", "US"), ("London", "UK"), ("Berlin", "DE"), ("Paris", "FR")]
+CITY_SYLLABLES = ["ber", "lin", "mar", "ton", "ville", "ford", "ham", "ros", "ka", "len", "dor", "ia", "port", "stad", "vik", "sal"]
+COUNTRIES = ["US", "UK", "DE", "FR", "ES", "IT", "NL", "JP", "CA", "AU"]
+
+
+def sku_for(product_index: int, variant_index: int) -> str:
+    return f"SYN-{product_index:07d}-{variant_index:02d}"
+
+
+def product_id_for(product_index: int) -> str:
+    return f"syn-{product_index:07d}"
+
+
+def iter_products(count: int, variants: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        features = rng.sample(FEATURES, 3)
+        name = f"{rng.choice(ADJECTIVES)} {NOUNS[category]} {100 + i % 900}"
+        base_price = rng.randrange(999, 149999, 100)
+        out_variants = []
+        for v in range(variants):
+            attrs: Dict[str, str] = {"color": COLORS[(i + v) % len(COLORS)]}
+            if category in ("Tablets", "Phones", "Storage", "Laptops"):
+                attrs["capacity"] = CAPACITIES[v % len(CAPACITIES)]
+            elif category == "Wearables":
+                attrs["size"] = SIZES[v % len(SIZES)]
+            out_variants.append({
+                "sku": sku_for(i, v),
+                "attributes": attrs,
+                "listPrice": base_price + (2000 * v if "capacity" in attrs else 0),
+                "currency": "USD",
+            })
+        yield {
+            "id": product_id_for(i),
+            "name": name,
+            "category": category,
+            "shortDescription": f"{features[0].capitalize()} {NOUNS[category].lower()} with {features[1]} and {features[2]} design.",
+            "specs": {"weightGrams": rng.randrange(20, 3000), "warrantyMonths": rng.choice([12, 24, 36])},
+            "variants": out_variants,
+            "tags": [f.replace(" ", "-") for f in features] + [category.lower().replace(" ", "-")],
+        }
+
+
+def iter_destinations(count: int, seed: int = 0) -> Iterator[Dict[str, str]]:
+    """`count` distinct synthetic cities, after the real ones in `CITIES`."""
+    rng = random.Random(seed + 3)
+    seen = set()
+    for city, country in CITIES:
+        seen.add((city.lower(), country))
+        yield {"city": city, "country": country}
+    while len(seen) < count:
+        name = "".join(rng.choice(CITY_SYLLABLES) for _ in range(rng.randrange(2, 4))).capitalize()
+        country = rng.choice(COUNTRIES)
+        if (name.lower(), country) not in seen:
+            seen.add((name.lower(), country))
+            yield {"city": name, "country": country}
+
+
+def _write_destinations(path: str, count: int, seed: int) -> int:
+    # Regions and countries come from the bundled table; cities are generated.
+    with open(os.path.join(ROOT, "data", "shipping", "destinations.json"), "r", encoding="utf-8") as f:
+        table = json.load(f)
+    table["destinations"] = list(iter_destinations(count, seed))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, separators=(",", ":"))
+    return len(table["destinations"])
+
+
+def _write_json_array(path: str, rows: Iterator[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for row in rows:
+            if count:
+                f.write(",\n")
+            f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def _iter_inventory(products: int, variants: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed + 1)
+    for i in range(products):
+        for v in range(variants):
+            stock = 0 if rng.random() < 0.1 else rng.randrange(1, 500)
+            yield {"sku": sku_for(i, v), "stock": stock, "restockEtaDays": rng.randrange(1, 30) if stock == 0 else None}
+
+
+def _iter_orders(count: int, products: int, variants: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed + 2)
+    started = time.time() - 86400 * 90
+    statuses = ["received", "packed", "shipped", "delivered"]
+    for n in range(count):
+        items = [
+            {"sku": sku_for(rng.randrange(products), rng.randrange(variants)), "quantity": rng.randrange(1, 4),
+             "unitPriceCents": rng.randrange(999, 149999, 100), "currency": "USD"}
+            for _ in range(rng.randrange(1, 4))
+        ]
+        subtotal = sum(item["quantity"] * item["unitPriceCents"] for item in items)
+        city, country = rng.choice(CITIES)
+        yield {
+            "orderId": f"{n:08x}",
+            "items": items,
+            "destinationCity": city,
+            "destinationCountry": country,
+            "breakdown": {"subtotalCents": subtotal, "totalCents": subtotal},
+            "status": rng.choice(statuses),
+            "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started + n * 60)),
+        }
+
+
+def generate(
+    out_dir: str, *, products: int, variants: int = 2, orders: int = 0, destinations: int = 0, seed: int = 0
+) -> Dict[str, Any]:
+    """Write a synthetic data directory to `out_dir` and return a summary.
+
+    With `destinations` > 0, `shipping/destinations.json` lists that many
+    cities; otherwise the bundled destinations table is used.
+    """
+    variants = max(1, variants)
+    for sub in ("catalog", "inventory", "orders"):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+    started = time.perf_counter()
+    _write_json_array(os.path.join(out_dir, "catalog", "products.json"), iter_products(products, variants, seed))
+    skus = _write_json_array(os.path.join(out_dir, "inventory", "inventory.json"), _iter_inventory(products, variants, seed))
+    with open(os.path.join(out_dir, "orders", "orders.jsonl"), "w", encoding="utf-8") as f:
+        for row in _iter_orders(orders, products, variants, seed):
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+    if destinations > 0:
+        destinations = _write_destinations(os.path.join(out_dir, "shipping", "destinations.json"), destinations, seed)
+    return {
+        "dataDir": out_dir,
+        "products": products,
+        "variantsPerProduct": variants,
+        "skus": skus,
+        "orders": orders,
+        "destinations": destinations,
+        "seed": seed,
+        "generateS": round(time.perf_counter() - started, 3),
+    }
+
+
+def sample_queries(rng: random.Random, n: int) -> List[str]:
+    """Search queries drawn from the generator's vocabulary (some misspelled or partial)."""
+    out = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(f"{rng.choice(FEATURES)} {NOUNS[rng.choice(CATEGORIES)].lower()}")
+        elif kind < 0.7:
+            out.append(rng.choice(ADJECTIVES).lower())
+        elif kind < 0.85:
+            word = NOUNS[rng.choice(CATEGORIES)].lower()
+            out.append(word[: max(3, len(word) - 2)])
+        else:
+            word = rng.choice(FEATURES).split()[0]
+            i = rng.randrange(1, len(word))
+            out.append(word[:i] + word[i + 1:])
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--variants", type=int, default=2, help="variants per product")
+    parser.add_argument("--orders", type=int, default=0, help="orders in the ledger")
+    parser.add_argument("--destinations", type=int, default=0, help="cities in the destinations table (0 = bundled)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="directory to write (data/-shaped)")
+    args = parser.parse_args()
+    print(json.dumps(generate(
+        args.out, products=args.products, variants=args.variants, orders=args.orders,
+        destinations=args.destinations, seed=args.seed,
+    ), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Latency and memory of every tool across synthetic catalog sizes.
+
+For each catalog size a fresh synthetic data directory is generated
+(`bench.synthetic`) and a separate process measures:
+
+- cold start: time and RSS growth of the first catalog access (load/import);
+- per tool: p50/p90/p99/max latency over randomized arguments for every
+  function exported by `tools/__init__.py` (a tool without a case here is
+  listed under `uncovered`, so new tools cannot silently go unmeasured);
+- the order write path (`reserve_stock`, `create_order`, `get_order_status`);
+- destination lookups against a `--destinations`-city table (some misspelled).
+
+The tool result cache is off by default so repeated arguments measure the
+real work (`--cache` turns it on). The JSON report is stable and meant to be
+diffed between releases; `--baseline old.json` flags tools whose p50 grew by
+more than `--threshold` and exits non-zero.
+
+    python -m bench.tool_suite --sizes 1000,100000 --variants 3 --report bench-tools.json
+    python -m bench.tool_suite --sizes 1000000 --storage sqlite --iterations 100
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bench._common import ROOT, quiet_stdout, use_data_dir, write_report
+
+
+# Cities with different pricing rules (domestic, EU, UK) for the multi-destination quote.
+DESTINATIONS = [{"city": "Austin", "country": "US"}, {"city": "Berlin", "country": "DE"}, {"city": "London", "country": "UK"}]
+
+Case = Callable[[random.Random], Tuple[tuple, Dict[str, Any]]]
+
+# Tools that change state; they run `--order-iterations` times instead of `--iterations`.
+WRITE_TOOLS = {"reserve_stock", "create_order"}
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _cases(products: int, variants: int, orders: int, destinations: int) -> Dict[str, Case]:
+    from bench.synthetic import CATEGORIES, COLORS, COUNTRIES, iter_destinations, product_id_for, sample_queries, sku_for
+
+    queries = sample_queries(random.Random(7), 256)
+    cities = list(iter_destinations(destinations))
+
+    def city(rng: random.Random) -> Tuple[tuple, Dict[str, Any]]:
+        row = rng.choice(cities)
+        name = row["city"]
+        if rng.random() < 0.2 and len(name) > 5:
+            # Misspelled: exercises the fuzzy lookup.
+            i = rng.randrange(1, len(name))
+            name = name[:i] + name[i + 1:]
+        return (name, row["country"]), {}
+
+    def pid(rng: random.Random) -> str:
+        return product_id_for(rng.randrange(products))
+
+    def sku(rng: random.Random) -> str:
+        return sku_for(rng.randrange(products), rng.randrange(variants))
+
+    def cart(rng: random.Random, n: int = 3) -> List[Dict[str, Any]]:
+        return [{"sku": sku(rng), "quantity": 1} for _ in range(n)]
+
+    def create_order(rng: random.Random) -> Tuple[tuple, Dict[str, Any]]:
+        items = [{"sku": sku(rng), "quantity": 1, "unitPriceCents": 1999, "currency": "USD"}]
+        return (), {"items": items, "destination_city": "Austin", "destination_country": "US", "breakdown": {}}
+
+    return {
+        "search_products": lambda rng: ((rng.choice(queries),), {"limit": 10}),
+        "filter_products": lambda rng: ((), {
+            "category": rng.choice(CATEGORIES), "attributes": {"color": rng.choice(COLORS)},
+            "max_price_cents": rng.choice([5000, 20000, 100000]), "limit": 10,
+        }),
+        "get_product_details": lambda rng: ((pid(rng),), {}),
+        "check_inventory": lambda rng: ((sku(rng),), {}),
+        "check_inventory_many": lambda rng: (([sku(rng) for _ in range(10)],), {}),
+        "estimate_price": lambda rng: ((cart(rng),), {"destination_city": "Austin", "destination_country": "US"}),
+        "estimate_price_many": lambda rng: ((DESTINATIONS,), {"carts": [{"items": cart(rng)} for _ in range(2)]}),
+        "suggest_alternatives": lambda rng: ((pid(rng),), {"max_price_cents": 50000}),
+        "reserve_stock": lambda rng: ((cart(rng, 1),), {}),
+        "create_order": create_order,
+        "get_order_status": lambda rng: ((f"{rng.randrange(max(orders, 1)):08x}",), {}),
+        "list_supported_destinations": lambda rng: ((), {"country": rng.choice(COUNTRIES)}),
+        "validate_destination": city,
+        "list_categories": lambda rng: ((), {}),
+        "list_products_by_category": lambda rng: ((rng.choice(CATEGORIES),), {"limit": 20}),
+        "list_products": lambda rng: ((), {"limit": 20}),
+        "list_products_count": lambda rng: ((), {}),
+        "list_variants": lambda rng: ((pid(rng),), {}),
+        "validate_sku": lambda rng: ((sku(rng),), {}),
+        "get_price_for_sku": lambda rng: ((sku(rng),), {}),
+    }
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+    return {
+        "n": len(ordered),
+        "meanMs": round(statistics.fmean(ordered), 4),
+        "p50Ms": pick(0.50),
+        "p90Ms": pick(0.90),
+        "p99Ms": pick(0.99),
+        "maxMs": round(ordered[-1], 4),
+    }
+
+
+def _exported_tools(tools_module: Any) -> Dict[str, Callable[..., Any]]:
+    return {
+        name: value for name, value in vars(tools_module).items()
+        if callable(value) and not name.startswith("_") and getattr(value, "__module__", "").startswith("tools.")
+    }
+
+
+def _measure_size(products: int, variants: int, orders: int, destinations: int, storage: str, iterations: int,
+                  order_iterations: int, cache: bool, seed: int) -> Dict[str, Any]:
+    from bench.synthetic import generate
+
+    data_dir = os.path.join(tempfile.mkdtemp(prefix=f"shoptalk-bench-{products}-"), "data")
+    generated = generate(
+        data_dir, products=products, variants=variants, orders=orders, destinations=destinations, seed=seed
+    )
+    use_data_dir(data_dir, storage)
+    if not cache:
+        os.environ["SHOPTALK_TOOL_CACHE_SIZE"] = "0"
+    os.environ["SHOPTALK_RESERVATION_TTL_S"] = "30"
+    logging.basicConfig(level=logging.ERROR)
+
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    import tools
+    from tools._shared import get_backend
+
+    backend = get_backend()
+    backend.count_products()
+    backend.inventory("")
+    cold_start_s = time.perf_counter() - started
+    rss_loaded = _rss_bytes()
+
+    exported = _exported_tools(tools)
+    cases = _cases(products, variants, orders, generated["destinations"])
+    rng = random.Random(seed)
+    results: Dict[str, Any] = {}
+    with quiet_stdout():
+        for name in sorted(exported):
+            case = cases.get(name)
+            if case is None:
+                continue
+            func = exported[name]
+            n = order_iterations if name in WRITE_TOOLS else iterations
+            args, kwargs = case(rng)
+            func(*args, **kwargs)  # warm-up
+            samples = []
+            for _ in range(n):
+                args, kwargs = case(rng)
+                t0 = time.perf_counter()
+                func(*args, **kwargs)
+                samples.append((time.perf_counter() - t0) * 1000)
+            results[name] = _percentiles(samples)
+
+    return {
+        "products": products,
+        "skus": generated["skus"],
+        "orders": orders,
+        "destinations": generated["destinations"],
+        "generateS": generated["generateS"],
+        "coldStartS": round(cold_start_s, 3),
+        "memory": {
+            "rssBeforeLoadMb": round(rss_before / 2**20, 1),
+            "rssAfterLoadMb": round(rss_loaded / 2**20, 1),
+            "loadGrowthMb": round((rss_loaded - rss_before) / 2**20, 1),
+            "peakRssMb": round((_peak_rss_bytes() or 0) / 2**20, 1),
+        },
+        "tools": results,
+        "uncovered": sorted(set(exported) - set(cases)),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Tools whose p50 in `report` exceeds `threshold` x the baseline's p50."""
+    regressions = []
+    for size, current in report["sizes"].items():
+        before = baseline.get("sizes", {}).get(size)
+        if not before:
+            continue
+        for tool, stats in current["tools"].items():
+            old = before["tools"].get(tool)
+            # Ignore sub-10µs noise.
+            if old and stats["p50Ms"] > max(old["p50Ms"], 0.01) * threshold:
+                regressions.append({
+                    "size": size, "tool": tool, "baselineP50Ms": old["p50Ms"], "p50Ms": stats["p50Ms"],
+                    "ratio": round(stats["p50Ms"] / old["p50Ms"], 2) if old["p50Ms"] else None,
+                })
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000", help="comma-separated product counts (e.g. 1000,100000,1000000)")
+    parser.add_argument("--variants", type=int, default=2, help="variants per product")
+    parser.add_argument("--orders", type=int, default=10000, help="orders in the synthetic ledger")
+    parser.add_argument("--destinations", type=int, default=20000, help="cities in the destinations table")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--iterations", type=int, default=500, help="calls per read-only tool")
+    parser.add_argument("--order-iterations", type=int, default=50, help="calls per state-changing tool")
+    parser.add_argument("--cache", action="store_true", help="keep the tool result cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default=None, help="write the JSON report to this path")
+    parser.add_argument("--baseline", default=None, help="previous report to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="p50 ratio that counts as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    ctx = mp.get_context("spawn")
+    report: Dict[str, Any] = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "variantsPerProduct": args.variants,
+            "destinations": args.destinations,
+            "iterations": args.iterations,
+            "orderIterations": args.order_iterations,
+            "cache": args.cache,
+            "seed": args.seed,
+        },
+        "sizes": {},
+    }
+    for size in sizes:
+        # One process per size: each starts with a cold, unshared catalog and a clean RSS baseline.
+        with ctx.Pool(1) as pool:
+            report["sizes"][str(size)] = pool.apply(
+                _measure_size,
+                (size, args.variants, args.orders, args.destinations, args.storage, args.iterations, args.order_iterations, args.cache, args.seed),
+            )
+
+    regressions: List[Dict[str, Any]] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = regressions
+    write_report(report, args.report)
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
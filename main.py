@@ -3,13 +3,58 @@
 Purpose: keep top-level clean and delegate to the agent package.
 - The agent REPL and wiring live in `agent/runner.py`.
 - This file only starts the demo agent.
-- In future this agent can be exposed via API to be consumed by the frontend
+- `agent/server.py` exposes the agent over HTTP/WebSocket for a frontend
+
+Usage:
+- `python main.py`: start the terminal REPL.
+- `python main.py repl --async`: the same REPL on the asyncio client and async tools.
+- `python main.py repl --stream`: print replies as they stream, with tool progress (combines with `--async`).
+- `python main.py serve [--host H] [--port P]`: serve chat sessions over HTTP/WebSocket.
+- `python main.py import-sqlite [--db PATH]`: (re)build the SQLite store from `data/`.
 """
 
-from agent import run
+import argparse
 
 
-if __name__ == "__main__":
-    run()
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ShopTalk demo agent")
+    sub = parser.add_subparsers(dest="command")
+    repl = sub.add_parser("repl", help="start the terminal REPL (default)")
+    repl.add_argument("--async", dest="use_async", action="store_true", help="use the asyncio runner")
+    repl.add_argument("--stream", action="store_true", help="stream replies and tool progress as they arrive")
+    srv = sub.add_parser("serve", help="serve chat sessions over HTTP and WebSocket")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8080)
+    imp = sub.add_parser("import-sqlite", help="import the JSON files under data/ into SQLite")
+    imp.add_argument("--db", default=None, help="database path (default: SHOPTALK_SQLITE_PATH or data/shoptalk.db)")
+    args = parser.parse_args()
+
+    if args.command == "import-sqlite":
+        import os
+
+        from tools._backend import DATA_DIR
+        from tools._sqlite import import_json
+
+        db_path = args.db or os.getenv("SHOPTALK_SQLITE_PATH") or os.path.join(DATA_DIR, "shoptalk.db")
+        print(import_json(db_path, DATA_DIR))
+        return
+
+    if args.command == "serve":
+        from agent.server import serve
 
+        serve(args.host, args.port)
+        return
 
+    if getattr(args, "use_async", False):
+        from agent import run_async_repl
+
+        run_async_repl(stream=args.stream)
+        return
+
+    from agent import run
+
+    run(stream=getattr(args, "stream", False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Shared pytest setup.
+
+`tools` reads its data directory once, at import, so the whole session
+runs against one private copy of `data/`; nothing lands in the repo's.
+"""
+
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from bench._common import copy_data_dir, use_data_dir  # noqa: E402
+
+DATA_DIR = copy_data_dir()
+use_data_dir(DATA_DIR, os.getenv("SHOPTALK_TEST_STORAGE", "json"))
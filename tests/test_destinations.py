@@ -0,0 +1,54 @@
+"""Destination resolution: exact, alias and one-edit typos (insertion, deletion, substitution, transposition)."""
+
+import pytest
+
+import tools
+
+
+@pytest.mark.parametrize(
+    "city,country,expected",
+    [
+        # insertion
+        ("Londonn", "UK", "London"),
+        ("Seattlle", "US", "Seattle"),
+        ("Bosston", "US", "Boston"),
+        ("Chicagoo", "US", "Chicago"),
+        # deletion
+        ("Seatle", "US", "Seattle"),
+        ("Chcago", "US", "Chicago"),
+        # substitution
+        ("Berlon", "DE", "Berlin"),
+        # transposition
+        ("Lodnon", "UK", "London"),
+        ("Saettle", "US", "Seattle"),
+    ],
+)
+def test_one_edit_typos_resolve(city, country, expected):
+    out = tools.validate_destination(city, country)
+    assert out["ok"], out
+    assert out["matchedBy"] == "fuzzy"
+    assert out["normalized"]["city"] == expected
+
+
+@pytest.mark.parametrize("city,country", [("London", "UK"), ("london", "United Kingdom"), ("SEATTLE", "us")])
+def test_exact_match(city, country):
+    out = tools.validate_destination(city, country)
+    assert out["ok"] and out["matchedBy"] == "exact"
+
+
+@pytest.mark.parametrize(
+    "city,country",
+    [
+        ("Londonnn", "UK"),  # two edits
+        ("Lndonn", "UK"),  # two edits
+        ("London", "US"),  # right city, wrong country
+    ],
+)
+def test_too_far_or_wrong_country_is_rejected(city, country):
+    assert not tools.validate_destination(city, country)["ok"]
+
+
+def test_fuzzy_match_prices_like_the_real_city():
+    typo = tools.estimate_price([{"sku": "HP-AUR-100-BLK"}], destination_city="Londonn", destination_country="UK")
+    exact = tools.estimate_price([{"sku": "HP-AUR-100-BLK"}], destination_city="London", destination_country="UK")
+    assert typo["breakdown"] == exact["breakdown"]
@@ -0,0 +1,41 @@
+"""filter_products bounds and FacetIndex paging."""
+
+import random
+
+import tools
+from tools._facets import FacetResult, iter_positions, positions
+
+
+def _ids(out):
+    return [item["id"] for item in out["results"]]
+
+
+def test_numeric_strings_are_accepted_as_bounds():
+    as_numbers = tools.filter_products(specs={"batteryLifeHours": {"min": 30}}, max_price_cents=40000, limit=50)
+    as_strings = tools.filter_products(specs={"batteryLifeHours": {"min": "30"}}, max_price_cents="40000", limit=50)
+    assert "error" not in as_strings
+    assert _ids(as_strings) == _ids(as_numbers)
+    assert as_strings["total"] == as_numbers["total"]
+
+
+def test_non_numeric_bound_returns_an_error():
+    out = tools.filter_products(specs={"batteryLifeHours": {"min": "thirty"}})
+    assert "batteryLifeHours" in out["error"]
+    assert "error" in tools.filter_products(min_price_cents="cheap")
+
+
+def test_iter_positions_matches_positions():
+    rng = random.Random(7)
+    for size in (0, 1, 63, 64, 65, 1000):
+        bits = sum(1 << i for i in range(size) if rng.random() < 0.3)
+        for start in (0, 1, size // 2, size):
+            assert list(iter_positions(bits, start)) == [p for p in positions(bits) if p >= start]
+
+
+def test_result_page_resumes_after_a_position():
+    result = FacetResult(0b1011_0110, None, {})
+    assert result.total == 5
+    assert result.page(-1, 2) == [1, 2]
+    assert result.page(2, 10) == [4, 5, 7]
+    assert result.page(7, 10) == []
+    assert result.page(-1, 0) == []
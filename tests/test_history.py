@@ -0,0 +1,102 @@
+"""History compaction keeps the latest turns intact and carries facts of dropped ones forward."""
+
+from google.genai import types
+
+from agent.history import SUMMARY_HEADER, HistoryState, compact_history
+
+
+def _turn(i):
+    search = types.FunctionCall(id=f"s{i}", name="search_products", args={"query": f"query {i}"})
+    estimate = types.FunctionCall(id=f"e{i}", name="estimate_price", args={"items": [{"sku": f"SKU-{i}"}]})
+    results = [{"id": f"p{i}-{n}", "name": f"Product {n}", "shortDescription": "x" * 200} for n in range(10)]
+    return [
+        types.Content(role="user", parts=[types.Part(text=f"question {i}")]),
+        types.Content(role="model", parts=[types.Part(function_call=search), types.Part(function_call=estimate)]),
+        types.Content(role="user", parts=[
+            types.Part(function_response=types.FunctionResponse(id=f"s{i}", name="search_products", response={"result": {"results": results}})),
+            types.Part(function_response=types.FunctionResponse(id=f"e{i}", name="estimate_price", response={"result": {"total": i}})),
+        ]),
+        types.Content(role="model", parts=[types.Part(text=f"answer {i}")]),
+    ]
+
+
+def _history(turns):
+    return [content for i in range(turns) for content in _turn(i)]
+
+
+def test_latest_turns_are_kept_verbatim():
+    history = _history(12)
+    latest = history[-8:]
+    report = compact_history(history, HistoryState(), budget_tokens=3000, keep_turns=2)
+    assert report["sentTokens"] < report["historyTokens"]
+    assert report["droppedTurns"] > 0
+    assert history[-8:] == latest
+    assert all(a is b for a, b in zip(history[-8:], latest))
+
+
+def test_dropped_turns_leave_a_summary_with_their_facts():
+    history = _history(12)
+    report = compact_history(history, HistoryState(), budget_tokens=3000, keep_turns=2)
+    summary = history[0].parts[0].text
+    assert summary.startswith(SUMMARY_HEADER)
+    for i in range(report["droppedTurns"]):
+        assert f"User asked: question {i}" in summary
+        assert f'estimate_price({{"items":[{{"sku":"SKU-{i}"}}]}}) -> {{"result":{{"total":{i}}}}}' in summary
+    assert "search_products(" not in summary
+    # The first remaining turn still starts with its own question.
+    assert history[0].parts[-1].text.startswith("question ")
+
+
+def test_old_non_fact_responses_are_elided_before_dropping():
+    history = _history(4)
+    report = compact_history(history, HistoryState(), budget_tokens=2000, keep_turns=2)
+    assert report["droppedTurns"] == 0 and report["elidedResponses"] == 2
+    old = history[2].parts
+    assert old[0].function_response.response["elided"] is True
+    assert old[1].function_response.response == {"result": {"total": 0}}
+    recent = history[-2].parts[0].function_response.response
+    assert "elided" not in recent
+
+
+def test_repeated_compaction_stays_within_budget_and_keeps_latest():
+    history, state = [], HistoryState()
+    for i in range(30):
+        history.extend(_turn(i))
+        compact_history(history, state, budget_tokens=3000, keep_turns=2)
+        assert history[-4].parts[0].text == f"question {i}"
+        assert history[-1].parts[0].text == f"answer {i}"
+        if i:
+            assert history[-8].parts[-1].text == f"question {i - 1}"
+    assert sum(1 for c in history if c.parts and (c.parts[0].text or "").startswith(SUMMARY_HEADER)) == 1
+
+
+def test_under_budget_history_is_untouched():
+    history = _history(2)
+    before = list(history)
+    report = compact_history(history, HistoryState(), budget_tokens=100_000, keep_turns=2)
+    assert history == before and report["savedTokens"] == 0
+
+
+def test_sdk_chat_histories_both_stay_bounded():
+    from google.genai.chats import Chat
+
+    from agent.history import compact
+
+    chat = Chat(modules=None, model="test", history=[])
+    sizes = []
+    for i in range(60):
+        compact(chat, budget_tokens=3000, keep_turns=2)
+        user, *output = _turn(i)
+        chat.record_history(user, output, True)
+        if i % 7 == 0:
+            # An invalid model answer: recorded only in the comprehensive history.
+            chat.record_history(types.Content(role="user", parts=[types.Part(text="retry")]), [], False)
+        sizes.append((len(chat.get_history(curated=True)), len(chat.get_history())))
+    compact(chat, budget_tokens=3000, keep_turns=2)
+    curated, full = chat.get_history(curated=True), chat.get_history()
+    assert full == curated and full is not curated
+    # Without compaction there would be 4 curated and ~4.1 comprehensive entries per turn.
+    assert max(c for c, _ in sizes) <= 40
+    assert max(f for _, f in sizes) <= 41
+    assert sizes[-1] == sizes[30]
+    assert curated[-1].parts[0].text == "answer 59"
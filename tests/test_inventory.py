@@ -0,0 +1,105 @@
+"""Stock journal: levels recorded by one store are seen by others and survive a fold."""
+
+import json
+import os
+import sqlite3
+
+from bench._common import copy_data_dir
+from tools._inventory import InventoryStore, journal_path
+from tools._sqlite import import_json
+
+
+SKU = "HP-AUR-100-BLK"
+
+
+def _store():
+    return InventoryStore(os.path.join(copy_data_dir(), "inventory", "inventory.json"))
+
+
+def test_set_stock_appends_without_rewriting_inventory_json():
+    store = _store()
+    before = os.path.getmtime(store.path), os.path.getsize(store.path)
+    other = InventoryStore(store.path)
+    assert other.get(SKU)["stock"] == store.get(SKU)["stock"]
+
+    store.set_stock({SKU: 3})
+    store.set_stock({SKU: 2})
+
+    assert (os.path.getmtime(store.path), os.path.getsize(store.path)) == before
+    assert store.get(SKU)["stock"] == 2
+    assert other.get(SKU)["stock"] == 2
+    assert InventoryStore(store.path).get(SKU)["stock"] == 2
+
+
+def test_fold_rewrites_inventory_json_and_empties_the_journal():
+    store = _store()
+    other = InventoryStore(store.path)
+    other.get(SKU)
+    store.set_stock({SKU: 7})
+    with store._lock:
+        store._fold_journal()
+
+    assert os.path.getsize(journal_path(store.path)) == 0
+    with open(store.path, encoding="utf-8") as f:
+        assert [row["stock"] for row in json.load(f) if row["sku"] == SKU] == [7]
+
+    store.set_stock({SKU: 5})
+    assert other.get(SKU)["stock"] == 5
+
+
+def test_sqlite_import_applies_the_journal(tmp_path):
+    store = _store()
+    store.set_stock({SKU: 1})
+    db_path = str(tmp_path / "shoptalk.db")
+    import_json(db_path, os.path.dirname(os.path.dirname(store.path)))
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT stock FROM inventory WHERE sku = ?", (SKU,)).fetchone() == (1,)
+
+
+def _rewrite(path, update):
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+    rows = [update(row) for row in rows]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([row for row in rows if row is not None], f)
+    # Make sure the stamp changes even on filesystems with coarse mtimes.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_file_edits_are_applied_incrementally_under_journal_levels():
+    store = _store()
+    rows = store.rows()
+    other, gone = rows[1]["sku"], rows[2]["sku"]
+    store.set_stock({SKU: 4})
+    version = store.version
+
+    def edit(row):
+        if row["sku"] == gone:
+            return None
+        if row["sku"] == SKU:
+            # The journal level still wins over the file's stock.
+            return {**row, "stock": 999, "restockEtaDays": 9}
+        if row["sku"] == other:
+            return {**row, "stock": 77}
+        return row
+
+    _rewrite(store.path, edit)
+    assert store.get(SKU)["stock"] == 4 and store.get(SKU)["restockEtaDays"] == 9
+    assert store.get(other)["stock"] == 77
+    assert store.get(gone) is None
+    assert store.version > version
+    assert InventoryStore(store.path).get_many([SKU, other, gone]) == store.get_many([SKU, other, gone])
+
+    store.set_stock({other: 70})
+    assert store.get(other)["stock"] == 70
+    assert store.get(SKU)["stock"] == 4
+
+
+def test_unchanged_rewrite_keeps_the_version():
+    store = _store()
+    store.set_stock({SKU: 4})
+    version = store.version
+    _rewrite(store.path, lambda row: row)
+    assert store.version == version
+    assert store.get(SKU)["stock"] == 4
@@ -0,0 +1,33 @@
+"""No oversell and no lost orders under concurrent create_order, on both backends."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+
+@pytest.mark.parametrize("storage", ["json", "sqlite"])
+def test_concurrent_orders_never_oversell(storage, tmp_path):
+    report_path = tmp_path / "report.json"
+    proc = subprocess.run(
+        [
+            sys.executable, "-m", "bench.order_stress",
+            "--storage", storage, "--processes", "2", "--threads", "4",
+            "--orders", "240", "--stock", "60", "--report", str(report_path),
+        ],
+        cwd=str(tmp_path),
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    report = json.loads(report_path.read_text())
+    assert report["noOversell"] and report["noLostOrders"] and report["reservationExpiryOk"]
+    assert report["finalStock"] >= 0
+    assert report["accepted"] == report["stockTaken"]
+    assert report["duplicateOrderIds"] == 0
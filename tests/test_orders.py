@@ -0,0 +1,51 @@
+"""Order journal compaction and exit handling."""
+
+import atexit
+import json
+
+from tools import _orders
+from tools._orders import OrderJournal
+
+
+def _lines(path):
+    with open(path, "rb") as f:
+        return f.read().count(b"\n")
+
+
+def test_updates_compact_the_journal_on_append(tmp_path, monkeypatch):
+    monkeypatch.setattr(_orders, "COMPACT_MIN_DEAD", 5)
+    journal = OrderJournal(str(tmp_path / "orders.jsonl"))
+    journal.append({"orderId": "a", "status": "new"})
+    journal.append({"orderId": "b", "status": "new"})
+    for n in range(5):
+        journal.append({"orderId": "a", "status": f"update {n}"})
+    # The fifth update made superseded records outnumber the two live orders.
+    assert _lines(journal.path) == 2
+    assert journal.get("a")["status"] == "update 4"
+    assert journal.get("b")["status"] == "new"
+    journal.close()
+
+
+def test_superseded_records_are_compacted_when_opened(tmp_path, monkeypatch):
+    monkeypatch.setattr(_orders, "COMPACT_MIN_DEAD", 5)
+    path = tmp_path / "orders.jsonl"
+    path.write_text("".join(json.dumps({"orderId": "a", "status": n}) + "\n" for n in range(10)))
+    journal = OrderJournal(str(path))
+    assert len(journal) == 1
+    assert _lines(path) == 1
+    assert journal.get("a")["status"] == 9
+    journal.close()
+
+
+def test_journals_share_one_exit_hook(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, "register", registered.append)
+    journals = [OrderJournal(str(tmp_path / f"orders{n}.jsonl")) for n in range(3)]
+    for journal in journals:
+        journal.append({"orderId": "a"})
+    assert registered == []
+    assert set(_orders._JOURNALS) >= set(journals)
+    journals[0].close()
+    assert journals[0] not in _orders._JOURNALS
+    _orders._close_all()
+    assert not any(journal in _orders._JOURNALS for journal in journals)
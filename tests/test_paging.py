@@ -0,0 +1,56 @@
+"""Keyset cursor paging: pages cover every item exactly once, whatever the limit."""
+
+import pytest
+
+import tools
+
+
+def _walk(tool, key, limit, **kwargs):
+    seen, cursor = [], None
+    for _ in range(1000):
+        out = tool(limit=limit, cursor=cursor, **kwargs) if cursor else tool(limit=limit, **kwargs)
+        assert out["results"] or not out["hasMore"]
+        seen.extend(key(item) for item in out["results"])
+        if not out["hasMore"]:
+            assert "nextCursor" not in out
+            return seen, out["total"]
+        cursor = out["nextCursor"]
+    raise AssertionError("paging did not terminate")
+
+
+PAGED = [
+    ("list_products", lambda item: item["id"], {}),
+    ("list_products_by_category", lambda item: item["id"], {"category": "Headphones"}),
+    ("search_products", lambda item: item["id"], {"query": "wireless"}),
+    ("filter_products", lambda item: item["id"], {}),
+    ("list_supported_destinations", lambda item: (item["city"], item["country"]), {}),
+]
+
+
+@pytest.mark.parametrize("name,key,kwargs", PAGED, ids=[p[0] for p in PAGED])
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_pages_have_no_gaps_or_duplicates(name, key, kwargs, limit):
+    tool = getattr(tools, name)
+    everything, total = _walk(tool, key, 1000, **kwargs)
+    assert everything and len(everything) == total
+    paged, paged_total = _walk(tool, key, limit, **kwargs)
+    assert paged == everything
+    assert paged_total == total
+
+
+@pytest.mark.parametrize("name,key,kwargs", PAGED, ids=[p[0] for p in PAGED])
+@pytest.mark.parametrize("limit", [0, -1, -5])
+def test_non_positive_limit_returns_an_empty_page(name, key, kwargs, limit):
+    tool = getattr(tools, name)
+    out = tool(limit=limit, **kwargs)
+    assert out["results"] == []
+    assert out["hasMore"] is False
+    assert "nextCursor" not in out
+    everything, total = _walk(tool, key, 1000, **kwargs)
+    assert out["total"] == total == len(everything)
+
+
+def test_cursor_is_bound_to_its_arguments():
+    out = tools.search_products("wireless", limit=1)
+    with pytest.raises(ValueError):
+        tools.search_products("speaker", limit=1, cursor=out["nextCursor"])
@@ -0,0 +1,70 @@
+"""estimate_price_many quotes exactly what estimate_price does, and tolerates malformed entries."""
+
+import pytest
+
+import tools
+
+
+CARTS = [
+    [{"sku": "HP-AUR-100-BLK", "quantity": 1}],
+    [{"sku": "HP-AUR-100-BLK", "quantity": 2}, {"sku": "KB-M75-LIN-GRY", "quantity": 1}],
+    [{"productId": "hp-aurora-100", "attributes": {"color": "White"}, "quantity": 1}, {"sku": "NOPE-1", "quantity": 1}],
+    [{"sku": "KB-M75-LIN-GRY", "unitPriceCents": 5000, "quantity": 3}],
+]
+DESTINATIONS = [
+    {"city": "Austin", "country": "US"},
+    {"city": "London", "country": "United Kingdom"},
+    {"city": "Berlin", "country": "DE"},
+    {"city": "Seatle", "country": "US"},
+    {"city": "Springfield", "country": "ZZ"},
+]
+_QUOTE_KEYS = ("destinationCity", "destinationCountry", "breakdown", "deliveryEtaDays")
+
+
+def test_many_matches_single_estimates():
+    out = tools.estimate_price_many(DESTINATIONS, carts=[{"items": items} for items in CARTS])
+    assert len(out["quotes"]) == len(CARTS) * len(DESTINATIONS)
+    quotes = iter(out["quotes"])
+    for index, items in enumerate(CARTS):
+        for destination in DESTINATIONS:
+            single = tools.estimate_price(
+                items, destination_city=destination["city"], destination_country=destination["country"]
+            )
+            assert "error" not in single
+            many = next(quotes)
+            assert many["cart"] == index
+            assert {k: many[k] for k in _QUOTE_KEYS} == {k: single[k] for k in _QUOTE_KEYS}
+            assert out["carts"][index]["items"] == single["items"]
+            assert out["carts"][index].get("invalidItems") == single.get("invalidItems")
+
+
+def test_items_and_carts_combine():
+    out = tools.estimate_price_many(DESTINATIONS[:1], items=CARTS[0], carts=[{"items": CARTS[1]}])
+    assert [q["cart"] for q in out["quotes"]] == [0, 1]
+
+
+@pytest.mark.parametrize("destination", ["London, UK", ["London", "UK"], None, 42, {"city": 1, "country": "UK"}, {"city": "London"}])
+def test_malformed_destination_gets_its_own_error(destination):
+    out = tools.estimate_price_many([destination, DESTINATIONS[0]], items=CARTS[0])
+    bad, good = out["quotes"]
+    assert "error" in bad and "breakdown" not in bad
+    assert "breakdown" in good
+
+
+@pytest.mark.parametrize("cart", [None, "HP-AUR-100-BLK", ["HP-AUR-100-BLK"], {"items": "HP-AUR-100-BLK"}, {"items": []}])
+def test_malformed_cart_gets_its_own_error(cart):
+    out = tools.estimate_price_many(DESTINATIONS[:2], carts=[cart, {"items": CARTS[0]}])
+    assert "error" in out["carts"][0]
+    assert [q["cart"] for q in out["quotes"]] == [1, 1]
+
+
+def test_malformed_items_are_reported_as_invalid():
+    out = tools.estimate_price_many(DESTINATIONS[:1], items=["HP-AUR-100-BLK", {"sku": "HP-AUR-100-BLK"}])
+    assert out["carts"][0]["invalidItems"][0]["reason"] == "item must be an object"
+    assert "breakdown" in out["quotes"][0]
+
+
+@pytest.mark.parametrize("kwargs", [{"destinations": {"city": "Austin", "country": "US"}}, {"carts": {"items": CARTS[0]}}])
+def test_non_list_arguments_are_rejected(kwargs):
+    args = {"destinations": DESTINATIONS[:1], "carts": [{"items": CARTS[0]}], **kwargs}
+    assert "error" in tools.estimate_price_many(**args)
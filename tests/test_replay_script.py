@@ -0,0 +1,23 @@
+"""The built-in replay script only makes calls the real tools accept."""
+
+import inspect
+
+import pytest
+
+import tools
+from agent.replay_client import DEFAULT_SCRIPT
+
+
+CALLS = [
+    (turn["user"], call)
+    for turn in DEFAULT_SCRIPT
+    for round_ in turn.get("rounds", [])
+    for call in round_
+]
+
+
+@pytest.mark.parametrize("user,call", CALLS, ids=[c["name"] for _, c in CALLS])
+def test_scripted_call_matches_tool_signature(user, call):
+    func = getattr(tools, call["name"], None)
+    assert func is not None, f"{user!r}: unknown tool {call['name']}"
+    inspect.signature(func).bind(**call.get("args", {}))
@@ -0,0 +1,83 @@
+"""Search index: BM25 ranking, prefix/typo expansion and keyset paging."""
+
+import pytest
+
+from tools._search_index import SearchIndex
+
+
+def _product(pid, name, category="Audio", description="", tags=()):
+    return {"id": pid, "name": name, "category": category, "shortDescription": description, "tags": list(tags)}
+
+
+PRODUCTS = [
+    _product("a", "Aurora Headphones", description="Wireless over-ear headphones"),
+    _product("b", "Basic Speaker", description="A speaker that pairs with aurora headphones"),
+    _product("c", "Studio Headphones", description="Wired studio monitoring headphones for long sessions"),
+    _product("d", "Travel Adapter", category="Accessories", description="Universal wireless charging adapter"),
+    _product("e", "Wireless Earbuds", description="Compact wireless earbuds", tags=["wireless", "bluetooth"]),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex(PRODUCTS)
+
+
+def test_name_hits_outrank_description_hits(index):
+    # Both mention "aurora"; only product a has it in the name.
+    assert index.search("aurora") == [0, 1]
+    assert index.score("aurora", 0) > index.score("aurora", 1)
+
+
+def test_rare_terms_weigh_more_than_common_ones(index):
+    # "studio" is in one product, "headphones" in three.
+    assert index.score("studio", 2) > index.score("headphones", 2)
+
+
+def test_every_query_term_must_match(index):
+    assert index.search("wireless headphones") == [0]
+    assert index.search("wireless", category="accessories") == [3]
+    assert index.search("wireless nonexistentterm") == []
+
+
+def test_prefixes_expand_to_vocabulary_terms(index):
+    assert index.prefix_matches("headph") == ["headphones"]
+    assert index.prefix_matches("he") == []
+    assert index.search("headph") == index.search("headphones")
+    # Expanded terms score below exact hits.
+    assert index.score("headph", 0) < index.score("headphones", 0)
+
+
+def test_typos_expand_within_the_edit_distance(index):
+    assert index.typo_matches("aurra") == ["aurora"]
+    assert index.typo_matches("wirelss") == ["wireless"]
+    assert index.search("aurra") == [0, 1]
+    # Terms of up to three letters are not corrected, longer ones up to five by one edit.
+    assert index.typo_matches("wir") == []
+    assert index.typo_matches("bsic") == ["basic"]
+    assert index.typo_matches("bsc") == []
+
+
+@pytest.mark.parametrize("query", ["headphones", "wireless", "wireless headphones", "headphones aurora", "", "hedphones"])
+@pytest.mark.parametrize("limit", [1, 2])
+def test_cursor_pages_match_the_full_ranking(index, query, limit):
+    everything = index.search_scored(query, limit=100)
+    assert len(everything) == index.count(query)
+    paged, after = [], None
+    while True:
+        hits = index.search_scored(query, limit=limit, after=after)
+        if not hits:
+            break
+        paged.extend(hits)
+        after = hits[-1]
+    assert paged == everything
+
+
+def test_duplicate_ids_are_indexed_once():
+    duplicate = _product("a", "Aurora Headphones Copy", description="Wireless")
+    index = SearchIndex(PRODUCTS + [duplicate])
+    assert index.size == len(PRODUCTS)
+    assert index.search("aurora") == [0, 1]
+    assert index.count("wireless") == 3
+    assert index.score("aurora", len(PRODUCTS)) is None
+    assert [d for _, d in index.search_scored("", limit=100)] == list(range(len(PRODUCTS)))
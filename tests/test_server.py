@@ -0,0 +1,29 @@
+"""The websocket endpoint stops serving a session once it is gone."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import WSMsgType  # noqa: E402
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from agent.server import SESSIONS, create_app  # noqa: E402
+
+
+def test_websocket_closes_when_its_session_is_evicted():
+    async def run():
+        app = create_app(lambda: object(), max_sessions=1)
+        async with TestClient(TestServer(app)) as client:
+            first = (await (await client.post("/sessions")).json())["sessionId"]
+            ws = await client.ws_connect(f"/sessions/{first}/ws")
+            # The table is full and the socket's session is idle: creating another evicts it.
+            assert (await client.post("/sessions")).status == 201
+            await ws.send_str("hello")
+            frame = await ws.receive_json(timeout=5)
+            assert frame == {"type": "error", "error": "unknown or expired session"}
+            assert (await ws.receive(timeout=5)).type in (WSMsgType.CLOSE, WSMsgType.CLOSED)
+            assert app[SESSIONS].get(first) is None
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""A turn that keeps calling tools past MAX_TOOL_ROUNDS: extra calls are refused, never run or left pending."""
+
+import asyncio
+
+import pytest
+
+import tools
+from agent.dispatch import MAX_TOOL_ROUNDS, ROUND_LIMIT_ERROR, ToolDispatcher, asend_message, manual_config, send_message
+from agent.replay_client import ReplayGeminiClient
+from agent.streaming import astream_turn, stream_turn
+from google.genai import types
+
+
+REPLY = "Sorry, that took too many steps."
+ROUNDS = MAX_TOOL_ROUNDS + 3
+
+
+def _script():
+    calls = [[{"name": "check_inventory", "args": {"sku": "HP-AUR-100-BLK"}}] for _ in range(ROUNDS)]
+    # What must never run: the round past the limit places an order.
+    calls[MAX_TOOL_ROUNDS] = [{"name": "create_order", "args": {
+        "items": [{"sku": "HP-AUR-100-BLK", "quantity": 1}], "destination_city": "Austin",
+        "destination_country": "US", "breakdown": {},
+    }}]
+    return [{"user": "keep going", "rounds": calls, "reply": REPLY}]
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    run = []
+    real = ToolDispatcher._invoke
+
+    def invoke(self, call):
+        run.append(call.name)
+        return real(self, call)
+
+    monkeypatch.setattr(ToolDispatcher, "_invoke", invoke)
+    client = ReplayGeminiClient(_script())
+    config = manual_config(types.GenerateContentConfig(tools=[tools.check_inventory, tools.create_order]))
+    return client, config, ToolDispatcher([tools.check_inventory, tools.create_order]), run
+
+
+def _check(history, run):
+    assert run == ["check_inventory"] * MAX_TOOL_ROUNDS
+    calls = [p.function_call for c in history for p in c.parts or [] if p.function_call]
+    responses = [p.function_response for c in history for p in c.parts or [] if p.function_response]
+    assert [c.id for c in calls] == [r.id for r in responses]
+    assert responses[-1].name == "create_order"
+    assert responses[-1].response == {"error": ROUND_LIMIT_ERROR}
+    assert history[-1].role == "model" and history[-1].parts[0].text == REPLY
+
+
+def test_send_message_refuses_calls_past_the_limit(setup):
+    client, config, dispatcher, run = setup
+    chat = client.start_chat()
+    resp = send_message(chat, "keep going", config, dispatcher)
+    assert not resp.function_calls and resp.text == REPLY
+    _check(chat.get_history(), run)
+
+
+def test_asend_message_refuses_calls_past_the_limit(setup):
+    client, config, dispatcher, run = setup
+    chat = client.start_async_chat()
+    resp = asyncio.run(asend_message(chat, "keep going", config, dispatcher))
+    assert not resp.function_calls and resp.text == REPLY
+    _check(chat.get_history(), run)
+
+
+def test_stream_turn_refuses_calls_past_the_limit(setup):
+    client, config, dispatcher, run = setup
+    chat = client.start_chat()
+    done = stream_turn(chat, "keep going", config, lambda event: None, dispatcher)
+    assert done["text"] == REPLY and done["toolCalls"] == MAX_TOOL_ROUNDS
+    _check(chat.get_history(), run)
+
+
+def test_astream_turn_refuses_calls_past_the_limit(setup):
+    client, config, dispatcher, run = setup
+    chat = client.start_async_chat()
+
+    async def collect():
+        return [event async for event in astream_turn(chat, "keep going", config, dispatcher)]
+
+    events = asyncio.run(collect())
+    assert events[-1]["type"] == "done" and events[-1]["text"] == REPLY
+    _check(chat.get_history(), run)
@@ -6,10 +6,14 @@ on the local mock data under `data/`.
 """
 
 from .search_products import search_products  # noqa: F401
+from .filter_products import filter_products  # noqa: F401
 from .get_product_details import get_product_details  # noqa: F401
 from .check_inventory import check_inventory  # noqa: F401
+from .check_inventory_many import check_inventory_many  # noqa: F401
 from .estimate_price import estimate_price  # noqa: F401
+from .estimate_price_many import estimate_price_many  # noqa: F401
 from .suggest_alternatives import suggest_alternatives  # noqa: F401
+from .reserve_stock import reserve_stock  # noqa: F401
 from .create_order import create_order  # noqa: F401
 from .get_order_status import get_order_status  # noqa: F401
 
@@ -0,0 +1,383 @@
+"""Pluggable storage backends for catalog, inventory and orders.
+
+Tools talk to a `StorageBackend` obtained from `get_backend()` instead of
+reading files directly. The backend is chosen by `SHOPTALK_STORAGE`:
+
+- `json` (default): the in-memory catalog/inventory stores and the order
+  journal over the files in `data/`.
+- `sqlite`: a SQLite database (`SHOPTALK_SQLITE_PATH`) imported from the
+  same JSON files, for catalogs too large to keep in memory.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ._catalog import CatalogStore
+from ._destinations import DestinationStore, DestinationTable, destinations_path
+from ._facets import FacetIndex
+from ._similarity import SimilarityIndex
+from ._filelock import FileLock
+from ._inventory import InventoryStore
+from ._orders import OrderJournal
+from ._search_index import tokenize
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.getenv("SHOPTALK_DATA_DIR") or os.path.join(ROOT, "data")
+
+Product = Dict[str, Any]
+Variant = Dict[str, Any]
+
+
+def requested_quantities(items: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """Sum item quantities per SKU; returns (sku -> quantity, invalid items)."""
+    wanted: Dict[str, int] = {}
+    invalid: List[Dict[str, Any]] = []
+    for item in items:
+        sku = str(item.get("sku") or "").strip()
+        try:
+            qty = int(item.get("quantity", 1))
+        except (TypeError, ValueError):
+            qty = 0
+        if not sku or qty <= 0:
+            invalid.append({"item": item, "reason": "sku and quantity >= 1 required"})
+            continue
+        wanted[sku] = wanted.get(sku, 0) + qty
+    return wanted, invalid
+
+
+def find_shortages(wanted: Dict[str, int], stock: Dict[str, int], held: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Items whose quantity exceeds stock minus what other reservations hold."""
+    shortages = []
+    for sku, qty in wanted.items():
+        available = max(0, stock.get(sku, 0) - held.get(sku, 0))
+        if qty > available:
+            shortages.append({"sku": sku, "requested": qty, "available": available})
+    return shortages
+
+
+def iso_utc(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+def new_reservation_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class StorageBackend:
+    """Read/write operations the tools need, independent of the storage."""
+
+    name = "base"
+    destination_store: DestinationStore
+
+    def catalog_version(self) -> int:
+        """Monotonic counter bumped whenever the catalog changes."""
+        raise NotImplementedError
+
+    def product(self, product_id: str) -> Optional[Product]:
+        raise NotImplementedError
+
+    def variant(self, sku: str) -> Optional[Tuple[Product, Variant]]:
+        """Return (product, variant) for a SKU, or None if unknown."""
+        raise NotImplementedError
+
+    def iter_products(self, category: Optional[str] = None) -> Iterator[Product]:
+        """Yield products in catalog order, optionally within one category (case-insensitive)."""
+        raise NotImplementedError
+
+    def count_products(self, category: Optional[str] = None) -> int:
+        """Number of products, optionally within one category (case-insensitive)."""
+        raise NotImplementedError
+
+    def categories(self) -> List[str]:
+        """Sorted distinct category names."""
+        raise NotImplementedError
+
+    def search(self, query: str, *, category: Optional[str] = None, limit: int = 10) -> List[Product]:
+        """Full-text search, best matches first."""
+        raise NotImplementedError
+
+    # Keyset pagination. A page is a list of (sort key, product); to get the
+    # next one pass `after={"id", "key", "version"}` of the previous page's
+    # last row (`version` is the catalog version it was read at). Each page
+    # costs the same however deep it is. The last product is looked up by id,
+    # so paging stays consistent across a catalog reload; if that product was
+    # removed, paging resumes from its old key.
+
+    def page_products(
+        self, *, category: Optional[str] = None, after: Optional[Dict[str, Any]] = None, limit: int = 20
+    ) -> List[Tuple[List[Any], Product]]:
+        """A page of products in catalog order, optionally within one category."""
+        raise NotImplementedError
+
+    def search_page(
+        self, query: str, *, category: Optional[str] = None, after: Optional[Dict[str, Any]] = None, limit: int = 10
+    ) -> List[Tuple[List[Any], Product]]:
+        """A page of `search` results, best matches first."""
+        raise NotImplementedError
+
+    def count_search(self, query: str, *, category: Optional[str] = None) -> int:
+        """Number of products `search` can return for the query."""
+        raise NotImplementedError
+
+    def facets(self) -> FacetIndex:
+        """Facet index of the current catalog version (see `tools._facets`)."""
+        raise NotImplementedError
+
+    def similarity(self) -> SimilarityIndex:
+        """Similarity index of the current catalog version (see `tools._similarity`)."""
+        raise NotImplementedError
+
+    def destinations(self) -> DestinationTable:
+        """Supported destinations and rate rules (see `tools._destinations`); kept in JSON for every backend."""
+        return self.destination_store.table()
+
+    def destinations_version(self) -> int:
+        return self.destinations().version
+
+    def inventory_version(self) -> int:
+        raise NotImplementedError
+
+    def inventory(self, sku: str) -> Optional[Dict[str, Any]]:
+        return self.inventory_many([sku]).get(sku)
+
+    def inventory_many(self, skus: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def append_order(self, row: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def reserve_stock(self, items: List[Dict[str, Any]], *, ttl_seconds: float) -> Dict[str, Any]:
+        """Hold stock for items ({sku, quantity}) until placed, released or expired.
+
+        All-or-nothing: returns {reservationId, expiresAt, items} or an error
+        dict with `shortages` and nothing held.
+        """
+        raise NotImplementedError
+
+    def release_reservation(self, reservation_id: str) -> bool:
+        raise NotImplementedError
+
+    def place_order(self, row: Dict[str, Any], *, reservation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Atomically take stock for row["items"] and persist the order.
+
+        Stock held by `reservation_id` is consumed first; other active
+        reservations are never oversold. Returns None on success, or an error
+        dict (with `shortages` when stock ran out) and writes nothing.
+        """
+        raise NotImplementedError
+
+    def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_products(self, *, category: Optional[str] = None, limit: int = 20) -> List[Product]:
+        return list(islice(self.iter_products(category), max(limit, 0)))
+
+
+class JsonBackend(StorageBackend):
+    """Backend over the JSON files, served from resident in-memory indexes."""
+
+    name = "json"
+
+    def __init__(self, data_dir: str) -> None:
+        self.catalog_store = CatalogStore(os.path.join(data_dir, "catalog", "products.json"))
+        self.inventory_store = InventoryStore(os.path.join(data_dir, "inventory", "inventory.json"))
+        self.orders = OrderJournal(
+            os.path.join(data_dir, "orders", "orders.jsonl"),
+            legacy_path=os.path.join(data_dir, "orders", "orders.json"),
+            # Stock taken by an order is on disk before the order is.
+            before_sync=self.inventory_store.sync,
+        )
+        # Serializes stock read-check-write cycles across threads and processes.
+        self._stock_lock = FileLock(os.path.join(data_dir, "inventory", ".stock.lock"))
+        self._reservations_path = os.path.join(data_dir, "inventory", "reservations.json")
+        self.destination_store = DestinationStore(destinations_path(data_dir))
+
+    def catalog_version(self) -> int:
+        return self.catalog_store.snapshot().version
+
+    def product(self, product_id: str) -> Optional[Product]:
+        return self.catalog_store.snapshot().product(product_id)
+
+    def variant(self, sku: str) -> Optional[Tuple[Product, Variant]]:
+        return self.catalog_store.snapshot().variant(sku)
+
+    def iter_products(self, category: Optional[str] = None) -> Iterator[Product]:
+        catalog = self.catalog_store.snapshot()
+        if category is None:
+            return iter(catalog.products)
+        return (catalog.by_id[pid] for pid in catalog.products_in_category(category))
+
+    def count_products(self, category: Optional[str] = None) -> int:
+        catalog = self.catalog_store.snapshot()
+        if category is None:
+            return len(catalog.products)
+        return len(catalog.products_in_category(category))
+
+    def categories(self) -> List[str]:
+        return list(self.catalog_store.snapshot().categories)
+
+    def search(self, query: str, *, category: Optional[str] = None, limit: int = 10) -> List[Product]:
+        catalog = self.catalog_store.snapshot()
+        return [catalog.products[doc] for doc in catalog.search_index.search(query, category=category, limit=limit)]
+
+    def page_products(
+        self, *, category: Optional[str] = None, after: Optional[Dict[str, Any]] = None, limit: int = 20
+    ) -> List[Tuple[List[Any], Product]]:
+        catalog = self.catalog_store.snapshot()
+        after_pos = -1
+        if after:
+            after_pos = catalog.positions.get(after["id"], after["key"][-1])
+        return [([pos], catalog.products[pos]) for pos in catalog.page_after(category, after_pos, limit)]
+
+    def search_page(
+        self, query: str, *, category: Optional[str] = None, after: Optional[Dict[str, Any]] = None, limit: int = 10
+    ) -> List[Tuple[List[Any], Product]]:
+        catalog = self.catalog_store.snapshot()
+        if not tokenize(query):
+            rows = self.page_products(category=category, after=after, limit=limit)
+            return [([0.0, key[0]], product) for key, product in rows]
+        bound = None
+        if after:
+            # Keys are (-score, position) so that both backends sort them ascending.
+            neg_score, pos = after["key"]
+            if after.get("version") != catalog.version:
+                moved = catalog.positions.get(after["id"])
+                score = catalog.search_index.score(query, moved) if moved is not None else None
+                if score is not None:
+                    neg_score, pos = -score, moved
+            bound = (-neg_score, pos)
+        hits = catalog.search_index.search_scored(query, category=category, limit=limit, after=bound)
+        return [([-score, pos], catalog.products[pos]) for score, pos in hits]
+
+    def count_search(self, query: str, *, category: Optional[str] = None) -> int:
+        if not tokenize(query):
+            return self.count_products(category)
+        return self.catalog_store.snapshot().search_index.count(query, category=category)
+
+    def facets(self) -> FacetIndex:
+        return self.catalog_store.snapshot().facet_index
+
+    def similarity(self) -> SimilarityIndex:
+        return self.catalog_store.snapshot().similarity_index
+
+    def inventory_version(self) -> int:
+        return self.inventory_store.version
+
+    def inventory_many(self, skus: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return self.inventory_store.get_many(skus)
+
+    def append_order(self, row: Dict[str, Any]) -> None:
+        self.orders.append(row)
+
+    def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return self.orders.get(order_id)
+
+    # Stock reservation. Callers must hold self._stock_lock; the inventory
+    # store picks up stock journal lines other processes appended before
+    # answering, so levels read under the lock are current.
+
+    def _stock(self, skus: Iterable[str]) -> Dict[str, int]:
+        rows = self.inventory_store.get_many(skus)
+        return {sku: int(row.get("stock", 0)) for sku, row in rows.items() if row is not None}
+
+    def _load_reservations(self, now: float) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._reservations_path, "r", encoding="utf-8") as f:
+                reservations: Dict[str, Dict[str, Any]] = json.load(f)
+        except FileNotFoundError:
+            return {}
+        return {rid: r for rid, r in reservations.items() if r["expiresAt"] > now}
+
+    def _save_reservations(self, reservations: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = f"{self._reservations_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(reservations, f)
+        os.replace(tmp_path, self._reservations_path)
+
+    @staticmethod
+    def _held(reservations: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        held: Dict[str, int] = {}
+        for r in reservations.values():
+            for sku, qty in r["items"].items():
+                held[sku] = held.get(sku, 0) + qty
+        return held
+
+    def reserve_stock(self, items: List[Dict[str, Any]], *, ttl_seconds: float) -> Dict[str, Any]:
+        wanted, invalid = requested_quantities(items)
+        if invalid or not wanted:
+            return {"error": "Items need a sku and quantity >= 1", "invalidItems": invalid}
+        with self._stock_lock:
+            now = time.time()
+            reservations = self._load_reservations(now)
+            stock = self._stock(wanted)
+            shortages = find_shortages(wanted, stock, self._held(reservations))
+            if shortages:
+                return {"error": "insufficient_stock", "shortages": shortages}
+            rid = new_reservation_id()
+            reservations[rid] = {"items": wanted, "expiresAt": now + ttl_seconds}
+            self._save_reservations(reservations)
+        return {
+            "reservationId": rid,
+            "expiresAt": iso_utc(now + ttl_seconds),
+            "items": [{"sku": sku, "quantity": qty} for sku, qty in wanted.items()],
+        }
+
+    def release_reservation(self, reservation_id: str) -> bool:
+        with self._stock_lock:
+            reservations = self._load_reservations(time.time())
+            found = reservations.pop(reservation_id, None) is not None
+            self._save_reservations(reservations)
+        return found
+
+    def place_order(self, row: Dict[str, Any], *, reservation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        wanted, invalid = requested_quantities(row.get("items") or [])
+        if invalid or not wanted:
+            return {"error": "Items need a sku and quantity >= 1", "invalidItems": invalid}
+        with self._stock_lock:
+            reservations = self._load_reservations(time.time())
+            if reservation_id is not None and reservations.pop(reservation_id, None) is None:
+                return {"error": "reservation_not_found_or_expired", "reservationId": reservation_id}
+            stock = self._stock(wanted)
+            shortages = find_shortages(wanted, stock, self._held(reservations))
+            if shortages:
+                return {"error": "insufficient_stock", "shortages": shortages}
+            # Stock first: a crash before the order append leaks stock rather than overselling.
+            self.inventory_store.set_stock({sku: stock[sku] - qty for sku, qty in wanted.items()})
+            self.orders.append(row)
+            self._save_reservations(reservations)
+        return None
+
+
+_BACKEND: Optional[StorageBackend] = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def create_backend(kind: Optional[str] = None, data_dir: Optional[str] = None) -> StorageBackend:
+    kind = (kind or os.getenv("SHOPTALK_STORAGE") or "json").strip().lower()
+    data_dir = data_dir or DATA_DIR
+    if kind == "json":
+        return JsonBackend(data_dir)
+    if kind == "sqlite":
+        from ._sqlite import SqliteBackend
+
+        db_path = os.getenv("SHOPTALK_SQLITE_PATH") or os.path.join(data_dir, "shoptalk.db")
+        return SqliteBackend(db_path, data_dir=data_dir)
+    raise ValueError(f"Unknown SHOPTALK_STORAGE backend: {kind!r} (expected 'json' or 'sqlite')")
+
+
+def get_backend() -> StorageBackend:
+    """Return the process-wide storage backend, creating it on first use."""
+    global _BACKEND
+    backend = _BACKEND
+    if backend is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = create_backend()
+            backend = _BACKEND
+    return backend
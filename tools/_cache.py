@@ -0,0 +1,134 @@
+"""Process-wide memoization of read-only tool results.
+
+Results are keyed by tool name and normalized arguments (bound to the
+signature with defaults applied, then serialized canonically), held in one
+LRU of at most `SHOPTALK_TOOL_CACHE_SIZE` entries, and expire after
+`SHOPTALK_TOOL_CACHE_TTL_S` seconds. Each entry also records the backend
+versions its tool depends on (catalog and/or inventory); a lookup made after
+one of them changed is an invalidation, not a hit. Cached results are shared
+between callers and must be treated as read-only.
+"""
+
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+TTL_S = float(os.getenv("SHOPTALK_TOOL_CACHE_TTL_S", "300"))
+MAX_ENTRIES = int(os.getenv("SHOPTALK_TOOL_CACHE_SIZE", "1024"))
+
+_MISSING = object()
+
+
+def normalize_args(sig: inspect.Signature, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    """Canonical text for a call's arguments: f(1) and f(limit=1) give the same key."""
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return json.dumps(bound.arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolCache:
+    """Thread-safe LRU + TTL cache with per-tool hit/miss counters."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_s: float = TTL_S) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        # key -> (expires_at, versions, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[int, ...], Any]]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_s > 0
+
+    def _count(self, tool: str, outcome: str) -> None:
+        counters = self._counters.get(tool)
+        if counters is None:
+            counters = self._counters[tool] = {"hits": 0, "misses": 0, "expired": 0, "invalidated": 0}
+        counters[outcome] += 1
+
+    def get(self, tool: str, key: Hashable, versions: Tuple[int, ...]) -> Any:
+        """Return the cached value, or `_MISSING` (counting why it missed)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(tool, "misses")
+                return _MISSING
+            expires_at, entry_versions, value = entry
+            if entry_versions != versions or expires_at <= now:
+                del self._entries[key]
+                self._count(tool, "invalidated" if entry_versions != versions else "expired")
+                self._count(tool, "misses")
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._count(tool, "hits")
+            return value
+
+    def put(self, key: Hashable, versions: Tuple[int, ...], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring: totals plus a per-tool breakdown."""
+        with self._lock:
+            per_tool = {tool: dict(c) for tool, c in self._counters.items()}
+            size = len(self._entries)
+        hits = sum(c["hits"] for c in per_tool.values())
+        misses = sum(c["misses"] for c in per_tool.values())
+        return {
+            "enabled": self.enabled,
+            "size": size,
+            "maxEntries": self.max_entries,
+            "ttlS": self.ttl_s,
+            "hits": hits,
+            "misses": misses,
+            "hitRate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "evictions": self.evictions,
+            "tools": per_tool,
+        }
+
+
+TOOL_CACHE = ToolCache()
+
+
+def memoize(
+    func: Callable[..., Any],
+    versions: Callable[[], Tuple[int, ...]],
+    cache: Optional[ToolCache] = None,
+) -> Callable[..., Any]:
+    """Wrap `func` so results are cached per (arguments, `versions()`)."""
+    cache = cache or TOOL_CACHE
+    sig = inspect.signature(func)
+    tool = func.__name__
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not cache.enabled:
+            return func(*args, **kwargs)
+        try:
+            key = (tool, normalize_args(sig, args, kwargs))
+        except TypeError:
+            # Let the real call raise the argument error.
+            return func(*args, **kwargs)
+        current = versions()
+        value = cache.get(tool, key, current)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            cache.put(key, current, value)
+        return value
+
+    return wrapper
@@ -0,0 +1,146 @@
+"""Process-wide, in-memory catalog store.
+
+`products.json` is parsed once and kept as an immutable snapshot. Every
+access re-stats the file and only when its mtime/size change is a new
+snapshot built and swapped in, so concurrent tool calls always see either
+the old or the new catalog, never a half-loaded one.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ._facets import FacetIndex
+from ._search_index import SearchIndex
+from ._similarity import SimilarityIndex
+
+
+FileStamp = Tuple[int, int]
+
+
+def file_stamp(path: str) -> Optional[FileStamp]:
+    """Return (mtime_ns, size) for a path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one point in time.
+
+    Hash indexes (product id, SKU, lowercased category), the full-text
+    search index, the facet index and the similarity index are built once
+    when the snapshot is created. Product dicts are shared between all readers of
+    a snapshot and must be treated as read-only.
+    """
+
+    __slots__ = (
+        "products", "version", "stamp", "by_id", "by_sku", "by_category", "categories", "search_index",
+        "positions", "category_positions", "facet_index", "similarity_index",
+    )
+
+    def __init__(self, products: Sequence[Dict[str, Any]], version: int, stamp: Optional[FileStamp]) -> None:
+        self.products: Tuple[Dict[str, Any], ...] = tuple(products)
+        self.version = version
+        self.stamp = stamp
+
+        by_id: Dict[str, Dict[str, Any]] = {}
+        positions: Dict[str, int] = {}
+        category_positions: Dict[str, List[int]] = {}
+        by_sku: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        by_category: Dict[str, List[str]] = {}
+        categories = set()
+        for pos, product in enumerate(self.products):
+            product_id = product.get("id")
+            if product_id is None or product_id in by_id:
+                # Keep first-match semantics of the old linear scans.
+                continue
+            by_id[product_id] = product
+            positions[product_id] = pos
+            category = (product.get("category") or "").strip().lower()
+            if category:
+                by_category.setdefault(category, []).append(product_id)
+                category_positions.setdefault(category, []).append(pos)
+                categories.add(product["category"].strip())
+            for variant in product.get("variants", []):
+                sku = (variant.get("sku") or "").strip()
+                if sku:
+                    by_sku.setdefault(sku, (product, variant))
+        self.by_id = by_id
+        self.by_sku = by_sku
+        self.by_category: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in by_category.items()}
+        # Catalog positions, the sort key of paginated listings (see `page_after`).
+        self.positions = positions
+        self.category_positions: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in category_positions.items()}
+        self.categories: Tuple[str, ...] = tuple(sorted(categories))
+        self.search_index = SearchIndex(self.products)
+        self.facet_index = FacetIndex(self.products, version)
+        self.similarity_index = SimilarityIndex(self.products, version)
+
+    def product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(product_id)
+
+    def variant(self, sku: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Return (product, variant) for a SKU, or None if unknown."""
+        return self.by_sku.get((sku or "").strip())
+
+    def products_in_category(self, category: Optional[str]) -> Tuple[str, ...]:
+        """Return product ids in a category (case-insensitive), in file order."""
+        return self.by_category.get((category or "").strip().lower(), ())
+
+    def page_after(self, category: Optional[str], after_pos: int, limit: int) -> Sequence[int]:
+        """Positions of up to `limit` products after `after_pos`, in catalog order (O(limit))."""
+        if category is None:
+            start = after_pos + 1
+            return range(start, min(len(self.products), start + max(limit, 0)))
+        positions = self.category_positions.get(category.strip().lower(), ())
+        start = bisect.bisect_right(positions, after_pos)
+        return positions[start:start + max(limit, 0)]
+
+
+class CatalogStore:
+    """Holds the current catalog snapshot and reloads it on file change."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._failed_stamp: Optional[FileStamp] = None
+        self._version = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, reloading first if the file changed."""
+        stamp = file_stamp(self._path)
+        snap = self._snapshot
+        if snap is not None and (snap.stamp == stamp or stamp == self._failed_stamp):
+            return snap
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock.
+            snap = self._snapshot
+            if snap is not None and (snap.stamp == stamp or stamp == self._failed_stamp):
+                return snap
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    products = json.load(f)
+            except Exception:
+                logging.exception("Failed reading catalog JSON %s", self._path)
+                if snap is None:
+                    raise
+                # Keep serving the last good catalog until the file is fixed.
+                self._failed_stamp = stamp
+                return snap
+            self._version += 1
+            self._failed_stamp = None
+            snap = CatalogSnapshot(products, self._version, stamp)
+            self._snapshot = snap
+            logging.info("Loaded catalog %s: %d products (version %d)", self._path, len(snap.products), snap.version)
+            return snap
@@ -0,0 +1,204 @@
+"""Destination and rate tables loaded from `shipping/destinations.json`.
+
+A `DestinationTable` is an immutable snapshot of the file with hash indexes:
+
+- country alias -> country code, country code -> region;
+- normalized (city or alias, country) -> destination, so validation is O(1)
+  however many cities are listed;
+- a delete-1 index of city keys per country (as in `_search_index`) that
+  resolves one-edit misspellings ("Seatle", "Seattlle", "Saettle") without
+  scanning;
+- region -> `RegionRates`, the pricing rules `estimate_price` applies.
+
+`DestinationStore` re-stats the file on access and swaps in a new table
+when it changes, like `CatalogStore`. If the data directory has no
+destinations file, the one bundled under the repository's `data/` is used.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ._catalog import FileStamp, file_stamp
+from ._search_index import _deletes, edit_distance
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED_PATH = os.path.join(ROOT, "data", "shipping", "destinations.json")
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+# Shorter city keys must match exactly (or by alias): "Rome" is not a typo of "Nome".
+_MIN_FUZZY_LEN = 5
+
+
+def normalize_key(text: Optional[str]) -> str:
+    """Case-, accent- and punctuation-insensitive lookup key ("Zürich " -> "zurich")."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", stripped.casefold())).strip()
+
+
+def destinations_path(data_dir: str) -> str:
+    path = os.path.join(data_dir, "shipping", "destinations.json")
+    return path if os.path.exists(path) else BUNDLED_PATH
+
+
+class RegionRates:
+    """Pricing rules of one region."""
+
+    __slots__ = ("name", "discount_rate", "tax_rate", "shipping_base_cents", "shipping_per_extra_item_cents", "eta_days")
+
+    def __init__(self, name: str, row: Dict[str, Any]) -> None:
+        self.name = name
+        self.discount_rate = float(row.get("discountRate", 0))
+        self.tax_rate = float(row.get("taxRate", 0))
+        self.shipping_base_cents = int(row.get("shippingBaseCents", 0))
+        self.shipping_per_extra_item_cents = int(row.get("shippingPerExtraItemCents", 0))
+        eta = row.get("etaDays") or [None, None]
+        self.eta_days: List[Optional[int]] = [eta[0], eta[-1]]
+
+
+class DestinationTable:
+    """Immutable, indexed view of the destinations file."""
+
+    def __init__(self, data: Dict[str, Any], version: int = 0, stamp: Optional[FileStamp] = None) -> None:
+        self.version = version
+        self.stamp = stamp
+        self.regions: Dict[str, RegionRates] = {
+            name: RegionRates(name, row) for name, row in (data.get("regions") or {}).items()
+        }
+        default = data.get("defaultRegion")
+        if default not in self.regions:
+            raise ValueError(f"defaultRegion {default!r} is not defined in regions")
+        self.default_region = self.regions[default]
+
+        self._country_codes: Dict[str, str] = {}
+        self._country_regions: Dict[str, RegionRates] = {}
+        for row in data.get("countries") or []:
+            code = str(row["code"]).strip().upper()
+            for alias in [code, *(row.get("aliases") or [])]:
+                self._country_codes[normalize_key(alias)] = code
+            if row.get("region") is not None:
+                self._country_regions[code] = self.regions[row["region"]]
+
+        self.destinations: List[Dict[str, str]] = []
+        self._keys: List[str] = []
+        self._country_positions: Dict[str, List[int]] = {}
+        self._regions_by_destination: List[Optional[RegionRates]] = []
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._deletes: Dict[Tuple[str, str], List[int]] = {}
+        for row in data.get("destinations") or []:
+            country = self.country(row["country"]) or ""
+            index = len(self.destinations)
+            self.destinations.append({"city": str(row["city"]).strip(), "country": country})
+            self._keys.append(normalize_key(row["city"]))
+            self._country_positions.setdefault(country, []).append(index)
+            self._regions_by_destination.append(self.regions[row["region"]] if row.get("region") else None)
+            for name in [row["city"], *(row.get("aliases") or [])]:
+                key = normalize_key(name)
+                self._by_key.setdefault((key, country), index)
+            key = self._keys[index]
+            if len(key) >= _MIN_FUZZY_LEN:
+                # The key itself too, so a query with one extra letter finds it among its deletions.
+                for variant in _deletes(key, 1) | {key}:
+                    self._deletes.setdefault((variant, country), []).append(index)
+
+    def country(self, country: Optional[str]) -> Optional[str]:
+        """Country code for a code, alias or name; unknown countries are upper-cased as given."""
+        if not country:
+            return None
+        return self._country_codes.get(normalize_key(country), country.strip().upper())
+
+    def resolve(self, city: Optional[str], country: Optional[str]) -> Optional[Tuple[int, str]]:
+        """(destination index, how it matched: "exact", "alias" or "fuzzy"), or None if unsupported."""
+        code = self.country(country)
+        key = normalize_key(city)
+        if not key or not code:
+            return None
+        index = self._by_key.get((key, code))
+        if index is not None:
+            return index, "exact" if self._keys[index] == key else "alias"
+        if len(key) < _MIN_FUZZY_LEN:
+            return None
+        candidates: Set[int] = set()
+        for variant in _deletes(key, 1) | {key}:
+            candidates.update(self._deletes.get((variant, code), ()))
+        best = [i for i in candidates if edit_distance(key, self._keys[i], 1) <= 1]
+        # An ambiguous misspelling resolves to nothing rather than to a guess.
+        return (best[0], "fuzzy") if len(best) == 1 else None
+
+    def rates(self, country: Optional[str], city: Optional[str] = None) -> RegionRates:
+        """Rates for a destination: the city's region if it overrides one, else its country's region."""
+        code = self.country(country)
+        if city:
+            hit = self.resolve(city, code)
+            if hit is not None and self._regions_by_destination[hit[0]] is not None:
+                return self._regions_by_destination[hit[0]]  # type: ignore[return-value]
+        return self._country_regions.get(code or "", self.default_region)
+
+    def region_of(self, index: int) -> RegionRates:
+        own = self._regions_by_destination[index]
+        return own or self._country_regions.get(self.destinations[index]["country"], self.default_region)
+
+    def page(self, *, country: Optional[str] = None, after: int = -1, limit: int = 20) -> Sequence[int]:
+        """Indexes of up to `limit` destinations after `after`, in file order, optionally in one country."""
+        code = self.country(country)
+        if code is None:
+            return range(after + 1, min(len(self.destinations), after + 1 + max(limit, 0)))
+        positions = self._country_positions.get(code, [])
+        start = bisect.bisect_right(positions, after)
+        return positions[start:start + max(limit, 0)]
+
+    def count(self, country: Optional[str] = None) -> int:
+        code = self.country(country)
+        if code is None:
+            return len(self.destinations)
+        return len(self._country_positions.get(code, ()))
+
+
+class DestinationStore:
+    """Holds the current destination table and reloads it on file change."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._table: Optional[DestinationTable] = None
+        self._failed_stamp: Optional[FileStamp] = None
+        self._version = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def table(self) -> DestinationTable:
+        """Return the current table, reloading first if the file changed."""
+        stamp = file_stamp(self._path)
+        table = self._table
+        if table is not None and (table.stamp == stamp or stamp == self._failed_stamp):
+            return table
+        with self._lock:
+            table = self._table
+            if table is not None and (table.stamp == stamp or stamp == self._failed_stamp):
+                return table
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._version += 1
+                table = DestinationTable(data, self._version, stamp)
+            except Exception:
+                logging.exception("Failed reading destinations %s", self._path)
+                if self._table is None:
+                    raise
+                # Keep serving the last good table until the file is fixed.
+                self._failed_stamp = stamp
+                return self._table
+            self._failed_stamp = None
+            self._table = table
+            logging.info("Loaded destinations %s: %d cities (version %d)", self._path, len(table.destinations), table.version)
+            return table
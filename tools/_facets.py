@@ -0,0 +1,334 @@
+"""Faceted filtering over category, tags, variant attributes, prices and specs.
+
+A `FacetIndex` is built once per catalog version (`StorageBackend.facets`).
+Every filterable value has a posting of catalog positions:
+
+- product-level terms: category, tags and scalar/list `specs` values
+  (strings, booleans), e.g. ("spec.anc", "true") or ("tag", "wireless");
+- variant-level terms: variant attributes, e.g. ("attr.color", "black"),
+  over variant positions, so "black and under $100" must hold for the same
+  variant;
+- sorted (value, position) arrays for numeric specs and variant prices, for
+  range filters by bisection.
+
+Postings of low-cardinality fields (the ones worth counting) and dense
+postings are stored as int bitmaps, so filters are big-int ANDs and facet
+counts are popcounts; sparse postings stay as position arrays and are
+turned into bitmaps only when a query uses them.
+"""
+
+import bisect
+import re
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+Posting = Union[int, "array[int]"]
+
+# Fields with at most this many distinct values get facet counts.
+MAX_FACET_VALUES = 64
+FACET_TOP = 10
+# Variant price buckets (upper bounds in cents) for the price facet.
+PRICE_BUCKETS_CENTS = (2500, 5000, 10000, 20000, 50000)
+
+_ONES = re.compile("1")
+
+
+def to_bits(positions: Iterable[int], size: int) -> int:
+    buf = bytearray((size + 7) // 8)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, "little")
+
+
+def positions(bits: int) -> List[int]:
+    """Set bit indexes of `bits`, ascending."""
+    if not bits:
+        return []
+    return [m.start() for m in _ONES.finditer(bin(bits)[:1:-1])]
+
+
+def iter_positions(bits: int, start: int = 0) -> Iterator[int]:
+    """Set bit indexes of `bits` from `start` on, ascending, found one at a time."""
+    bits >>= start
+    while bits:
+        step = (bits & -bits).bit_length()
+        start += step
+        bits >>= step
+        yield start - 1
+
+
+def _norm(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).strip().lower()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """`value` as a number if it is one or a numeric string (e.g. "30"), else None."""
+    if _is_number(value):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _bound(value: Any, name: str) -> Optional[float]:
+    if value is None:
+        return None
+    number = _as_number(value)
+    if number is None:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    return number
+
+
+def _bucket_label(index: int) -> str:
+    bounds = (0,) + PRICE_BUCKETS_CENTS
+    if index >= len(PRICE_BUCKETS_CENTS):
+        return f"{bounds[-1] // 100}+"
+    return f"{bounds[index] // 100}-{bounds[index + 1] // 100}"
+
+
+class _Sorted:
+    """(value, position) pairs sorted by value, for range filters.
+
+    Bitmaps of every `step`-th prefix (in value order) are kept, so a range
+    costs two bitmap lookups plus at most `step` positions on each side.
+    """
+
+    __slots__ = ("values", "positions", "size", "step", "prefixes")
+
+    CHECKPOINTS = 32
+
+    def __init__(self, pairs: List[Tuple[float, int]], size: int) -> None:
+        pairs.sort()
+        self.values = array("d", (v for v, _ in pairs))
+        self.positions = array("I", (p for _, p in pairs))
+        self.size = size
+        self.step = max(1, -(-len(pairs) // self.CHECKPOINTS))
+        self.prefixes = [0]
+        for end in range(self.step, len(pairs) + self.step, self.step):
+            self.prefixes.append(self.prefixes[-1] | to_bits(self.positions[end - self.step:end], size))
+
+    def _prefix(self, n: int) -> int:
+        """Bitmap of the first `n` positions in value order."""
+        i, extra = divmod(n, self.step)
+        if extra * 2 > self.step and i + 1 < len(self.prefixes):
+            # Nearer the next checkpoint: take it and clear the surplus.
+            return self.prefixes[i + 1] & ~to_bits(self.positions[n:(i + 1) * self.step], self.size)
+        return self.prefixes[i] | to_bits(self.positions[i * self.step:n], self.size)
+
+    def between(self, low: Optional[float], high: Optional[float]) -> int:
+        """Bitmap of positions whose value is within [low, high]."""
+        lo = 0 if low is None else bisect.bisect_left(self.values, low)
+        hi = len(self.values) if high is None else bisect.bisect_right(self.values, high)
+        if hi <= lo:
+            return 0
+        if hi - lo <= self.step:
+            return to_bits(self.positions[lo:hi], self.size)
+        return self._prefix(hi) & ~self._prefix(lo)
+
+
+class FacetResult:
+    __slots__ = ("bits", "total", "variant_bits", "counts")
+
+    def __init__(self, bits: int, variant_bits: Optional[int], counts: Dict[str, Dict[str, int]]) -> None:
+        # Matching products as a bitmap over catalog positions.
+        self.bits = bits
+        self.total = bits.bit_count()
+        # Variants satisfying the variant-level filters (None when there were none).
+        self.variant_bits = variant_bits
+        self.counts = counts
+
+    def page(self, after: int, limit: int) -> List[int]:
+        """Up to `limit` matching positions after `after` (-1 for the start), in catalog order."""
+        out: List[int] = []
+        if limit > 0:
+            for pos in iter_positions(self.bits, after + 1):
+                out.append(pos)
+                if len(out) >= limit:
+                    break
+        return out
+
+
+class FacetIndex:
+    """Bitmap and sorted-array indexes over one catalog version."""
+
+    def __init__(self, products: Iterable[Dict[str, Any]], version: int = 0) -> None:
+        self.version = version
+        self.ids: List[str] = []
+        # Product id -> catalog position.
+        self.position: Dict[str, int] = {}
+        self.variant_skus: List[str] = []
+        # variant_start[p]:variant_start[p + 1] are product p's variant positions.
+        self.variant_start = array("I", [0])
+        self.variant_owner = array("I")
+        product_terms: Dict[Tuple[str, str], List[int]] = {}
+        variant_terms: Dict[Tuple[str, str], List[int]] = {}
+        has_terms: Dict[Tuple[str, str], List[int]] = {}
+        numeric: Dict[str, List[Tuple[float, int]]] = {}
+        prices: List[Tuple[float, int]] = []
+        labels: Dict[Tuple[str, str], str] = {}
+        # (terms, field, raw value) -> posting, so normalizing happens once per distinct value.
+        seen: Dict[Tuple[int, str, Any], List[int]] = {}
+
+        def add(kind: int, terms: Dict[Tuple[str, str], List[int]], field: str, value: Any, pos: int) -> None:
+            posting = seen.get((kind, field, value))
+            if posting is None:
+                key = (field, _norm(value))
+                labels.setdefault(key, key[1] if isinstance(value, bool) else str(value).strip())
+                posting = seen[(kind, field, value)] = terms.setdefault(key, [])
+            if not posting or posting[-1] != pos:
+                posting.append(pos)
+
+        bucket_labels = [_bucket_label(i) for i in range(len(PRICE_BUCKETS_CENTS) + 1)]
+        owner = self.variant_owner
+        for pos, product in enumerate(products):
+            self.ids.append(product.get("id"))
+            self.position.setdefault(product.get("id"), pos)
+            if product.get("category"):
+                add(0, product_terms, "category", product["category"], pos)
+            for tag in product.get("tags") or []:
+                add(0, product_terms, "tag", tag, pos)
+            for name, value in (product.get("specs") or {}).items():
+                for item in value if isinstance(value, list) else [value]:
+                    if _is_number(item):
+                        numeric.setdefault(name, []).append((float(item), pos))
+                    elif isinstance(item, (str, bool)):
+                        add(0, product_terms, f"spec.{name}", item, pos)
+            for variant in product.get("variants") or []:
+                vpos = len(self.variant_skus)
+                self.variant_skus.append(variant.get("sku"))
+                owner.append(pos)
+                for name, value in (variant.get("attributes") or {}).items():
+                    field = f"attr.{name}"
+                    add(1, variant_terms, field, value, vpos)
+                    add(2, has_terms, field, value, pos)
+                price = int(variant.get("listPrice", 0))
+                prices.append((price, vpos))
+                add(2, has_terms, "price", bucket_labels[bisect.bisect_left(PRICE_BUCKETS_CENTS, price)], pos)
+            self.variant_start.append(len(self.variant_skus))
+
+        self.size = len(self.ids)
+        self.variant_size = len(self.variant_skus)
+        self._labels = labels
+        self._numeric = {name: _Sorted(pairs, self.size) for name, pairs in numeric.items()}
+        self._prices = _Sorted(prices, self.variant_size)
+
+        cardinality: Dict[str, int] = {}
+        coverage: Dict[str, int] = {}
+        for (field, _), posting in list(product_terms.items()) + list(has_terms.items()):
+            cardinality[field] = cardinality.get(field, 0) + 1
+            coverage[field] = coverage.get(field, 0) + len(posting)
+        # A field only one product has is not worth counting.
+        self._facet_fields = sorted(
+            f for f, n in cardinality.items() if n <= MAX_FACET_VALUES and coverage[f] > 1
+        )
+        facet_fields = set(self._facet_fields)
+        self._product_terms = self._compact(product_terms, self.size, facet_fields)
+        self._variant_terms = self._compact(variant_terms, self.variant_size, facet_fields)
+        # Product-level "has a variant with this value" bitmaps, only needed for counting.
+        self._has_terms = {k: to_bits(v, self.size) for k, v in has_terms.items() if k[0] in facet_fields}
+
+    @staticmethod
+    def _compact(terms: Dict[Tuple[str, str], List[int]], size: int, facet_fields: set) -> Dict[Tuple[str, str], Posting]:
+        out: Dict[Tuple[str, str], Posting] = {}
+        for key, posting in terms.items():
+            # A bitmap costs size/8 bytes, an array 4 bytes per entry.
+            if key[0] in facet_fields or len(posting) * 32 >= size:
+                out[key] = to_bits(posting, size)
+            else:
+                out[key] = array("I", posting)
+        return out
+
+    @staticmethod
+    def _bits(posting: Optional[Posting], size: int) -> int:
+        if posting is None:
+            return 0
+        return posting if isinstance(posting, int) else to_bits(posting, size)
+
+    def fields(self) -> Dict[str, List[str]]:
+        """Facet fields and their values (as first seen in the catalog)."""
+        out: Dict[str, List[str]] = {}
+        for key in list(self._product_terms) + list(self._has_terms):
+            if key[0] in self._facet_fields:
+                values = out.setdefault(key[0], [])
+                label = self._labels[key]
+                if label not in values:
+                    values.append(label)
+        out.update({f"spec.{name}": ["<number>"] for name in self._numeric})
+        return out
+
+    def query(
+        self,
+        *,
+        category: Optional[str] = None,
+        tags: Sequence[str] = (),
+        attributes: Optional[Dict[str, Any]] = None,
+        specs: Optional[Dict[str, Any]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> FacetResult:
+        """Products matching every filter, with facet counts over them.
+
+        `specs` values are matched exactly (strings case-insensitively, list
+        specs match any element) or, for numeric specs, given as a number or
+        a {"min", "max"} range. Attribute and price filters must be met by a
+        single variant. Numeric strings are accepted wherever a number is;
+        raises ValueError for other non-numeric bounds.
+        """
+        min_price, max_price = _bound(min_price, "min_price_cents"), _bound(max_price, "max_price_cents")
+        bits = (1 << self.size) - 1
+        if category:
+            bits &= self._bits(self._product_terms.get(("category", _norm(category))), self.size)
+        for tag in tags:
+            bits &= self._bits(self._product_terms.get(("tag", _norm(tag))), self.size)
+        for name, wanted in (specs or {}).items():
+            if isinstance(wanted, dict):
+                low, high = _bound(wanted.get("min"), f"specs.{name}.min"), _bound(wanted.get("max"), f"specs.{name}.max")
+                index = self._numeric.get(name)
+                bits &= index.between(low, high) if index else 0
+            elif name in self._numeric and _as_number(wanted) is not None:
+                value = _as_number(wanted)
+                bits &= self._numeric[name].between(value, value)
+            else:
+                bits &= self._bits(self._product_terms.get((f"spec.{name}", _norm(wanted))), self.size)
+
+        variant_bits: Optional[int] = None
+        if attributes or min_price is not None or max_price is not None:
+            variant_bits = (1 << self.variant_size) - 1
+            for name, wanted in (attributes or {}).items():
+                variant_bits &= self._bits(self._variant_terms.get((f"attr.{name}", _norm(wanted))), self.variant_size)
+            if min_price is not None or max_price is not None:
+                variant_bits &= self._prices.between(min_price, max_price)
+            owner = self.variant_owner
+            bits &= to_bits([owner[v] for v in positions(variant_bits)], self.size)
+
+        counts: Dict[str, Dict[str, int]] = {}
+        if bits:
+            for terms in (self._product_terms, self._has_terms):
+                for key, posting in terms.items():
+                    if key[0] not in self._facet_fields:
+                        continue
+                    n = (posting & bits).bit_count()  # type: ignore[operator]
+                    if n:
+                        counts.setdefault(key[0], {})[self._labels[key]] = n
+        for field, values in counts.items():
+            if field != "price":
+                counts[field] = dict(sorted(values.items(), key=lambda kv: (-kv[1], kv[0]))[:FACET_TOP])
+        return FacetResult(bits, variant_bits, counts)
+
+    def matching_skus(self, product: int, variant_bits: Optional[int]) -> List[str]:
+        """SKUs of `product` that satisfied the variant-level filters (all of them if there were none)."""
+        start, end = self.variant_start[product], self.variant_start[product + 1]
+        if variant_bits is None:
+            return self.variant_skus[start:end]
+        window = (variant_bits >> start) & ((1 << (end - start)) - 1)
+        return [self.variant_skus[start + i] for i in positions(window)]
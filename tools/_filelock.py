@@ -0,0 +1,74 @@
+"""Cross-process exclusive file lock.
+
+Used by the JSON backend to serialize read-check-write cycles (stock
+reservation, order placement) across threads and processes. Relies on
+`fcntl.flock` on POSIX and `msvcrt.locking` on Windows.
+"""
+
+import os
+import threading
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+
+class FileLock:
+    """Re-entrant within a thread, exclusive across threads and processes."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._thread_lock = threading.RLock()
+        self._local = threading.local()
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            try:
+                self._local.fd = self._acquire()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._local.depth = depth + 1
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._local.depth -= 1
+        try:
+            if self._local.depth == 0:
+                self._release(self._local.fd)
+        finally:
+            self._thread_lock.release()
+
+    def _acquire(self) -> int:
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                # LK_LOCK retries for ~10s; keep retrying for parity with flock.
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _release(self, fd: int) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
@@ -0,0 +1,261 @@
+"""Process-wide, in-memory inventory store keyed by SKU.
+
+`inventory.json` is parsed once into a SKU hash index. Stock changes made
+by orders are not written back to it: each one appends a line of new
+stock levels (`{"sku": stock, ...}`) to `stock.jsonl` next to it and is
+applied to a small overlay on top of the resident index, so placing an
+order costs O(items) however large the inventory is. When the journal
+outgrows the inventory file it is folded back into `inventory.json` and
+started afresh.
+
+On access both files are re-stat'ed: journal lines other processes
+appended are applied to the overlay, and a changed `inventory.json` is
+parsed and diffed against the rows last read from it, so only added,
+changed or removed SKUs are applied to the resident index (with any
+journal level for them on top); the overlay and journal offset are kept.
+Only a replaced or truncated journal (a fold by another process) or the
+first load rebuilds the index. The index and overlay are swapped in
+together, so batch readers always see one consistent version. Journal
+levels are absolute and take precedence over `inventory.json`, so edit
+that file by hand only after the journal has been folded into it (or
+delete the journal).
+
+Journal appends are flushed immediately but fsync'ed by `sync()`, which the
+order journal calls before each of its own (batched) fsyncs: an order
+never reaches disk ahead of the stock it took.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ._catalog import FileStamp, file_stamp
+
+
+# Fold the in-memory overlay into the index once it holds this share of the SKUs.
+_OVERLAY_FRACTION = 8
+_OVERLAY_MIN = 1024
+# Fold the journal into inventory.json once it is larger than this and than the inventory file.
+_JOURNAL_MIN_BYTES = 1 << 20
+
+Rows = Dict[str, Dict[str, Any]]
+
+
+def journal_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path), "stock.jsonl")
+
+
+def iter_stock_journal(path: str) -> Iterator[Dict[str, int]]:
+    """Stock levels recorded in a stock journal, oldest first; nothing if it does not exist."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logging.warning("Skipping corrupt stock journal line in %s", path)
+
+
+def _journal_id(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size)
+
+
+class InventoryStore:
+    """Resident SKU -> inventory row index over `inventory.json` and its stock journal."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._journal_path = journal_path(path)
+        self._lock = threading.Lock()
+        # (rows from inventory.json, rows whose stock the journal changed); replaced, never mutated.
+        self._view: Tuple[Rows, Rows] = ({}, {})
+        # Rows as last read from inventory.json, and journal levels applied since it was (re)loaded.
+        self._file_rows: Rows = {}
+        self._levels: Dict[str, int] = {}
+        self._stamp: Optional[FileStamp] = None
+        # (dev, inode, size) of the journal as far as it has been applied.
+        self._journal: Optional[Tuple[int, int, int]] = None
+        self._journal_file: Optional[Any] = None
+        self._unsynced = False
+        self._loaded = False
+        self._version = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def version(self) -> int:
+        self._refresh()
+        return self._version
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        base, overlay = self._view
+        return overlay.get(sku) or base.get(sku)
+
+    def get_many(self, skus: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Look up many SKUs against a single consistent index version."""
+        self._refresh()
+        base, overlay = self._view
+        return {sku: overlay.get(sku) or base.get(sku) for sku in skus}
+
+    def rows(self) -> List[Dict[str, Any]]:
+        self._refresh()
+        base, overlay = self._view
+        return [overlay.get(sku) or row for sku, row in base.items()]
+
+    def set_stock(self, stock: Dict[str, int]) -> None:
+        """Record new stock levels for some SKUs and apply them to the index.
+
+        Callers serialize writers across processes (see `JsonBackend`) and
+        must have read the levels they change after taking their lock.
+        """
+        line = (json.dumps(stock, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._refresh_locked()
+            f = self._journal_file
+            if f is None or os.fstat(f.fileno()).st_ino != (self._journal or (0, 0, 0))[1]:
+                if f is not None:
+                    f.close()
+                f = self._journal_file = open(self._journal_path, "ab")
+            f.write(line)
+            f.flush()
+            self._unsynced = True
+            # Writers are serialized, so the journal ends with our line.
+            self._journal = _journal_id(self._journal_path)
+            self._view = self._with_levels(self._view, [stock])
+            if self._journal and self._journal[2] > max(_JOURNAL_MIN_BYTES, (self._stamp or (0, 0))[1]):
+                self._fold_journal()
+
+    def sync(self) -> None:
+        """Force journal appends to stable storage."""
+        with self._lock:
+            if self._journal_file is not None and self._unsynced:
+                os.fsync(self._journal_file.fileno())
+            self._unsynced = False
+
+    def _refresh(self) -> None:
+        if self._loaded and file_stamp(self._path) == self._stamp and _journal_id(self._journal_path) == self._journal:
+            return
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self) -> None:
+        stamp = file_stamp(self._path)
+        current = _journal_id(self._journal_path)
+        seen = self._journal
+        # A journal that was replaced or truncated (folded by another process, or deleted)
+        # means inventory.json is the truth again.
+        replaced = seen is not None and (current is None or current[:2] != seen[:2] or current[2] < seen[2])
+        view, offset = self._view, seen[2] if seen is not None and not replaced else 0
+        if not self._loaded or stamp != self._stamp or replaced:
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    fresh = {row["sku"]: row for row in json.load(f)}
+            except Exception:
+                logging.exception("Failed reading inventory JSON %s", self._path)
+                if not self._loaded:
+                    raise
+                # Keep serving the last good index until the file is fixed.
+                self._stamp = stamp
+            else:
+                self._stamp = stamp
+                if not self._loaded or replaced:
+                    # Start over from the file; the (new) journal is applied from its start.
+                    self._loaded = True
+                    self._file_rows, self._levels = fresh, {}
+                    self._version += 1
+                    view, offset = (fresh, {}), 0
+                else:
+                    view = self._apply_file_changes(view, fresh)
+        levels: List[Dict[str, int]] = []
+        if current is not None and offset < current[2]:
+            with open(self._journal_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Another process is mid-append; pick it up next time.
+                        break
+                    try:
+                        levels.append(json.loads(line))
+                    except ValueError:
+                        logging.warning("Skipping corrupt stock journal line at offset %d", offset)
+                    offset += len(line)
+        self._journal = (current[0], current[1], offset) if current is not None else None
+        self._view = self._with_levels(view, levels) if levels else view
+
+    def _with_levels(self, view: Tuple[Rows, Rows], levels: List[Dict[str, int]]) -> Tuple[Rows, Rows]:
+        base, overlay = view
+        overlay = dict(overlay)
+        for stock in levels:
+            for sku, qty in stock.items():
+                self._levels[sku] = int(qty)
+                row = overlay.get(sku) or base.get(sku)
+                if row is not None:
+                    overlay[sku] = {**row, "stock": int(qty)}
+        self._version += 1
+        if len(overlay) >= max(_OVERLAY_MIN, len(base) // _OVERLAY_FRACTION):
+            # Amortized: one O(N) merge per N/8 changed SKUs.
+            return {**base, **overlay}, {}
+        return base, overlay
+
+    def _fold_journal(self) -> None:
+        """Rewrite inventory.json with the current levels and start an empty journal."""
+        base, overlay = self._view
+        rows = [overlay.get(sku) or row for sku, row in base.items()]
+        tmp_path = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+        # A new, empty journal file: other processes see its inode change and start over.
+        empty_path = f"{self._journal_path}.{os.getpid()}.tmp"
+        open(empty_path, "wb").close()
+        os.replace(empty_path, self._journal_path)
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        self._unsynced = False
+        self._view = ({row["sku"]: row for row in rows}, {})
+        self._file_rows, self._levels = self._view[0], {}
+        self._stamp = file_stamp(self._path)
+        self._journal = _journal_id(self._journal_path)
+        logging.info("Folded stock journal into %s (%d SKUs)", self._path, len(rows))
+
+    def _apply_file_changes(self, view: Tuple[Rows, Rows], fresh: Rows) -> Tuple[Rows, Rows]:
+        """Apply the SKUs added, changed or removed in inventory.json to `view`, keeping journal levels on top."""
+        old = self._file_rows
+        changed = [sku for sku, row in fresh.items() if old.get(sku) != row]
+        removed = [sku for sku in old if sku not in fresh]
+        self._file_rows = fresh
+        if not changed and not removed:
+            return view
+        base, overlay = dict(view[0]), dict(view[1])
+        for sku in changed:
+            row = fresh[sku]
+            if sku in self._levels:
+                row = {**row, "stock": self._levels[sku]}
+            base[sku] = row
+            overlay.pop(sku, None)
+        for sku in removed:
+            base.pop(sku, None)
+            overlay.pop(sku, None)
+        self._version += 1
+        logging.info(
+            "Refreshed inventory %s: %d changed, %d removed (version %d)",
+            self._path, len(changed), len(removed), self._version,
+        )
+        return base, overlay
@@ -0,0 +1,310 @@
+"""In-process metrics with a Prometheus text export.
+
+A small registry of labelled counters and fixed-bucket histograms. Tools
+(via `log_tool_call`) and the agent's model round trips record into the
+process-wide `REGISTRY`; `render()` produces the Prometheus text format
+served by `GET /metrics` in server mode, and `start_periodic_dump` writes it
+to a file for the REPL. With `SHOPTALK_METRICS=0` every record call returns
+immediately.
+"""
+
+import bisect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+ENABLED = os.getenv("SHOPTALK_METRICS", "1").strip().lower() not in {"0", "false", "no", "off"}
+# Fraction of successful tool results whose serialized size is measured.
+SIZE_SAMPLE = float(os.getenv("SHOPTALK_METRICS_SIZE_SAMPLE", "0.05"))
+
+LATENCY_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS_BYTES = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {_number(v)}" for labels, v in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS_S) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def mean(self, labels: Labels = ()) -> Optional[float]:
+        """Mean observed value of one series, or None before its first observation."""
+        with self._lock:
+            series = self._series.get(labels)
+            return series[1] / series[2] if series else None
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(list(self.buckets) + [float("inf")], counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _label_text(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = self._metrics.setdefault(name, Counter(name, help_text, labelnames))
+        return metric  # type: ignore[return-value]
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS_S) -> Histogram:
+        metric = self._metrics.setdefault(name, Histogram(name, help_text, labelnames, buckets))
+        return metric  # type: ignore[return-value]
+
+    def add_collector(self, collect) -> None:
+        """Register a callable returning extra exposition lines at render time."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")  # type: ignore[attr-defined]
+            lines.append(f"# TYPE {metric.name} {metric.kind}")  # type: ignore[attr-defined]
+            lines.extend(metric.samples())  # type: ignore[attr-defined]
+        for collect in self._collectors:
+            try:
+                lines.extend(collect())
+            except Exception:
+                logging.exception("Metrics collector failed")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALLS = REGISTRY.counter("shoptalk_tool_calls_total", "Tool calls by outcome.", ("tool", "outcome"))
+TOOL_LATENCY = REGISTRY.histogram("shoptalk_tool_latency_seconds", "Tool call latency.", ("tool",))
+TOOL_RESPONSE_BYTES = REGISTRY.histogram(
+    "shoptalk_tool_response_bytes", "Serialized size of a sample of tool results.", ("tool",), SIZE_BUCKETS_BYTES
+)
+MODEL_CALLS = REGISTRY.counter("shoptalk_model_calls_total", "Model round trips by kind and outcome.", ("kind", "outcome"))
+MODEL_LATENCY = REGISTRY.histogram("shoptalk_model_latency_seconds", "Model round-trip latency.", ("kind",))
+MODEL_TOKENS = REGISTRY.counter("shoptalk_model_tokens_total", "Tokens reported in Gemini usage metadata.", ("type",))
+ROUTED_TURNS = REGISTRY.counter(
+    "shoptalk_routed_turns_total", "User turns by route: a fast-path intent, or \"model\".", ("route",)
+)
+ROUTED_SAVED_SECONDS = REGISTRY.counter(
+    "shoptalk_routed_saved_seconds_total", "Estimated model time saved by fast-path answers."
+)
+HISTORY_TOKENS = REGISTRY.counter(
+    "shoptalk_history_tokens_total", "Estimated chat history tokens per user turn, before and after compaction.", ("stage",)
+)
+
+
+def record_tool(tool: str, seconds: float, ok: bool, response_bytes: Optional[int] = None) -> None:
+    if not ENABLED:
+        return
+    TOOL_CALLS.inc((tool, "ok" if ok else "error"))
+    TOOL_LATENCY.observe((tool,), seconds)
+    if response_bytes is not None:
+        TOOL_RESPONSE_BYTES.observe((tool,), response_bytes)
+
+
+# Results waiting to be sized for TOOL_RESPONSE_BYTES. Serializing a result
+# costs more than most tool calls, so only a `SIZE_SAMPLE` share is sized, on a
+# background thread; when that thread falls behind, results are skipped rather
+# than queued without bound.
+_SIZE_QUEUE_MAX = 1024
+_sizes: "queue.Queue[Tuple[str, object]]" = queue.Queue(maxsize=_SIZE_QUEUE_MAX)
+_sizer: Optional[threading.Thread] = None
+_sizer_lock = threading.Lock()
+
+
+def _json_size(value: object) -> Optional[int]:
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _size_forever() -> None:
+    while True:
+        tool, result = _sizes.get()
+        size = _json_size(result)
+        if size is not None:
+            TOOL_RESPONSE_BYTES.observe((tool,), size)
+
+
+def record_result_size(tool: str, result: object) -> None:
+    """Queue a sampled tool result to be sized off the calling thread (best effort).
+
+    The result must not be mutated afterwards; tool results are treated as
+    read-only once returned (they may be cached and logged as-is too).
+    """
+    global _sizer
+    if not ENABLED or not SIZE_SAMPLE or (SIZE_SAMPLE < 1 and random.random() >= SIZE_SAMPLE):
+        return
+    if _sizer is None:
+        with _sizer_lock:
+            if _sizer is None:
+                _sizer = threading.Thread(target=_size_forever, name="shoptalk-metrics-sizer", daemon=True)
+                _sizer.start()
+    try:
+        _sizes.put_nowait((tool, result))
+    except queue.Full:
+        pass
+
+
+def _reset_sizer() -> None:
+    # A forked child inherits the queue but not the thread.
+    global _sizes, _sizer, _sizer_lock
+    _sizes = queue.Queue(maxsize=_SIZE_QUEUE_MAX)
+    _sizer = None
+    _sizer_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_sizer)
+
+
+_USAGE_FIELDS = (
+    ("prompt_token_count", "prompt"),
+    ("candidates_token_count", "candidates"),
+    ("cached_content_token_count", "cached"),
+    ("tool_use_prompt_token_count", "tool_use_prompt"),
+    ("thoughts_token_count", "thoughts"),
+    ("total_token_count", "total"),
+)
+
+
+def record_model(kind: str, seconds: float, ok: bool, usage: object = None) -> None:
+    """Record one model round trip; `usage` is a response's `usage_metadata`."""
+    if not ENABLED:
+        return
+    MODEL_CALLS.inc((kind, "ok" if ok else "error"))
+    MODEL_LATENCY.observe((kind,), seconds)
+    if usage is not None:
+        for attr, token_type in _USAGE_FIELDS:
+            value = getattr(usage, attr, None)
+            if value:
+                MODEL_TOKENS.inc((token_type,), value)
+
+
+def record_route(route: str, saved_seconds: float = 0.0) -> None:
+    """Record how one user turn was answered (see `agent.router`)."""
+    if not ENABLED:
+        return
+    ROUTED_TURNS.inc((route,))
+    if saved_seconds > 0:
+        ROUTED_SAVED_SECONDS.inc((), saved_seconds)
+
+
+def model_round_trip_s() -> Optional[float]:
+    """Mean model round trip observed so far (sends and streams), or None before the first."""
+    means = [m for m in (MODEL_LATENCY.mean(("send",)), MODEL_LATENCY.mean(("stream",))) if m is not None]
+    return sum(means) / len(means) if means else None
+
+
+def record_history(before_tokens: int, after_tokens: int) -> None:
+    """Record one user turn's history size before and after `agent.history` compaction."""
+    if not ENABLED:
+        return
+    HISTORY_TOKENS.inc(("before",), before_tokens)
+    HISTORY_TOKENS.inc(("sent",), after_tokens)
+
+
+def start_periodic_dump(path: Optional[str] = None, interval_s: Optional[float] = None) -> Optional[threading.Thread]:
+    """Rewrite `path` with `render()` every `interval_s` seconds from a daemon thread.
+
+    Defaults come from `SHOPTALK_METRICS_DUMP_PATH` / `SHOPTALK_METRICS_DUMP_S`;
+    nothing starts when metrics are disabled or the interval is 0.
+    """
+    path = path or os.getenv("SHOPTALK_METRICS_DUMP_PATH") or os.path.join("logs", "metrics.prom")
+    interval_s = float(os.getenv("SHOPTALK_METRICS_DUMP_S", "0")) if interval_s is None else interval_s
+    if not ENABLED or interval_s <= 0:
+        return None
+
+    def dump_forever() -> None:
+        while True:
+            time.sleep(interval_s)
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(REGISTRY.render())
+                os.replace(tmp_path, path)
+            except OSError:
+                logging.exception("Failed writing metrics to %s", path)
+
+    thread = threading.Thread(target=dump_forever, name="shoptalk-metrics-dump", daemon=True)
+    thread.start()
+    return thread
+
+
+def labelled_lines(name: str, help_text: str, kind: str, labelnames: Sequence[str], rows: Iterable[Tuple[Labels, float]]) -> List[str]:
+    """Exposition lines for values computed at render time (see `Registry.add_collector`)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_label_text(labelnames, labels)} {_number(value)}" for labels, value in rows)
+    return lines
@@ -0,0 +1,253 @@
+"""Append-only order journal.
+
+Orders live in `orders.jsonl`, one JSON record per line. New orders and
+later updates of an existing order are appended, never rewritten in place,
+and an in-memory orderId -> byte offset index points at each order's latest
+record so lookups are a single seek + line read.
+
+Writes are flushed immediately but fsync'ed in batches (every
+`FSYNC_BATCH` records or `FSYNC_INTERVAL_S` seconds, and on exit), after
+`before_sync` (the JSON backend syncs its stock journal there). When
+superseded records (updates of an order, from any process) make up most of
+the file it is compacted, checked after each append and when the journal
+is opened. Appends and
+compaction take a cross-process lock (`.orders.lock`), so a compaction
+never replaces the file under another process's append. Records appended
+by other processes are indexed lazily on the next miss/append.
+On first use a legacy `orders.json` array is migrated into the journal once.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from ._filelock import FileLock
+
+
+FSYNC_BATCH = int(os.getenv("SHOPTALK_ORDERS_FSYNC_BATCH", "16"))
+FSYNC_INTERVAL_S = float(os.getenv("SHOPTALK_ORDERS_FSYNC_INTERVAL_S", "0.05"))
+# Compact once at least this many records are superseded and they outnumber live ones.
+COMPACT_MIN_DEAD = 1000
+
+# Journals to sync and close at exit; one atexit hook for all of them.
+_JOURNALS: "weakref.WeakSet[OrderJournal]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all() -> None:
+    for journal in list(_JOURNALS):
+        journal.close()
+
+
+class OrderJournal:
+    """JSON-lines order log with an orderId -> offset index."""
+
+    def __init__(
+        self, path: str, legacy_path: Optional[str] = None, before_sync: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._path = path
+        self._legacy_path = legacy_path
+        # Runs before each fsync, e.g. to sync writes the records depend on.
+        self._before_sync = before_sync
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(os.path.dirname(path), ".orders.lock"))
+        self._index: Dict[str, int] = {}
+        self._dead = 0
+        self._file: Optional[Any] = None
+        self._scanned_to = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        self._opened = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def __len__(self) -> int:
+        self._open()
+        return len(self._index)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Append an order record (new order or full updated copy of one)."""
+        line = (json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock, self._file_lock:
+            self._open()
+            # Pick up records other processes appended since our last scan.
+            self._catch_up()
+            f = self._file
+            f.write(line)
+            f.flush()
+            # The file is opened O_APPEND, so our record ends at our own position.
+            end = f.tell()
+            offset = end - len(line)
+            if row["orderId"] in self._index:
+                self._dead += 1
+            self._index[row["orderId"]] = offset
+            if self._scanned_to == offset:
+                self._scanned_to = end
+            self._unsynced += 1
+            self._maybe_sync()
+            self._maybe_compact()
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._open()
+            offset = self._index.get(order_id)
+            if offset is None:
+                self._catch_up()
+                offset = self._index.get(order_id)
+            if offset is None:
+                return None
+            f = self._file
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def sync(self) -> None:
+        """Force pending appends to stable storage."""
+        with self._lock:
+            if self._file is not None and self._unsynced:
+                if self._before_sync is not None:
+                    self._before_sync()
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def compact(self) -> None:
+        """Rewrite the journal keeping only the latest record of each order."""
+        with self._lock, self._file_lock:
+            self._open()
+            # Records other processes appended must survive the rewrite.
+            self._catch_up()
+            tmp_path = f"{self._path}.{os.getpid()}.tmp"
+            index: Dict[str, int] = {}
+            with open(tmp_path, "wb") as out:
+                for order_id, offset in sorted(self._index.items(), key=lambda kv: kv[1]):
+                    self._file.seek(offset)
+                    index[order_id] = out.tell()
+                    out.write(self._file.readline())
+                out.flush()
+                if self._before_sync is not None:
+                    self._before_sync()
+                os.fsync(out.fileno())
+            self._file.close()
+            os.replace(tmp_path, self._path)
+            self._file = open(self._path, "a+b")
+            self._scanned_to = self._file.seek(0, os.SEEK_END)
+            self._index = index
+            self._dead = 0
+            self._unsynced = 0
+            logging.info("Compacted order journal %s to %d orders", self._path, len(index))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+                self._opened = False
+            _JOURNALS.discard(self)
+
+    def _maybe_sync(self) -> None:
+        if self._unsynced >= FSYNC_BATCH or time.monotonic() - self._last_sync >= FSYNC_INTERVAL_S:
+            self.sync()
+        elif self._sync_timer is None:
+            # Bound how long a quiet tail of the batch can stay unsynced.
+            timer = threading.Timer(FSYNC_INTERVAL_S, self._timed_sync)
+            timer.daemon = True
+            self._sync_timer = timer
+            timer.start()
+
+    def _maybe_compact(self) -> None:
+        if self._dead >= COMPACT_MIN_DEAD and self._dead > len(self._index):
+            self.compact()
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            self._sync_timer = None
+            self.sync()
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        with self._lock:
+            if self._opened:
+                return
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            if not os.path.exists(self._path):
+                self._migrate_legacy()
+            self._file = open(self._path, "a+b")
+            self._index = {}
+            self._dead = 0
+            self._scanned_to = 0
+            self._catch_up(repair=True)
+            self._opened = True
+            _JOURNALS.add(self)
+            self._maybe_compact()
+
+    def _catch_up(self, repair: bool = False) -> None:
+        """Index records appended past the last scanned offset.
+
+        Reopens from scratch if another process compacted (replaced) the file.
+        """
+        try:
+            on_disk = os.stat(self._path)
+        except OSError:
+            return
+        ours = os.fstat(self._file.fileno())
+        if (on_disk.st_dev, on_disk.st_ino) != (ours.st_dev, ours.st_ino):
+            self._file.close()
+            self._file = open(self._path, "a+b")
+            self._index = {}
+            self._dead = 0
+            self._scanned_to = 0
+        if on_disk.st_size <= self._scanned_to:
+            return
+        f = self._file
+        f.seek(self._scanned_to)
+        offset = self._scanned_to
+        for line in iter(f.readline, b""):
+            if not line.endswith(b"\n"):
+                if repair:
+                    # A torn final write from a crash; drop it so appends start clean.
+                    logging.warning("Truncating partial order journal record at offset %d", offset)
+                    f.truncate(offset)
+                # Otherwise another process is mid-append; pick it up next time.
+                break
+            try:
+                row = json.loads(line)
+            except ValueError:
+                logging.warning("Skipping corrupt order journal line at offset %d", offset)
+            else:
+                previous = self._index.get(row["orderId"])
+                if previous is not None and previous != offset:
+                    self._dead += 1
+                self._index[row["orderId"]] = offset
+            offset += len(line)
+        self._scanned_to = offset
+
+    def _migrate_legacy(self) -> None:
+        if not self._legacy_path or not os.path.exists(self._legacy_path):
+            return
+        with open(self._legacy_path, "r", encoding="utf-8") as f:
+            rows: List[Dict[str, Any]] = json.load(f)
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        try:
+            # link() refuses to overwrite, so a concurrent migration cannot clobber ours.
+            os.link(tmp_path, self._path)
+        except FileExistsError:
+            return
+        finally:
+            os.remove(tmp_path)
+        logging.info("Migrated %d orders from %s to %s", len(rows), self._legacy_path, self._path)
@@ -0,0 +1,108 @@
+"""Cart pricing shared by `estimate_price` and `estimate_price_many`.
+
+Quoting is split in two steps so a batch can share work:
+
+- `resolve_cart`: validate items and resolve SKUs/prices against the
+  catalog (once per cart; a `memo` shares lookups across carts);
+- `quote`: discount, tax, shipping and ETA for a resolved cart under one
+  region's rates (`DestinationTable.rates`, from `shipping/destinations.json`).
+  These depend only on the cart's subtotal and quantity and on the
+  region, so a batch computes them once per (cart, distinct region)
+  however many cities are asked for.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from ._backend import StorageBackend
+from ._destinations import RegionRates
+from ._shared import PriceBreakdown, find_price_for_sku, find_sku_for_product_variant_attributes
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedCart:
+    __slots__ = ("items", "invalid_items", "subtotal_cents", "quantity")
+
+    def __init__(self) -> None:
+        self.items: List[Dict[str, Any]] = []
+        self.invalid_items: List[Dict[str, Any]] = []
+        self.subtotal_cents = 0
+        self.quantity = 0
+
+
+def _memoized(memo: Dict[Any, Any], key: Any, fetch: Callable[[], Any]) -> Any:
+    if key not in memo:
+        memo[key] = fetch()
+    return memo[key]
+
+
+def resolve_cart(
+    store: StorageBackend, items: List[Dict[str, Any]], memo: Optional[Dict[Any, Any]] = None
+) -> ResolvedCart:
+    """Normalize cart items to sku/unitPriceCents/currency/quantity; unusable ones go to `invalid_items`."""
+    memo = {} if memo is None else memo
+    cart = ResolvedCart()
+    for item in items:
+        if not isinstance(item, dict):
+            cart.invalid_items.append({"item": item, "reason": "item must be an object"})
+            continue
+        try:
+            qty = int(item.get("quantity", 1))
+            if qty <= 0:
+                cart.invalid_items.append({"item": item, "reason": "quantity must be >= 1"})
+                continue
+            price = int(item.get("unitPriceCents", 0))
+            sku = (item.get("sku") or "").strip() if item.get("sku") else None
+
+            # If only product/attributes provided, try to resolve a sku
+            if not sku and item.get("productId") and item.get("attributes"):
+                product_id, attrs = str(item.get("productId")), dict(item.get("attributes"))
+                key = ("attributes", product_id, tuple(sorted((str(k), str(v)) for k, v in attrs.items())))
+                resolved = _memoized(memo, key, lambda: find_sku_for_product_variant_attributes(store, product_id, attrs))
+                if resolved:
+                    sku = str(resolved.get("sku"))
+                    if price <= 0:
+                        price = int(resolved.get("unitPriceCents", 0))
+
+            # If sku present but price missing, look up price
+            currency = "USD"
+            if (price <= 0) and sku:
+                found = _memoized(memo, ("sku", sku), lambda: find_price_for_sku(store, sku))
+                if found:
+                    price = int(found.get("unitPriceCents", 0))
+                    currency = found.get("currency", "USD")
+
+            # If still no price, skip this item
+            if price <= 0:
+                cart.invalid_items.append({"item": item, "reason": "missing price and sku could not be resolved"})
+                continue
+
+            cart.subtotal_cents += qty * price
+            cart.quantity += qty
+            cart.items.append({"sku": sku, "unitPriceCents": price, "currency": currency, "quantity": qty})
+        except Exception:
+            logger.exception("estimate_price: error processing item: %s", item)
+            cart.invalid_items.append({"item": item, "reason": "exception while processing item"})
+            continue
+    return cart
+
+
+def quote(cart: ResolvedCart, rates: RegionRates) -> Dict[str, Any]:
+    """Price breakdown and delivery ETA of a resolved cart under a region's rates."""
+    discount = int(round(cart.subtotal_cents * rates.discount_rate))
+    taxed_base = cart.subtotal_cents - discount
+    tax = int(round(taxed_base * rates.tax_rate))
+    shipping = rates.shipping_base_cents + max(0, cart.quantity - 1) * rates.shipping_per_extra_item_cents
+    breakdown = PriceBreakdown(
+        subtotal_cents=cart.subtotal_cents,
+        discount_cents=discount,
+        tax_cents=tax,
+        shipping_cents=shipping,
+        total_cents=taxed_base + tax + shipping,
+    )
+    return {
+        "breakdown": breakdown.to_dict(),
+        "deliveryEtaDays": list(rates.eta_days),
+    }
@@ -0,0 +1,362 @@
+"""Tokenized inverted index used by `search_products`.
+
+Built once per catalog snapshot over name, category, shortDescription and
+tags. A product whose id repeats an earlier one is not indexed (the catalog
+serves the first). Multi-term queries intersect posting lists (every term must match)
+and hits are ranked with BM25, with early termination once the top results
+can no longer change.
+
+Query terms missing from the vocabulary are expanded before matching:
+first as prefixes ("headph" -> "headphones") via a sorted vocabulary, then
+as typos ("aurra" -> "aurora") via a SymSpell-style delete index bounded by
+`SHOPTALK_SEARCH_MAX_EDIT_DISTANCE`.
+"""
+
+import bisect
+import heapq
+import math
+import os
+import re
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Term-frequency weight per field, so a hit in the name outranks one in the copy.
+_FIELD_WEIGHTS: Tuple[Tuple[str, int], ...] = (
+    ("name", 3),
+    ("category", 2),
+    ("tags", 2),
+    ("shortDescription", 1),
+)
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+MAX_EDIT_DISTANCE = int(os.getenv("SHOPTALK_SEARCH_MAX_EDIT_DISTANCE", "2"))
+_MIN_PREFIX_LEN = 3
+_MAX_EXPANSIONS = 16
+# Expanded terms score below exact hits.
+_PREFIX_WEIGHT = 0.8
+_TYPO_WEIGHT = 0.5
+_EXPANSION_CACHE_SIZE = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _allowed_distance(term: str) -> int:
+    # Short terms tolerate fewer edits, otherwise "cat" would match "car" and "hat".
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 5:
+        return min(1, MAX_EDIT_DISTANCE)
+    return MAX_EDIT_DISTANCE
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    out: Set[str] = set()
+    frontier = {term}
+    for _ in range(distance):
+        nxt: Set[str] = set()
+        for word in frontier:
+            if len(word) <= 1:
+                continue
+            for i in range(len(word)):
+                nxt.add(word[:i] + word[i + 1:])
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, prev2[j - 2] + 1)
+            cur[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+class _Posting:
+    """Doc -> BM25 impact map for one (possibly expanded) query term."""
+
+    __slots__ = ("impacts", "max_impact", "_ranked")
+
+    def __init__(self, impacts: Dict[int, float]) -> None:
+        self.impacts = impacts
+        self.max_impact = max(impacts.values()) if impacts else 0.0
+        self._ranked: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.impacts)
+
+    def ranked(self) -> List[int]:
+        """Docs in descending impact order, sorted lazily on first use."""
+        ranked = self._ranked
+        if ranked is None:
+            impacts = self.impacts
+            ranked = sorted(impacts, key=lambda d: (-impacts[d], d))
+            self._ranked = ranked
+        return ranked
+
+
+class SearchIndex:
+    """Inverted index mapping terms to {product position: BM25 impact}."""
+
+    def __init__(self, products: Sequence[Dict[str, Any]]) -> None:
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lens: List[int] = []
+        categories: List[str] = []
+        seen: Set[Any] = set()
+        skipped: Set[int] = set()
+        for doc, product in enumerate(products):
+            product_id = product.get("id")
+            if product_id is None or product_id in seen:
+                # Same first-match rule as the catalog's by_id.
+                skipped.add(doc)
+                doc_lens.append(0)
+                categories.append("")
+                continue
+            seen.add(product_id)
+            length = 0
+            for field, weight in _FIELD_WEIGHTS:
+                value = product.get(field)
+                if field == "tags":
+                    value = " ".join(str(t) for t in (value or []))
+                for term in tokenize(str(value or "")):
+                    posting = postings.setdefault(term, {})
+                    posting[doc] = posting.get(doc, 0) + weight
+                    length += weight
+            doc_lens.append(length)
+            categories.append((product.get("category") or "").strip().lower())
+        self._categories = categories
+        self._skipped = frozenset(skipped)
+        self._size = len(doc_lens) - len(skipped)
+        # Store each posting as its precomputed BM25 contribution ("impact") so
+        # a query only sums dict lookups over the intersected candidates.
+        avg_len = (sum(doc_lens) / self._size) if self._size else 1.0
+        norms = [_BM25_K1 * (1.0 - _BM25_B + _BM25_B * n / (avg_len or 1.0)) for n in doc_lens]
+        impacts: Dict[str, _Posting] = {}
+        for term, posting in postings.items():
+            idf = self._idf(len(posting))
+            impacts[term] = _Posting({d: idf * tf * (_BM25_K1 + 1.0) / (tf + norms[d]) for d, tf in posting.items()})
+        self._postings = impacts
+
+        # Auxiliary vocabulary indexes for prefix and typo expansion.
+        self._vocab: List[str] = sorted(impacts)
+        deletes: Dict[str, List[str]] = {}
+        for term in self._vocab:
+            for variant in _deletes(term, _allowed_distance(term)):
+                deletes.setdefault(variant, []).append(term)
+        self._deletes = deletes
+        self._expanded: Dict[str, Optional[_Posting]] = {}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def postings(self, term: str) -> Dict[int, float]:
+        posting = self._postings.get(term)
+        return posting.impacts if posting is not None else {}
+
+    def _idf(self, df: int) -> float:
+        return math.log(1.0 + (self.size - df + 0.5) / (df + 0.5))
+
+    def _by_df(self, terms: List[str]) -> List[str]:
+        return sorted(terms, key=lambda t: (-len(self._postings[t]), t))[:_MAX_EXPANSIONS]
+
+    def prefix_matches(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with prefix, most frequent first."""
+        if len(prefix) < _MIN_PREFIX_LEN:
+            return []
+        lo = bisect.bisect_left(self._vocab, prefix)
+        hi = bisect.bisect_left(self._vocab, prefix + "\uffff", lo)
+        return self._by_df(self._vocab[lo:hi])
+
+    def typo_matches(self, term: str) -> List[str]:
+        """Vocabulary terms at the smallest edit distance within the allowed bound."""
+        limit = _allowed_distance(term)
+        if limit <= 0:
+            return []
+        candidates: Set[str] = set()
+        for variant in _deletes(term, limit) | {term}:
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._deletes.get(variant, ()))
+        best = limit + 1
+        matches: List[str] = []
+        for cand in candidates:
+            dist = edit_distance(term, cand, limit)
+            if dist < best:
+                best, matches = dist, [cand]
+            elif dist == best:
+                matches.append(cand)
+        return self._by_df(matches) if best <= limit else []
+
+    def expand(self, term: str) -> List[Tuple[str, float]]:
+        """Return (vocabulary term, score weight) pairs a query term stands for."""
+        if term in self._postings:
+            return [(term, 1.0)]
+        prefixed = self.prefix_matches(term)
+        if prefixed:
+            return [(t, _PREFIX_WEIGHT) for t in prefixed]
+        return [(t, _TYPO_WEIGHT) for t in self.typo_matches(term)]
+
+    def _resolve(self, term: str) -> Optional[_Posting]:
+        posting = self._postings.get(term)
+        if posting is not None:
+            return posting
+        cache = self._expanded
+        if term in cache:
+            return cache[term]
+        merged: Dict[int, float] = {}
+        for expansion, weight in self.expand(term):
+            for d, impact in self._postings[expansion].impacts.items():
+                value = impact * weight
+                if value > merged.get(d, 0.0):
+                    merged[d] = value
+        resolved = _Posting(merged) if merged else None
+        if len(cache) >= _EXPANSION_CACHE_SIZE:
+            # Rebind rather than clear so concurrent readers keep a valid dict.
+            cache = self._expanded = {}
+        cache[term] = resolved
+        return resolved
+
+    def search(self, query: str, *, category: Optional[str] = None, limit: int = 10) -> List[int]:
+        """Return product positions matching every query term, best first.
+
+        A query without any terms matches every product in catalog order,
+        mirroring the behaviour of the former substring matcher.
+        """
+        return [d for _, d in self.search_scored(query, category=category, limit=limit)]
+
+    def _query_postings(self, query: str) -> Optional[List[_Posting]]:
+        """Postings of every query term ([] for no terms), or None if a term matches nothing."""
+        lists: List[_Posting] = []
+        for term in dict.fromkeys(tokenize(query)):
+            posting = self._resolve(term)
+            if posting is None:
+                return None
+            lists.append(posting)
+        return lists
+
+    def search_scored(
+        self, query: str, *, category: Optional[str] = None, limit: int = 10, after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[float, int]]:
+        """`search` with scores: (score, position) pairs, best first.
+
+        `after` is the (score, position) of the last hit of a previous page;
+        only hits ranked below it are returned. Single-term and term-less
+        queries resume right after it; multi-term queries walk the rarest
+        term again from its best hit, skipping what was already returned,
+        so later pages cost more than the first. Queries without terms score
+        every product 0.
+        """
+        if limit <= 0:
+            return []
+        cat = (category or "").strip().lower() or None
+        lists = self._query_postings(query)
+        if lists is None:
+            return []
+        if not lists:
+            docs: Iterator[int] = iter(range(after[1] + 1 if after else 0, len(self._categories)))
+            if cat is not None:
+                docs = (d for d in docs if self._categories[d] == cat)
+            elif self._skipped:
+                docs = (d for d in docs if d not in self._skipped)
+            return [(0.0, d) for d in islice(docs, limit)]
+        # Ranking order is descending (score, -position); everything at or above `bound` was already returned.
+        bound = (after[0], -after[1]) if after else None
+        if len(lists) == 1:
+            return self._top_for_posting(lists[0], cat, limit, bound)
+        # Walk the rarest term in impact order and stop once no unseen doc can
+        # beat the current top-k (its impact plus the best possible impacts of
+        # the other terms).
+        lists.sort(key=len)
+        lead = lists[0].impacts
+        others = [p.impacts for p in lists[1:]]
+        bonus = sum(p.max_impact for p in lists[1:])
+        heap: List[Tuple[float, int]] = []
+        for d in lists[0].ranked():
+            impact = lead[d]
+            if len(heap) >= limit and impact + bonus < heap[0][0]:
+                break
+            if cat is not None and self._categories[d] != cat:
+                continue
+            score = impact
+            for posting in others:
+                value = posting.get(d)
+                if value is None:
+                    break
+                score += value
+            else:
+                # Min-heap on (score, -doc) so ties fall back to catalog order.
+                entry = (score, -d)
+                if bound is not None and entry >= bound:
+                    continue
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+        return [(score, -d) for score, d in sorted(heap, reverse=True)]
+
+    def _top_for_posting(
+        self, posting: _Posting, cat: Optional[str], limit: int, bound: Optional[Tuple[float, int]]
+    ) -> List[Tuple[float, int]]:
+        ranked = posting.ranked()
+        impacts = posting.impacts
+        start = 0
+        if bound is not None:
+            # `ranked` is sorted by (-impact, doc): skip straight past the previous page.
+            start = bisect.bisect_right(ranked, (-bound[0], -bound[1]), key=lambda d: (-impacts[d], d))
+        out: List[Tuple[float, int]] = []
+        for d in islice(ranked, start, None):
+            if cat is None or self._categories[d] == cat:
+                out.append((impacts[d], d))
+                if len(out) >= limit:
+                    break
+        return out
+
+    def score(self, query: str, doc: int) -> Optional[float]:
+        """Score of product position `doc` for `query`, or None if it does not match."""
+        lists = self._query_postings(query)
+        if lists is None or not 0 <= doc < len(self._categories) or doc in self._skipped:
+            return None
+        total = 0.0
+        for posting in lists:
+            value = posting.impacts.get(doc)
+            if value is None:
+                return None
+            total += value
+        return total
+
+    def count(self, query: str, *, category: Optional[str] = None) -> int:
+        """Number of products matching `query` (what paging through every result would return)."""
+        cat = (category or "").strip().lower() or None
+        lists = self._query_postings(query)
+        if lists is None:
+            return 0
+        if not lists:
+            return self.size if cat is None else sum(1 for c in self._categories if c == cat)
+        lists.sort(key=len)
+        others = [p.impacts for p in lists[1:]]
+        return sum(
+            1 for d in lists[0].impacts
+            if (cat is None or self._categories[d] == cat) and all(d in other for other in others)
+        )
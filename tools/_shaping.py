@@ -0,0 +1,191 @@
+"""Response shaping: keep tool results small before they reach the prompt.
+
+Every tool result is serialized into the next model request (and stays in
+the chat history), so its size costs tokens and latency on every later
+turn. The helpers here are used by the catalog tools:
+
+- `project`: keep only the requested fields (`specs.weightGrams` style
+  dotted paths reach into nested objects);
+- `summarize_variants` / `compact_variants`: replace full variant lists
+  with a count, price range and option values, or drop repeated keys;
+- `fit_to_budget` / `page`: cut a result list at the tool's byte budget
+  and wrap it with `total`, `hasMore` and a keyset `nextCursor` (see
+  `StorageBackend.page_products`) that resumes after the last item returned.
+
+Budgets are bytes of compact JSON (roughly 4 bytes per token):
+`SHOPTALK_RESPONSE_BUDGET_BYTES` sets the default and
+`SHOPTALK_RESPONSE_BUDGETS="search_products=3000,list_products=2000"`
+overrides single tools (0 = unlimited). `SHOPTALK_COMPACT_RESPONSES=0`
+restores the verbose shapes (full variants, no budget).
+"""
+
+import base64
+import binascii
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUDGET_BYTES = 6000
+
+VARIANT_MODES = ("summary", "full", "none")
+
+
+def compact_enabled() -> bool:
+    return os.getenv("SHOPTALK_COMPACT_RESPONSES", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def budget_for(tool: str) -> int:
+    """Byte budget of `tool`'s result; 0 means unlimited."""
+    if not compact_enabled():
+        return 0
+    for entry in os.getenv("SHOPTALK_RESPONSE_BUDGETS", "").split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() == tool and value.strip():
+            return int(value)
+    return int(os.getenv("SHOPTALK_RESPONSE_BUDGET_BYTES", str(DEFAULT_BUDGET_BYTES)))
+
+
+def json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _project(item: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for path in fields:
+        head, _, rest = str(path).strip().partition(".")
+        if head not in item:
+            continue
+        value = item[head]
+        if rest and isinstance(value, dict):
+            nested = out.get(head)
+            if not isinstance(nested, dict):
+                nested = out[head] = {}
+            nested.update(_project(value, [rest]))
+        else:
+            out[head] = value
+    return out
+
+
+def project(item: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Copy of `item` with only `fields` (and always `id`); None keeps everything."""
+    if not fields:
+        return item
+    return _project(item, ["id", *fields])
+
+
+def summarize_variants(variants: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Count, price range and option values of a product's variants."""
+    prices: List[int] = []
+    currencies = set()
+    options: Dict[str, List[str]] = {}
+    for v in variants:
+        prices.append(int(v.get("listPrice", 0)))
+        currencies.add(v.get("currency", "USD"))
+        for key, value in (v.get("attributes") or {}).items():
+            values = options.setdefault(key, [])
+            if value not in values:
+                values.append(value)
+    summary: Dict[str, Any] = {"count": len(prices)}
+    if prices:
+        summary["minPrice"] = min(prices)
+        summary["maxPrice"] = max(prices)
+        summary["currency"] = currencies.pop() if len(currencies) == 1 else sorted(currencies)
+    if options:
+        summary["options"] = options
+    return summary
+
+
+def compact_variants(variants: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Variants as sku/attributes/listPrice, plus their currency when they all share one.
+
+    When currencies differ each variant keeps its own and the second value is None.
+    """
+    variants = list(variants)
+    currencies = {v.get("currency", "USD") for v in variants}
+    shared = currencies.pop() if len(currencies) == 1 else None
+    out = []
+    for v in variants:
+        row: Dict[str, Any] = {"sku": v.get("sku"), "attributes": v.get("attributes"), "listPrice": v.get("listPrice")}
+        if shared is None:
+            row["currency"] = v.get("currency", "USD")
+        out.append(row)
+    return out, shared
+
+
+def shape_variants(variants: Sequence[Dict[str, Any]], mode: str) -> Dict[str, Any]:
+    """Fields to merge into a product summary for a `variants` mode ("summary", "full" or "none")."""
+    if mode not in VARIANT_MODES:
+        raise ValueError(f"variants must be one of {', '.join(VARIANT_MODES)}")
+    if mode == "none":
+        return {}
+    if mode == "summary":
+        return {"variantSummary": summarize_variants(variants)}
+    return {"variants": [
+        {"sku": v.get("sku"), "attributes": v.get("attributes"), "listPrice": v.get("listPrice"), "currency": v.get("currency")}
+        for v in variants
+    ]}
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, tool: str, **expected: Any) -> Dict[str, Any]:
+    """Decode a cursor issued by `tool`; raises ValueError if it is malformed or for other arguments."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(state, dict) or state.get("tool") != tool:
+        raise ValueError(f"Cursor was not issued by {tool}")
+    for key, value in expected.items():
+        if state.get(key) != value:
+            raise ValueError(f"Cursor does not match this {key}; repeat the original arguments")
+    return state
+
+
+def fit_to_budget(items: List[Dict[str, Any]], budget: int) -> int:
+    """How many leading `items` fit in `budget` bytes (at least one; all if budget is 0)."""
+    if not budget:
+        return len(items)
+    used = 2  # the enclosing []
+    for n, item in enumerate(items):
+        used += json_size(item) + (1 if n else 0)
+        if used > budget and n:
+            return n
+    return len(items)
+
+
+def page_limit(limit: Any) -> int:
+    """A page size as the paging tools use it: an int, at least 0 (an empty page)."""
+    return max(0, int(limit))
+
+
+def page(
+    tool: str,
+    rows: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    *,
+    limit: int,
+    total: int,
+    **cursor_state: Any,
+) -> Dict[str, Any]:
+    """Result envelope for a page of (item, position) rows, fetched with `limit + 1`.
+
+    Items are cut at the tool's budget. `nextCursor` resumes after the last
+    item returned and carries `total` and `cursor_state` (the arguments it
+    is valid for). Callers clamp `limit` with `page_limit` before fetching; a
+    limit of 0 gives an empty page with only `total` and no cursor.
+    """
+    items = [item for item, _ in rows[:limit]]
+    kept = fit_to_budget(items, budget_for(tool))
+    has_more = limit > 0 and (kept < len(items) or len(rows) > limit)
+    out: Dict[str, Any] = {"results": items[:kept], "total": total, "hasMore": has_more}
+    # Without a returned item there is no position to resume after.
+    if has_more and kept:
+        out["nextCursor"] = encode_cursor({"tool": tool, "after": rows[kept - 1][1], "total": total, **cursor_state})
+    if kept < len(items):
+        out["truncated"] = True
+    return out
@@ -1,152 +1,200 @@
-import json
 import logging
 import os
 import inspect
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
+from ._backend import DATA_DIR, ROOT, StorageBackend, get_backend  # noqa: F401
+from . import _metrics
+from ._cache import TOOL_CACHE, memoize
 
-ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Tool calls are logged as structured records (fields on the LogRecord, not
+# pre-rendered text); agent/logging_config.py serializes them off the hot path.
+TOOL_LOGGER = logging.getLogger("shoptalk.tools")
+TOOL_LOG_SAMPLE = float(os.getenv("SHOPTALK_TOOL_LOG_SAMPLE", "1"))
 
-def _format_for_log(value: Any) -> str:
+
+def _sampled() -> bool:
+    if not TOOL_LOG_SAMPLE or not TOOL_LOGGER.isEnabledFor(logging.INFO):
+        return False
+    return TOOL_LOG_SAMPLE >= 1 or random.random() < TOOL_LOG_SAMPLE
+
+
+ToolListener = Callable[[Dict[str, Any]], None]
+
+_TOOL_LISTENER: ContextVar[Optional[ToolListener]] = ContextVar("shoptalk_tool_listener", default=None)
+
+
+@contextmanager
+def listen_tool_calls(listener: ToolListener) -> Iterator[None]:
+    """Send tool progress events to `listener` for calls made in this context.
+
+    Events are `{"type": "tool", "phase": "start", "tool", "params"}` and
+    `{"type": "tool", "phase": "end", "tool", "ok", "ms"}`. The listener runs
+    on whichever thread executes the tool, so it must be thread-safe.
+    """
+    token = _TOOL_LISTENER.set(listener)
     try:
-        return json.dumps(value, ensure_ascii=False, indent=2, default=str)
+        yield
+    finally:
+        _TOOL_LISTENER.reset(token)
+
+
+def _emit(listener: Optional[ToolListener], event: Dict[str, Any]) -> None:
+    if listener is None:
+        return
+    try:
+        listener(event)
     except Exception:
-        try:
-            return str(value)
-        except Exception:
-            return repr(value)
+        logging.exception("Tool progress listener failed")
 
 
 def log_tool_call(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        tool_name = func.__name__
+    """Log each call of a tool and report it to any progress listener.
+
+    Successful calls are logged at a `SHOPTALK_TOOL_LOG_SAMPLE` rate;
+    failures always are. Arguments and results are attached to the record
+    as-is and only serialized by the (queued) handler. Every call is also
+    counted in `tools._metrics` (latency, outcome, and result size, which
+    is measured on a background thread).
+    """
+    tool_name = func.__name__
+    try:
+        sig: Optional[inspect.Signature] = inspect.signature(func)
+    except (TypeError, ValueError):
+        sig = None
+
+    def bind(args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            sig = inspect.signature(func)
-            bound = sig.bind_partial(*args, **kwargs)
-            params: Dict[str, Any] = dict(bound.arguments)
+            return dict(sig.bind_partial(*args, **kwargs).arguments)  # type: ignore[union-attr]
         except Exception:
-            params = {"args": args, "kwargs": kwargs}
-        print(f"```calling {tool_name} with params: ```")
-        print(f"```{_format_for_log(params)}```")
+            return {"args": args, "kwargs": kwargs}
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        listener = _TOOL_LISTENER.get()
+        sampled = _sampled()
+        params = bind(args, kwargs) if listener is not None or sampled else None
+        _emit(listener, {"type": "tool", "phase": "start", "tool": tool_name, "params": params})
+        started = time.perf_counter()
         try:
             result = func(*args, **kwargs)
         except Exception as e:
-            print(f"```{tool_name} responded:\n <raised {e.__class__.__name__}: {e}>```")
+            elapsed = time.perf_counter() - started
+            ms = round(elapsed * 1000, 2)
+            _metrics.record_tool(tool_name, elapsed, False)
+            TOOL_LOGGER.warning(
+                "%s raised %s: %s", tool_name, e.__class__.__name__, e,
+                extra={"tool": tool_name, "params": params if params is not None else bind(args, kwargs),
+                       "ok": False, "ms": ms, "error": f"{e.__class__.__name__}: {e}"},
+            )
+            _emit(listener, {"type": "tool", "phase": "end", "tool": tool_name, "ok": False, "ms": ms})
             raise
-        print(f"```{tool_name} responded:\n{_format_for_log(result)}```")
+        elapsed = time.perf_counter() - started
+        ms = round(elapsed * 1000, 2)
+        if _metrics.ENABLED:
+            _metrics.record_tool(tool_name, elapsed, True)
+            _metrics.record_result_size(tool_name, result)
+        if sampled:
+            TOOL_LOGGER.info(
+                "%s responded in %.2f ms", tool_name, ms,
+                extra={"tool": tool_name, "params": params, "ok": True, "ms": ms, "result": result},
+            )
+        _emit(listener, {"type": "tool", "phase": "end", "tool": tool_name, "ok": True, "ms": ms})
         return result
     return wrapper
 
 
-def _read_json(path_parts: List[str]) -> Any:
-    path = os.path.join(ROOT, *path_parts)
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        logging.exception("Failed reading JSON %s", path)
-        raise
+_CACHE_DEPENDENCIES = {"catalog", "inventory", "destinations"}
 
 
-def load_catalog() -> List[Dict[str, Any]]:
-    return _read_json(["data", "catalog", "products.json"])  # type: ignore[no-any-return]
+def cached_tool(*depends: str):
+    """Memoize a read-only tool (see `tools._cache`); place it under `@log_tool_call`.
 
+    `depends` names the data the result is derived from ("catalog",
+    "inventory", "destinations"); cached results are dropped when that data's version
+    changes. Never apply to tools with side effects.
+    """
+    unknown = set(depends) - _CACHE_DEPENDENCIES
+    if unknown:
+        raise ValueError(f"unknown cache dependencies: {sorted(unknown)}")
 
-def load_inventory() -> List[Dict[str, Any]]:
-    return _read_json(["data", "inventory", "inventory.json"])  # type: ignore[no-any-return]
+    def versions() -> tuple:
+        if not depends:
+            return ()
+        store = get_backend()
+        return tuple(getattr(store, f"{name}_version")() for name in depends)
 
+    def decorate(func):
+        return wraps(func)(memoize(func, versions))
 
-# Supported destinations for demo pricing rules
-SUPPORTED_DESTINATIONS: List[Dict[str, str]] = [
-    {"city": "New York", "country": "US"},
-    {"city": "San Francisco", "country": "US"},
-    {"city": "Chicago", "country": "US"},
-    {"city": "Los Angeles", "country": "US"},
-    {"city": "Austin", "country": "US"},
-    {"city": "Seattle", "country": "US"},
-    {"city": "Boston", "country": "US"},
-    {"city": "London", "country": "UK"},
-    {"city": "Berlin", "country": "DE"},
-    {"city": "Paris", "country": "FR"},
-]
+    return decorate
 
 
-def is_supported_destination(city: Optional[str], country: Optional[str]) -> bool:
-    if not city or not country:
-        return False
-    norm_city = city.strip().lower()
-    norm_country = country.strip().upper()
-    for d in SUPPORTED_DESTINATIONS:
-        if d["city"].lower() == norm_city and d["country"].upper() == norm_country:
-            return True
-    return False
+def tool_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the tool result cache."""
+    return TOOL_CACHE.stats()
 
 
-def list_supported_destinations(limit: int = 20) -> List[Dict[str, str]]:
-    return SUPPORTED_DESTINATIONS[:limit]
+def _cache_metrics() -> List[str]:
+    tools = TOOL_CACHE.stats()["tools"]
+    lines: List[str] = []
+    for outcome in ("hits", "misses", "invalidated", "expired"):
+        lines += _metrics.labelled_lines(
+            f"shoptalk_tool_cache_{outcome}_total", f"Tool result cache {outcome}.", "counter",
+            ("tool",), sorted(((tool,), c[outcome]) for tool, c in tools.items()),
+        )
+    return lines
 
 
-def _price_to_float_cents(cents: int) -> float:
-    return round(cents / 100.0, 2)
+_metrics.REGISTRY.add_collector(_cache_metrics)
 
 
-def _find_product_by_id(products: List[Dict[str, Any]], product_id: str) -> Optional[Dict[str, Any]]:
-    for product in products:
-        if product.get("id") == product_id:
-            return product
-    return None
+def inventory_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    stock = int(row.get("stock", 0))
+    return {
+        "sku": row["sku"],
+        "stock": stock,
+        "restockEtaDays": row.get("restockEtaDays"),
+        "availability": "in_stock" if stock > 0 else "out_of_stock",
+    }
 
 
-def _inventory_index_by_sku(inventory_rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-    return {row["sku"]: row for row in inventory_rows}
+def _price_to_float_cents(cents: int) -> float:
+    return round(cents / 100.0, 2)
 
 
-def find_price_for_sku(products: List[Dict[str, Any]], sku: str) -> Optional[Dict[str, Any]]:
-    for product in products:
-        for variant in product.get("variants", []):
-            if (variant.get("sku") or "").strip() == sku:
-                return {
-                    "sku": sku,
-                    "unitPriceCents": int(variant.get("listPrice", 0)),
-                    "currency": variant.get("currency", "USD"),
-                }
-    return None
+def _find_product_by_id(store: StorageBackend, product_id: str) -> Optional[Dict[str, Any]]:
+    return store.product(product_id)
 
 
-_COUNTRY_NORMALIZATION = {
-    "USA": "US",
-    "UNITED STATES": "US",
-    "U.S.": "US",
-    "U S": "US",
-    "US": "US",
-    "UNITED KINGDOM": "UK",
-    "GREAT BRITAIN": "UK",
-    "UK": "UK",
-    "GB": "UK",
-    "GERMANY": "DE",
-    "DE": "DE",
-    "DEU": "DE",
-    "FRANCE": "FR",
-    "FR": "FR",
-    "FRA": "FR",
-}
+def find_price_for_sku(store: StorageBackend, sku: str) -> Optional[Dict[str, Any]]:
+    hit = store.variant(sku)
+    if hit is None:
+        return None
+    _, variant = hit
+    return {
+        "sku": sku,
+        "unitPriceCents": int(variant.get("listPrice", 0)),
+        "currency": variant.get("currency", "USD"),
+    }
 
 
 def normalize_country(country: Optional[str]) -> Optional[str]:
-    if not country:
-        return None
-    key = (country or "").strip().upper()
-    return _COUNTRY_NORMALIZATION.get(key, key)
+    """Country code for a code or alias from the destinations file (e.g. "United Kingdom" -> "UK")."""
+    return get_backend().destinations().country(country)
 
 
-def find_sku_for_product_variant_attributes(products: List[Dict[str, Any]], product_id: str, attrs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def find_sku_for_product_variant_attributes(store: StorageBackend, product_id: str, attrs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     if not product_id or not attrs:
         return None
-    product = _find_product_by_id(products, product_id)
+    product = _find_product_by_id(store, product_id)
     if not product:
         return None
     wanted = {str(k).strip().lower(): str(v).strip().lower() for k, v in attrs.items()}
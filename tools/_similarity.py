@@ -0,0 +1,172 @@
+"""Product similarity index used by `suggest_alternatives`.
+
+Built once per catalog version. Every product gets a sparse, L2-normalized
+TF-IDF vector over its name, tags, short description and categorical
+specs (e.g. "spec:anc=true", "spec:panel=ips"). Products from the
+reference's own category rank first, then the most similar ones from
+other categories (earbuds for headphones):
+
+- `neighbours`: the top `NEIGHBOURS` products. Candidates are gathered from
+  the postings of the reference's rarest features, so ubiquitous words
+  cost nothing. The list is computed on a product's first request and
+  reused for the rest of the catalog version, so later requests are a
+  lookup.
+- `within_budget`: arrays of products sorted by their cheapest variant,
+  per category and catalog-wide, so a `max_price_cents` budget is a
+  bisect. When too few neighbours fit the budget, the affordable products
+  closest in price to the reference are scored instead.
+"""
+
+import bisect
+import heapq
+import math
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ._search_index import tokenize
+
+
+NEIGHBOURS = 32
+# Upper bound on products scored exactly per neighbour list or budget fallback.
+_MAX_CANDIDATES = 512
+_BUDGET_WINDOW = 256
+
+# Repeats per field, so a shared tag counts more than a shared word in the copy.
+_FIELD_WEIGHTS: Tuple[Tuple[str, int], ...] = (("name", 2), ("tags", 3), ("shortDescription", 1))
+
+
+def _features(product: Dict[str, Any]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for field, weight in _FIELD_WEIGHTS:
+        value = product.get(field)
+        text = " ".join(value) if isinstance(value, list) else str(value or "")
+        for token in tokenize(text):
+            # Model numbers ("100", "27") say nothing about similarity.
+            if not token.isdigit():
+                counts[token] = counts.get(token, 0) + weight
+    for name, value in (product.get("specs") or {}).items():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, bool) or isinstance(item, str):
+                key = f"spec:{name.lower()}={str(item).strip().lower()}"
+                counts[key] = counts.get(key, 0) + 2
+    return counts
+
+
+class SimilarityIndex:
+    """TF-IDF vectors, per-category postings and price order over one catalog version."""
+
+    def __init__(self, products: Iterable[Dict[str, Any]], version: int = 0) -> None:
+        self.version = version
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self._category: List[str] = []
+        # Cheapest variant per product: (sku, listPrice, currency), or None without variants.
+        self.cheapest: List[Optional[Tuple[str, int, str]]] = []
+        counts: List[Dict[str, int]] = []
+        df: Dict[str, int] = {}
+        for pos, product in enumerate(products):
+            product_id = product.get("id")
+            self.ids.append(product_id)
+            self.positions.setdefault(product_id, pos)
+            self._category.append((product.get("category") or "").strip().lower())
+            variant = min(product.get("variants") or [], key=lambda v: int(v.get("listPrice", 0)), default=None)
+            self.cheapest.append(
+                (variant.get("sku"), int(variant.get("listPrice", 0)), variant.get("currency")) if variant else None
+            )
+            features = _features(product)
+            counts.append(features)
+            for term in features:
+                df[term] = df.get(term, 0) + 1
+
+        n = max(len(counts), 1)
+        self._vectors: List[Dict[str, float]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for pos, features in enumerate(counts):
+            vector = {t: (1 + math.log(c)) * math.log(1 + n / df[t]) for t, c in features.items()}
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            self._vectors.append({t: w / norm for t, w in vector.items()})
+            for term in features:
+                self._postings.setdefault(term, []).append(pos)
+
+        # Keyed by category, and None for the whole catalog.
+        by_category: Dict[Optional[str], List[Tuple[int, int]]] = {}
+        for pos, cheapest in enumerate(self.cheapest):
+            if cheapest is not None:
+                by_category.setdefault(self._category[pos], []).append((cheapest[1], pos))
+                by_category.setdefault(None, []).append((cheapest[1], pos))
+        self._prices: Dict[Optional[str], Tuple["array[int]", "array[int]"]] = {}
+        for category, rows in by_category.items():
+            rows.sort()
+            self._prices[category] = (array("q", (p for p, _ in rows)), array("I", (d for _, d in rows)))
+        self._neighbours: Dict[int, List[Tuple[float, int]]] = {}
+
+    def similarity(self, a: int, b: int) -> float:
+        va, vb = self._vectors[a], self._vectors[b]
+        if len(vb) < len(va):
+            va, vb = vb, va
+        return sum(w * vb.get(t, 0.0) for t, w in va.items())
+
+    def _ranked(self, ref: int, candidates: Iterable[int], limit: int) -> List[Tuple[float, int]]:
+        ref_price = self.cheapest[ref][1] if self.cheapest[ref] else 0
+        category = self._category[ref]
+        scored = []
+        for doc in candidates:
+            if doc == ref:
+                continue
+            same = self._category[doc] == category
+            score = self.similarity(ref, doc)
+            # Other categories only count when they have something in common with the reference.
+            if same or score > 0:
+                price = self.cheapest[doc][1] if self.cheapest[doc] else 0
+                # Same category first; ties (e.g. identical tags) go to the product closest in price.
+                scored.append((same, round(score, 6), -abs(price - ref_price), -doc, score))
+        return [(row[4], -row[3]) for row in heapq.nlargest(limit, scored)]
+
+    def neighbours(self, ref: int) -> List[Tuple[float, int]]:
+        """Up to `NEIGHBOURS` (similarity, position) pairs, same category first, most similar first."""
+        cached = self._neighbours.get(ref)
+        if cached is not None:
+            return cached
+        postings = sorted((self._postings.get(term, ()) for term in self._vectors[ref]), key=len)
+        candidates: set = set()
+        for posting in postings:
+            candidates.update(islice(posting, _MAX_CANDIDATES - len(candidates)))
+            if len(candidates) >= _MAX_CANDIDATES:
+                break
+        # The reference's category competes even where it shares no rare feature.
+        prices = self._prices.get(self._category[ref])
+        if prices is not None:
+            candidates.update(prices[1][:NEIGHBOURS])
+        result = self._ranked(ref, candidates, NEIGHBOURS)
+        # Racing threads compute the same list; either write wins.
+        self._neighbours[ref] = result
+        return result
+
+    def within_budget(self, ref: int, max_price_cents: int, exclude: Iterable[int], limit: int) -> List[Tuple[float, int]]:
+        """Most similar products with a variant at or under the budget, same category first."""
+        window: set = set()
+        for key in (self._category[ref], None):
+            prices, docs = self._prices.get(key, (array("q"), array("I")))
+            hi = bisect.bisect_right(prices, max_price_cents)
+            # Affordable products priced closest to the reference are the likeliest substitutes.
+            window.update(docs[max(0, hi - _BUDGET_WINDOW):hi])
+        return self._ranked(ref, window - set(exclude), limit)
+
+    def alternatives(self, product_id: str, *, max_price_cents: Optional[int] = None, limit: int = 3) -> List[Tuple[float, int]]:
+        """(similarity, position) of up to `limit` alternatives to a product, best first."""
+        ref = self.positions.get(product_id)
+        if ref is None or limit <= 0:
+            return []
+        picked: List[Tuple[float, int]] = []
+        for score, doc in self.neighbours(ref):
+            cheapest = self.cheapest[doc]
+            if max_price_cents is not None and (cheapest is None or cheapest[1] > max_price_cents):
+                continue
+            picked.append((score, doc))
+            if len(picked) >= limit:
+                return picked
+        if max_price_cents is not None:
+            more = self.within_budget(ref, max_price_cents, [doc for _, doc in picked], limit - len(picked))
+            picked.extend(more)
+        return picked
@@ -0,0 +1,539 @@
+"""SQLite storage backend.
+
+Keeps catalog, inventory and orders in one SQLite database in WAL mode so
+readers never block the writer and memory stays bounded regardless of
+catalog size. Products and variants keep their original JSON documents
+next to indexed columns (product id, SKU, category, orderId), and an FTS5
+table backs `search_products`.
+
+The database is created from the JSON files under `data/` on first use,
+or explicitly with `python main.py import-sqlite`. JSON arrays are parsed
+incrementally so importing a multi-gigabyte catalog does not load it whole.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ._backend import DATA_DIR, StorageBackend, find_shortages, iso_utc, new_reservation_id, requested_quantities
+from ._destinations import DestinationStore, destinations_path
+from ._facets import FacetIndex
+from ._inventory import iter_stock_journal, journal_path
+from ._similarity import SimilarityIndex
+from ._search_index import tokenize
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    pos INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT,
+    category TEXT,
+    category_norm TEXT,
+    short_description TEXT,
+    tags TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_by_category ON products (category_norm, pos);
+CREATE TABLE IF NOT EXISTS variants (
+    sku TEXT PRIMARY KEY,
+    product_pos INTEGER NOT NULL REFERENCES products (pos),
+    list_price INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS variants_by_product ON variants (product_pos);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5 (
+    name, category, short_description, tags,
+    content='products', content_rowid='pos'
+);
+CREATE TABLE IF NOT EXISTS inventory (
+    sku TEXT PRIMARY KEY,
+    stock INTEGER NOT NULL,
+    restock_eta_days INTEGER
+);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    reservation_id TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (reservation_id, sku)
+);
+CREATE INDEX IF NOT EXISTS reservations_by_sku ON reservations (sku);
+CREATE INDEX IF NOT EXISTS reservations_by_expiry ON reservations (expires_at);
+"""
+
+_BATCH_SIZE = 1000
+_READ_CHUNK = 1 << 20
+
+
+def iter_json_array(path: str) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(_READ_CHUNK)
+        pos = 0
+        eof = not buf
+
+        def skip(chars: str) -> None:
+            nonlocal buf, pos, eof
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                buf, pos = f.read(_READ_CHUNK), 0
+                eof = not buf
+
+        skip(" \t\r\n")
+        if pos >= len(buf) or buf[pos] != "[":
+            raise ValueError(f"{path}: expected a JSON array")
+        pos += 1
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buf):
+                raise ValueError(f"{path}: unterminated JSON array")
+            if buf[pos] == "]":
+                return
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    break
+                except json.JSONDecodeError:
+                    more = f.read(_READ_CHUNK)
+                    if not more:
+                        raise
+                    buf, pos = buf[pos:] + more, 0
+            yield value
+            pos = end
+
+
+def _iter_json_lines(path: str) -> Iterator[Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            # Skip a torn trailing record, as the order journal does.
+            if line.endswith("\n"):
+                yield json.loads(line)
+
+
+def _fts_query(query: str) -> str:
+    # Quote each token (FTS5 syntax chars are stripped by tokenize) and allow
+    # prefix matches, the SQL counterpart of the in-memory prefix expansion.
+    return " AND ".join(f'"{t}"*' for t in dict.fromkeys(tokenize(query)))
+
+
+class SqliteBackend(StorageBackend):
+    """Backend over a SQLite database, one connection per thread."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str, *, data_dir: Optional[str] = None) -> None:
+        self._db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._facets: Optional[FacetIndex] = None
+        self._similarity: Optional[SimilarityIndex] = None
+        self.destination_store = DestinationStore(destinations_path(data_dir or DATA_DIR))
+        if data_dir and not os.path.exists(db_path):
+            with self._init_lock:
+                if not os.path.exists(db_path):
+                    import_json(db_path, data_dir)
+
+    @property
+    def path(self) -> str:
+        return self._db_path
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self._db_path)
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key: str) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def catalog_version(self) -> int:
+        return self._meta("catalog_version")
+
+    def product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT doc FROM products WHERE id = ?", (product_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def variant(self, sku: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        row = self._conn().execute(
+            "SELECT p.doc, v.doc FROM variants v JOIN products p ON p.pos = v.product_pos WHERE v.sku = ?",
+            ((sku or "").strip(),),
+        ).fetchone()
+        return (json.loads(row[0]), json.loads(row[1])) if row else None
+
+    def iter_products(self, category: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        if category is None:
+            cur = self._conn().execute("SELECT doc FROM products ORDER BY pos")
+        else:
+            cur = self._conn().execute(
+                "SELECT doc FROM products WHERE category_norm = ? ORDER BY pos",
+                (category.strip().lower(),),
+            )
+        return (json.loads(doc) for (doc,) in cur)
+
+    def list_products(self, *, category: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        if category is None:
+            cur = self._conn().execute("SELECT doc FROM products ORDER BY pos LIMIT ?", (max(limit, 0),))
+        else:
+            cur = self._conn().execute(
+                "SELECT doc FROM products WHERE category_norm = ? ORDER BY pos LIMIT ?",
+                (category.strip().lower(), max(limit, 0)),
+            )
+        return [json.loads(doc) for (doc,) in cur]
+
+    def count_products(self, category: Optional[str] = None) -> int:
+        if category is None:
+            return int(self._conn().execute("SELECT COUNT(*) FROM products").fetchone()[0])
+        return int(self._conn().execute(
+            "SELECT COUNT(*) FROM products WHERE category_norm = ?", (category.strip().lower(),)
+        ).fetchone()[0])
+
+    def categories(self) -> List[str]:
+        cur = self._conn().execute(
+            "SELECT DISTINCT trim(category) AS c FROM products WHERE c != '' ORDER BY c"
+        )
+        return [c for (c,) in cur]
+
+    def search(self, query: str, *, category: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        match = _fts_query(query)
+        cat = (category or "").strip().lower() or None
+        if not match:
+            return self.list_products(category=cat, limit=limit)
+        sql = (
+            "SELECT p.doc FROM products_fts f JOIN products p ON p.pos = f.rowid "
+            "WHERE products_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if cat is not None:
+            sql += " AND p.category_norm = ?"
+            params.append(cat)
+        # Column weights mirror the in-memory index: name, category, description, tags.
+        sql += " ORDER BY bm25(products_fts, 3.0, 2.0, 1.0, 2.0), p.pos LIMIT ?"
+        params.append(max(limit, 0))
+        return [json.loads(doc) for (doc,) in self._conn().execute(sql, params)]
+
+    def page_products(
+        self, *, category: Optional[str] = None, after: Optional[Dict[str, Any]] = None, limit: int = 20
+    ) -> List[Tuple[List[Any], Dict[str, Any]]]:
+        conn = self._conn()
+        after_pos = -1
+        if after:
+            row = conn.execute("SELECT pos FROM products WHERE id = ?", (after["id"],)).fetchone()
+            after_pos = row[0] if row else after["key"][-1]
+        if category is None:
+            cur = conn.execute(
+                "SELECT pos, doc FROM products WHERE pos > ? ORDER BY pos LIMIT ?", (after_pos, max(limit, 0))
+            )
+        else:
+            cur = conn.execute(
+                "SELECT pos, doc FROM products WHERE category_norm = ? AND pos > ? ORDER BY pos LIMIT ?",
+                (category.strip().lower(), after_pos, max(limit, 0)),
+            )
+        return [([pos], json.loads(doc)) for pos, doc in cur]
+
+    def _ranked_matches(self, match: str, category: Optional[str]) -> Tuple[str, List[Any]]:
+        sql = (
+            "SELECT bm25(products_fts, 3.0, 2.0, 1.0, 2.0) AS rank, p.pos AS pos, p.id AS id, p.doc AS doc "
+            "FROM products_fts f JOIN products p ON p.pos = f.rowid WHERE products_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        cat = (category or "").strip().lower() or None
+        if cat is not None:
+            sql += " AND p.category_norm = ?"
+            params.append(cat)
+        return sql, params
+
+    def search_page(
+        self, query: str, *, category: Optional[str] = None, after: Optional[Dict[str, Any]] = None, limit: int = 10
+    ) -> List[Tuple[List[Any], Dict[str, Any]]]:
+        match = _fts_query(query)
+        if not match:
+            rows = self.page_products(category=(category or "").strip().lower() or None, after=after, limit=limit)
+            return [([0.0, key[0]], product) for key, product in rows]
+        conn = self._conn()
+        matches, params = self._ranked_matches(match, category)
+        if not after:
+            cur = conn.execute(f"SELECT rank, pos, doc FROM ({matches}) ORDER BY rank, pos LIMIT ?", [*params, max(limit, 0)])
+            return [([rank, pos], json.loads(doc)) for rank, pos, doc in cur]
+        rank, pos = after["key"]
+        if after.get("version") != self.catalog_version():
+            row = conn.execute(f"SELECT rank, pos FROM ({matches}) WHERE id = ?", [*params, after["id"]]).fetchone()
+            if row:
+                rank, pos = row
+        cur = conn.execute(
+            f"SELECT rank, pos, doc FROM ({matches}) WHERE rank > ? OR (rank = ? AND pos > ?) ORDER BY rank, pos LIMIT ?",
+            [*params, rank, rank, pos, max(limit, 0)],
+        )
+        return [([r, p], json.loads(doc)) for r, p, doc in cur]
+
+    def count_search(self, query: str, *, category: Optional[str] = None) -> int:
+        match = _fts_query(query)
+        if not match:
+            return self.count_products((category or "").strip().lower() or None)
+        matches, params = self._ranked_matches(match, category)
+        return int(self._conn().execute(f"SELECT COUNT(*) FROM ({matches})", params).fetchone()[0])
+
+    def facets(self) -> FacetIndex:
+        # Built on first use by streaming the catalog once; unlike the rest of
+        # this backend it stays resident (bitmaps and sorted arrays, not documents).
+        version = self.catalog_version()
+        index = self._facets
+        if index is None or index.version != version:
+            with self._init_lock:
+                index = self._facets
+                if index is None or index.version != version:
+                    index = self._facets = FacetIndex(self.iter_products(), version)
+        return index
+
+    def similarity(self) -> SimilarityIndex:
+        # Resident like the facet index, and rebuilt when the catalog changes.
+        version = self.catalog_version()
+        index = self._similarity
+        if index is None or index.version != version:
+            with self._init_lock:
+                index = self._similarity
+                if index is None or index.version != version:
+                    index = self._similarity = SimilarityIndex(self.iter_products(), version)
+        return index
+
+    def inventory_version(self) -> int:
+        return self._meta("inventory_version")
+
+    def inventory_many(self, skus: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        wanted = list(dict.fromkeys(skus))
+        out: Dict[str, Optional[Dict[str, Any]]] = {sku: None for sku in wanted}
+        conn = self._conn()
+        # Stay below SQLite's bound-parameter limit.
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for sku, stock, eta in conn.execute(
+                f"SELECT sku, stock, restock_eta_days FROM inventory WHERE sku IN ({marks})", chunk
+            ):
+                out[sku] = {"sku": sku, "stock": stock, "restockEtaDays": eta}
+        return out
+
+    def append_order(self, row: Dict[str, Any]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO orders (order_id, created_at, doc) VALUES (?, ?, ?)",
+                (row["orderId"], row.get("createdAt"), json.dumps(row, ensure_ascii=False)),
+            )
+
+    def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT doc FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # Stock reservation runs in BEGIN IMMEDIATE transactions, which take the
+    # database write lock up front, so check-and-decrement is atomic across
+    # threads and processes.
+
+    @staticmethod
+    def _stock_and_held(
+        conn: sqlite3.Connection, skus: Iterable[str], exclude: Optional[str] = None
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Current stock and quantities held by reservations other than `exclude`."""
+        stock: Dict[str, int] = {}
+        held: Dict[str, int] = {}
+        for sku in skus:
+            row = conn.execute("SELECT stock FROM inventory WHERE sku = ?", (sku,)).fetchone()
+            if row:
+                stock[sku] = int(row[0])
+            held[sku] = int(conn.execute(
+                "SELECT COALESCE(SUM(quantity), 0) FROM reservations WHERE sku = ? AND reservation_id IS NOT ?",
+                (sku, exclude),
+            ).fetchone()[0])
+        return stock, held
+
+    def reserve_stock(self, items: List[Dict[str, Any]], *, ttl_seconds: float) -> Dict[str, Any]:
+        wanted, invalid = requested_quantities(items)
+        if invalid or not wanted:
+            return {"error": "Items need a sku and quantity >= 1", "invalidItems": invalid}
+        rid = new_reservation_id()
+        with _immediate(self._conn()) as conn:
+            now = time.time()
+            conn.execute("DELETE FROM reservations WHERE expires_at <= ?", (now,))
+            shortages = find_shortages(wanted, *self._stock_and_held(conn, wanted))
+            if shortages:
+                return {"error": "insufficient_stock", "shortages": shortages}
+            conn.executemany(
+                "INSERT INTO reservations (reservation_id, sku, quantity, expires_at) VALUES (?, ?, ?, ?)",
+                [(rid, sku, qty, now + ttl_seconds) for sku, qty in wanted.items()],
+            )
+        return {
+            "reservationId": rid,
+            "expiresAt": iso_utc(now + ttl_seconds),
+            "items": [{"sku": sku, "quantity": qty} for sku, qty in wanted.items()],
+        }
+
+    def release_reservation(self, reservation_id: str) -> bool:
+        with _immediate(self._conn()) as conn:
+            cur = conn.execute("DELETE FROM reservations WHERE reservation_id = ?", (reservation_id,))
+            return cur.rowcount > 0
+
+    def place_order(self, row: Dict[str, Any], *, reservation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        wanted, invalid = requested_quantities(row.get("items") or [])
+        if invalid or not wanted:
+            return {"error": "Items need a sku and quantity >= 1", "invalidItems": invalid}
+        with _immediate(self._conn()) as conn:
+            conn.execute("DELETE FROM reservations WHERE expires_at <= ?", (time.time(),))
+            if reservation_id is not None and conn.execute(
+                "SELECT 1 FROM reservations WHERE reservation_id = ? LIMIT 1", (reservation_id,)
+            ).fetchone() is None:
+                return {"error": "reservation_not_found_or_expired", "reservationId": reservation_id}
+            shortages = find_shortages(wanted, *self._stock_and_held(conn, wanted, exclude=reservation_id))
+            if shortages:
+                return {"error": "insufficient_stock", "shortages": shortages}
+            if reservation_id is not None:
+                conn.execute("DELETE FROM reservations WHERE reservation_id = ?", (reservation_id,))
+            conn.executemany(
+                "UPDATE inventory SET stock = stock - ? WHERE sku = ?",
+                [(qty, sku) for sku, qty in wanted.items()],
+            )
+            conn.execute(
+                "INSERT INTO orders (order_id, created_at, doc) VALUES (?, ?, ?)",
+                (row["orderId"], row.get("createdAt"), json.dumps(row, ensure_ascii=False)),
+            )
+            _bump(conn, "inventory_version")
+        return None
+
+
+@contextmanager
+def _immediate(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Back to implicit transactions so `with conn:` groups writes atomically.
+    conn.isolation_level = ""
+    return conn
+
+
+def _bump(conn: sqlite3.Connection, key: str) -> None:
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, 1) ON CONFLICT (key) DO UPDATE SET value = value + 1",
+        (key,),
+    )
+
+
+def import_json(db_path: str, data_dir: str) -> Dict[str, int]:
+    """(Re)load catalog, inventory and orders from the JSON files in data_dir."""
+    conn = connect(db_path)
+    counts = {"products": 0, "variants": 0, "inventory": 0, "orders": 0}
+    try:
+        with conn:
+            conn.execute("DELETE FROM variants")
+            conn.execute("DELETE FROM products")
+            product_rows: List[Tuple[Any, ...]] = []
+            variant_rows: List[Tuple[Any, ...]] = []
+            seen_ids = set()
+
+            def flush() -> None:
+                conn.executemany(
+                    "INSERT INTO products (pos, id, name, category, category_norm, short_description, tags, doc) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    product_rows,
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO variants (sku, product_pos, list_price, doc) VALUES (?, ?, ?, ?)",
+                    variant_rows,
+                )
+                product_rows.clear()
+                variant_rows.clear()
+
+            catalog_path = os.path.join(data_dir, "catalog", "products.json")
+            for pos, product in enumerate(iter_json_array(catalog_path)):
+                product_id = product.get("id")
+                if product_id is None or product_id in seen_ids:
+                    continue
+                seen_ids.add(product_id)
+                category = product.get("category") or ""
+                product_rows.append((
+                    pos,
+                    product_id,
+                    product.get("name"),
+                    category,
+                    category.strip().lower(),
+                    product.get("shortDescription"),
+                    " ".join(str(t) for t in product.get("tags", []) or []),
+                    json.dumps(product, ensure_ascii=False),
+                ))
+                for v in product.get("variants", []):
+                    sku = (v.get("sku") or "").strip()
+                    if sku:
+                        variant_rows.append((sku, pos, int(v.get("listPrice", 0)), json.dumps(v, ensure_ascii=False)))
+                        counts["variants"] += 1
+                counts["products"] += 1
+                if len(product_rows) >= _BATCH_SIZE:
+                    flush()
+            flush()
+            conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+            _bump(conn, "catalog_version")
+
+        inventory_path = os.path.join(data_dir, "inventory", "inventory.json")
+        if os.path.exists(inventory_path):
+            with conn:
+                conn.execute("DELETE FROM inventory")
+                conn.execute("DELETE FROM reservations")
+                for row in iter_json_array(inventory_path):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO inventory (sku, stock, restock_eta_days) VALUES (?, ?, ?)",
+                        (row["sku"], int(row.get("stock", 0)), row.get("restockEtaDays")),
+                    )
+                    counts["inventory"] += 1
+                # Levels the JSON backend recorded after taking stock for orders.
+                for stock in iter_stock_journal(journal_path(inventory_path)):
+                    conn.executemany(
+                        "UPDATE inventory SET stock = ? WHERE sku = ?", [(int(q), sku) for sku, q in stock.items()]
+                    )
+                _bump(conn, "inventory_version")
+
+        # Orders are only added, never deleted, so re-imports keep orders placed via SQLite.
+        with conn:
+            for orders_file in ("orders.json", "orders.jsonl"):
+                path = os.path.join(data_dir, "orders", orders_file)
+                if not os.path.exists(path):
+                    continue
+                rows = _iter_json_lines(path) if orders_file.endswith(".jsonl") else iter_json_array(path)
+                for row in rows:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO orders (order_id, created_at, doc) VALUES (?, ?, ?)",
+                        (row["orderId"], row.get("createdAt"), json.dumps(row, ensure_ascii=False)),
+                    )
+                    counts["orders"] += 1
+    finally:
+        conn.close()
+    logging.info("Imported JSON data from %s into %s: %s", data_dir, db_path, counts)
+    return counts
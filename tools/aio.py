@@ -0,0 +1,92 @@
+"""Async variants of the ShopTalk tools.
+
+Every tool here is a coroutine function with the same name, signature and
+docstring as its sync counterpart in `tools`, so the model sees identical
+function declarations. The blocking storage work runs on a shared thread
+pool (`SHOPTALK_TOOL_THREADS` workers) so an event loop serving many
+conversations is never stalled by file or database I/O.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional
+
+import tools as _sync
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def executor() -> ThreadPoolExecutor:
+    """Return the thread pool that runs blocking tool work, creating it on first use."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        workers = int(os.getenv("SHOPTALK_TOOL_THREADS", "0")) or min(32, (os.cpu_count() or 1) + 4)
+        _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shoptalk-tool")
+    return _EXECUTOR
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on the tool pool, keeping the caller's contextvars."""
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor(), call)
+
+
+def to_async(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a sync tool as a coroutine function offloaded to the tool pool."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_blocking(func, *args, **kwargs)
+
+    return wrapper
+
+
+search_products = to_async(_sync.search_products)
+filter_products = to_async(_sync.filter_products)
+get_product_details = to_async(_sync.get_product_details)
+check_inventory = to_async(_sync.check_inventory)
+check_inventory_many = to_async(_sync.check_inventory_many)
+estimate_price = to_async(_sync.estimate_price)
+estimate_price_many = to_async(_sync.estimate_price_many)
+suggest_alternatives = to_async(_sync.suggest_alternatives)
+reserve_stock = to_async(_sync.reserve_stock)
+create_order = to_async(_sync.create_order)
+get_order_status = to_async(_sync.get_order_status)
+list_supported_destinations = to_async(_sync.list_supported_destinations)
+validate_destination = to_async(_sync.validate_destination)
+list_categories = to_async(_sync.list_categories)
+list_products_by_category = to_async(_sync.list_products_by_category)
+list_products = to_async(_sync.list_products)
+list_products_count = to_async(_sync.list_products_count)
+list_variants = to_async(_sync.list_variants)
+validate_sku = to_async(_sync.validate_sku)
+get_price_for_sku = to_async(_sync.get_price_for_sku)
+
+
+ASYNC_TOOLS: List[Callable[..., Awaitable[Any]]] = [
+    search_products,
+    filter_products,
+    get_product_details,
+    check_inventory,
+    check_inventory_many,
+    estimate_price,
+    estimate_price_many,
+    suggest_alternatives,
+    reserve_stock,
+    create_order,
+    get_order_status,
+    list_supported_destinations,
+    validate_destination,
+    list_categories,
+    list_products_by_category,
+    list_products,
+    list_products_count,
+    list_variants,
+    validate_sku,
+    get_price_for_sku,
+]
@@ -1,9 +1,10 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
-from ._shared import load_inventory, _inventory_index_by_sku, log_tool_call
+from ._shared import get_backend, inventory_summary, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("inventory")
 def check_inventory(sku: str) -> Optional[Dict[str, Any]]:
     """Return stock information for a given SKU.
 
@@ -13,16 +14,7 @@ def check_inventory(sku: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dict with sku, stock, restockEtaDays, and availability; or None if unknown.
     """
-    rows: List[Dict[str, Any]] = load_inventory()
-    idx = _inventory_index_by_sku(rows)
-    row = idx.get(sku)
+    row = get_backend().inventory(sku)
     if row is None:
         return None
-    return {
-        "sku": row["sku"],
-        "stock": int(row.get("stock", 0)),
-        "restockEtaDays": row.get("restockEtaDays"),
-        "availability": "in_stock" if int(row.get("stock", 0)) > 0 else "out_of_stock",
-    }
-
-
+    return inventory_summary(row)
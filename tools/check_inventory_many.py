@@ -0,0 +1,26 @@
+from typing import Any, Dict, List
+
+from ._shared import get_backend, inventory_summary, log_tool_call, cached_tool
+
+
+@log_tool_call
+@cached_tool("inventory")
+def check_inventory_many(skus: list[str]) -> List[Dict[str, Any]]:
+    """Return stock information for several SKUs in one call (e.g., a whole cart).
+
+    Args:
+        skus: Variant SKU identifiers.
+
+    Returns:
+        One dict per requested SKU, in request order, with sku, stock,
+        restockEtaDays, and availability. Unknown SKUs have availability "unknown".
+    """
+    rows = get_backend().inventory_many(skus or [])
+    out: List[Dict[str, Any]] = []
+    for sku in skus or []:
+        row = rows.get(sku)
+        if row is None:
+            out.append({"sku": sku, "stock": 0, "restockEtaDays": None, "availability": "unknown"})
+        else:
+            out.append(inventory_summary(row))
+    return out
@@ -1,45 +1,31 @@
-import json
-import os
 import time
 import uuid
 import logging
-from typing import Any, Dict, List
 
-from ._shared import ROOT, log_tool_call
-
-
-ORDERS_PATH = os.path.join(ROOT, "data", "orders", "orders.json")
-
-
-def _read_orders() -> List[Dict[str, Any]]:
-    if not os.path.exists(ORDERS_PATH):
-        return []
-    with open(ORDERS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def _write_orders(rows: List[Dict[str, Any]]) -> None:
-    os.makedirs(os.path.dirname(ORDERS_PATH), exist_ok=True)
-    try:
-        with open(ORDERS_PATH, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-    except Exception:
-        logging.exception("Failed writing orders JSON: %s", ORDERS_PATH)
-        raise
+from ._shared import get_backend, log_tool_call
 
 
 @log_tool_call
-def create_order(*, items: list[dict], destination_city: str, destination_country: str, breakdown: dict) -> dict | None:
-    """Create and persist a simple demo order in the local JSON store.
+def create_order(
+    *,
+    items: list[dict],
+    destination_city: str,
+    destination_country: str,
+    breakdown: dict,
+    reservation_id: str | None = None,
+) -> dict | None:
+    """Create and persist a simple demo order, taking its stock atomically.
 
     Args:
         items: Normalized items with sku, unitPriceCents, currency, quantity.
         destination_city: Shipping city.
         destination_country: Shipping country code.
         breakdown: Price breakdown used for the order record.
+        reservation_id: Optional id from reserve_stock whose held stock this order consumes.
 
     Returns:
-        A dict with orderId and status if created; otherwise None.
+        A dict with orderId and status if created; a dict with error (and
+        shortages when out of stock) if not; None when items are empty.
     """
     if not items:
         return None
@@ -57,9 +43,14 @@ def create_order(*, items: list[dict], destination_city: str, destination_countr
         "createdAt": now_iso,
     }
 
-    orders = _read_orders()
-    orders.append(row)
-    _write_orders(orders)
+    try:
+        error = get_backend().place_order(row, reservation_id=reservation_id)
+    except Exception:
+        logging.exception("Failed placing order %s", order_id)
+        raise
+    if error is not None:
+        logging.warning("create_order rejected: %s", error)
+        return error
 
     return {"orderId": order_id, "status": "received"}
 
@@ -1,41 +1,16 @@
-from typing import Any, Dict, List
 import logging
 
+from ._pricing import quote, resolve_cart
 from ._shared import (
-    PriceBreakdown,
     normalize_country,
-    find_price_for_sku,
-    find_sku_for_product_variant_attributes,
-    load_catalog,
+    cached_tool,
+    get_backend,
     log_tool_call,
 )
 
 
-def _calc_discount(subtotal_cents: int, destination_country: str | None) -> int:
-    # Mock: 5% discount for orders shipping within "US"; otherwise 0.
-    if destination_country and destination_country.upper() == "US":
-        return int(round(subtotal_cents * 0.05))
-    return 0
-
-
-def _calc_tax(subtotal_after_discount_cents: int, destination_country: str | None) -> int:
-    # Mock: 8% tax if destination is "US"; 0 otherwise.
-    if destination_country and destination_country.upper() == "US":
-        return int(round(subtotal_after_discount_cents * 0.08))
-    return 0
-
-
-def _calc_shipping(items_count: int, destination_country: str | None) -> int:
-    # Mock: base 700 cents domestic, 1500 cents international; +200 per extra item.
-    if destination_country and destination_country.upper() == "US":
-        base = 700
-    else:
-        base = 1500
-    extra = max(0, items_count - 1) * 200
-    return base + extra
-
-
 @log_tool_call
+@cached_tool("catalog", "destinations")
 def estimate_price(
     items: list[dict],
     *,
@@ -66,87 +41,23 @@ def estimate_price(
             logger.warning("estimate_price: empty or invalid items: %s", items)
             return {"error": "No items provided"}
 
+        store = get_backend()
         destination_country = normalize_country(destination_country)
+        rates = store.destinations().rates(destination_country, destination_city)
 
-        subtotal = 0
-        total_qty = 0
-        products = load_catalog()
-        normalized_items: List[Dict[str, Any]] = []
-        invalid_items: List[Dict[str, Any]] = []
-
-        for item in items:
-            try:
-                qty = int(item.get("quantity", 1))
-                if qty <= 0:
-                    invalid_items.append({"item": item, "reason": "quantity must be >= 1"})
-                    continue
-                price = int(item.get("unitPriceCents", 0))
-                sku = (item.get("sku") or "").strip() if item.get("sku") else None
-
-                # If only product/attributes provided, try to resolve a sku
-                if not sku and item.get("productId") and item.get("attributes"):
-                    resolved = find_sku_for_product_variant_attributes(
-                        products, str(item.get("productId")), dict(item.get("attributes"))
-                    )
-                    if resolved:
-                        sku = str(resolved.get("sku"))
-                        if price <= 0:
-                            price = int(resolved.get("unitPriceCents", 0))
-
-                # If sku present but price missing, look up price
-                if (price <= 0) and sku:
-                    found = find_price_for_sku(products, sku)
-                    if found:
-                        price = int(found.get("unitPriceCents", 0))
-                        currency = found.get("currency", "USD")
-                    else:
-                        currency = "USD"
-                else:
-                    currency = "USD"
-
-                # If still no price, skip this item
-                if price <= 0:
-                    invalid_items.append({"item": item, "reason": "missing price and sku could not be resolved"})
-                    continue
-
-                subtotal += qty * price
-                total_qty += qty
-                normalized_items.append({"sku": sku, "unitPriceCents": price, "currency": currency, "quantity": qty})
-            except Exception:
-                logger.exception("estimate_price: error processing item: %s", item)
-                invalid_items.append({"item": item, "reason": "exception while processing item"})
-                continue
-
-        discount = _calc_discount(subtotal, destination_country)
-        taxed_base = subtotal - discount
-        tax = _calc_tax(taxed_base, destination_country)
-        shipping = _calc_shipping(total_qty, destination_country)
-        total = taxed_base + tax + shipping
-
-        breakdown = PriceBreakdown(
-            subtotal_cents=subtotal,
-            discount_cents=discount,
-            tax_cents=tax,
-            shipping_cents=shipping,
-            total_cents=total,
-        )
-
-        eta_days_min = 2 if (destination_country or "").upper() == "US" else 5
-        eta_days_max = 5 if (destination_country or "").upper() == "US" else 12
-
-        if not normalized_items:
+        cart = resolve_cart(store, items)
+        if not cart.items:
             logger.warning("estimate_price: no valid items after normalization: %s", items)
-            return {"error": "No valid items with prices", "invalidItems": invalid_items}
+            return {"error": "No valid items with prices", "invalidItems": cart.invalid_items}
 
         result = {
-            "items": normalized_items,
+            "items": cart.items,
             "destinationCity": destination_city,
             "destinationCountry": destination_country,
-            "breakdown": breakdown.to_dict(),
-            "deliveryEtaDays": [eta_days_min, eta_days_max],
+            **quote(cart, rates),
         }
-        if invalid_items:
-            result["invalidItems"] = invalid_items
+        if cart.invalid_items:
+            result["invalidItems"] = cart.invalid_items
         logger.info("estimate_price: success: %s", result)
         return result
     except Exception as e:
@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Tuple, Union
+import logging
+
+from ._destinations import RegionRates
+from ._pricing import quote, resolve_cart
+from ._shared import cached_tool, get_backend, log_tool_call
+
+
+@log_tool_call
+@cached_tool("catalog", "destinations")
+def estimate_price_many(
+    destinations: list[dict],
+    *,
+    items: list[dict] | None = None,
+    carts: list[dict] | None = None,
+) -> dict:
+    """Compare price estimates for one or more carts across several destinations in one call.
+
+    Args:
+        destinations: Destinations as {"city": str, "country": str} (country code or name).
+        items: Line items of a single cart, as for estimate_price.
+        carts: Several carts as {"items": [...]}; use instead of items to compare carts.
+
+    Returns:
+        {"carts": [...], "quotes": [...]}: per cart its normalized items (and invalidItems), or an
+        error; one quote per valid cart and destination (cart index, destinationCity,
+        destinationCountry, breakdown, deliveryEtaDays, or error for a malformed destination),
+        ordered by cart then destination. Each quote equals what estimate_price returns for that
+        cart and destination.
+    """
+    logger = logging.getLogger(__name__)
+    if items:
+        carts = [{"items": items}, *(carts or [])]
+    if not carts:
+        return {"error": "No items provided"}
+    if not destinations:
+        return {"error": "No destinations provided"}
+    if not isinstance(carts, list):
+        return {"error": "carts must be a list of {\"items\": [...]}"}
+    if not isinstance(destinations, list):
+        return {"error": "destinations must be a list of {\"city\", \"country\"}"}
+
+    store = get_backend()
+    table = store.destinations()
+    # (city, normalized country, region rates or the destination's error), resolved once for all carts.
+    targets: List[Tuple[Any, Any, Union[RegionRates, str]]] = []
+    for destination in destinations:
+        if not isinstance(destination, dict):
+            targets.append((None, None, "Destination must be an object with city and country"))
+            continue
+        city, country = destination.get("city"), destination.get("country")
+        if not city or not country:
+            targets.append((city, country, "Missing destination_city or destination_country"))
+        elif not isinstance(city, str) or not isinstance(country, str):
+            targets.append((city, country, "Destination city and country must be strings"))
+        else:
+            country = table.country(country)
+            targets.append((city, country, table.rates(country, city)))
+    # Shared across carts so a SKU in several carts is looked up once.
+    memo: Dict[Any, Any] = {}
+    cart_rows: List[Dict[str, Any]] = []
+    quotes: List[Dict[str, Any]] = []
+    for index, entry in enumerate(carts):
+        cart_items = entry.get("items") if isinstance(entry, dict) else None
+        if not isinstance(cart_items, list) or not cart_items:
+            cart_rows.append({"error": "No items provided"})
+            continue
+        cart = resolve_cart(store, cart_items, memo)
+        if not cart.items:
+            logger.warning("estimate_price_many: no valid items in cart %d: %s", index, cart_items)
+            cart_rows.append({"error": "No valid items with prices", "invalidItems": cart.invalid_items})
+            continue
+        row: Dict[str, Any] = {"items": cart.items}
+        if cart.invalid_items:
+            row["invalidItems"] = cart.invalid_items
+        cart_rows.append(row)
+
+        # Price and ETA depend only on the region: quote each distinct one once.
+        by_region: Dict[str, Dict[str, Any]] = {}
+        for city, country, rates in targets:
+            if isinstance(rates, str):
+                quotes.append({"cart": index, "destinationCity": city, "destinationCountry": country, "error": rates})
+                continue
+            if rates.name not in by_region:
+                by_region[rates.name] = quote(cart, rates)
+            quotes.append({"cart": index, "destinationCity": city, "destinationCountry": country, **by_region[rates.name]})
+    return {"carts": cart_rows, "quotes": quotes}
@@ -0,0 +1,96 @@
+from typing import Any, Dict, List
+
+from ._shared import get_backend, log_tool_call, cached_tool
+from ._shaping import compact_enabled, decode_cursor, page, page_limit, project, shape_variants
+
+
+@log_tool_call
+@cached_tool("catalog")
+def filter_products(
+    *,
+    category: str | None = None,
+    tags: List[str] | None = None,
+    attributes: Dict[str, str] | None = None,
+    min_price_cents: int | None = None,
+    max_price_cents: int | None = None,
+    specs: Dict[str, Any] | None = None,
+    limit: int = 10,
+    fields: List[str] | None = None,
+    variants: str | None = None,
+    cursor: str | None = None,
+) -> Dict[str, Any]:
+    """Filter products by category, tags, variant attributes, price and specs, with facet counts.
+
+    Every given filter must match. Attribute and price filters must hold for the same
+    variant (e.g. a Black variant under the price limit).
+
+    Args:
+        category: Optional category name.
+        tags: Optional tags the product must all have (e.g. ["wireless"]).
+        attributes: Optional variant attributes (e.g. {"color": "Black"}).
+        min_price_cents: Optional minimum variant list price in cents.
+        max_price_cents: Optional maximum variant list price in cents.
+        specs: Optional spec filters: exact values (e.g. {"anc": true, "panel": "OLED"}; list specs
+            match any element) or numeric ranges (e.g. {"batteryLifeHours": {"min": 30}}).
+        limit: Maximum number of products to return.
+        fields: Optional product fields to return (e.g. ["name", "variantSummary"]); id is always included.
+        variants: "summary" (count, price range, options; the default), "full" (every SKU), or "none".
+            Only variants matching the attribute and price filters are included.
+        cursor: nextCursor from a previous call with the same filters, to get the next page.
+
+    Returns:
+        {"results": [...], "total": int, "hasMore": bool, "nextCursor"?: str, "facets"?: {...}}:
+        matching product summaries in catalog order; total counts every match. The first page
+        also has facets: for category, tag, attr.<name>, spec.<name> and price (USD buckets),
+        the number of matching products per value (top values only).
+    """
+    filters = {
+        "category": category,
+        "tags": tags,
+        "attributes": attributes,
+        "min_price_cents": min_price_cents,
+        "max_price_cents": max_price_cents,
+        "specs": specs,
+    }
+    after = decode_cursor(cursor, "filter_products", **filters)["after"] if cursor else None
+    limit = page_limit(limit)
+    mode = variants or ("summary" if compact_enabled() else "full")
+    store = get_backend()
+    index = store.facets()
+    try:
+        result = index.query(
+            category=category,
+            tags=tags or (),
+            attributes=attributes,
+            specs=specs,
+            min_price=min_price_cents,
+            max_price=max_price_cents,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    after_pos = -1
+    if after:
+        after_pos = after["key"][-1]
+        if after.get("version") != index.version:
+            # The catalog was reloaded: resume after the same product if it still exists.
+            after_pos = index.position.get(after["id"], after_pos)
+
+    rows = []
+    for pos in result.page(after_pos, limit + 1):
+        p = store.product(index.ids[pos])
+        if p is None:
+            continue
+        skus = set(index.matching_skus(pos, result.variant_bits))
+        summary = {
+            "id": p.get("id"),
+            "name": p.get("name"),
+            "category": p.get("category"),
+            "shortDescription": p.get("shortDescription"),
+            "tags": p.get("tags", []),
+            **shape_variants([v for v in p.get("variants", []) if v.get("sku") in skus], mode),
+        }
+        rows.append((project(summary, fields), {"id": p.get("id"), "key": [pos], "version": index.version}))
+    out = page("filter_products", rows, limit=limit, total=result.total, **filters)
+    if not after:
+        out["facets"] = result.counts
+    return out
@@ -1,16 +1,11 @@
-import json
-import os
 from typing import Any, Dict, Optional
 
-from ._shared import ROOT, log_tool_call
-
-
-ORDERS_PATH = os.path.join(ROOT, "data", "orders", "orders.json")
+from ._shared import get_backend, log_tool_call
 
 
 @log_tool_call
 def get_order_status(order_id: str) -> Optional[Dict[str, Any]]:
-    """Look up an order status by id from the local JSON store.
+    """Look up an order status by id from the local order journal.
 
     Args:
         order_id: Short order id string.
@@ -18,13 +13,7 @@ def get_order_status(order_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dict with orderId, status, and createdAt; or None if not found.
     """
-    if not os.path.exists(ORDERS_PATH):
+    row = get_backend().get_order(order_id)
+    if row is None:
         return None
-    with open(ORDERS_PATH, "r", encoding="utf-8") as f:
-        rows = json.load(f)
-    for row in rows:
-        if row.get("orderId") == order_id:
-            return {"orderId": order_id, "status": row.get("status"), "createdAt": row.get("createdAt")}
-    return None
-
-
+    return {"orderId": order_id, "status": row.get("status"), "createdAt": row.get("createdAt")}
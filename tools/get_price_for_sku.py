@@ -1,9 +1,10 @@
 from typing import Dict, Optional
 
-from ._shared import load_catalog, find_price_for_sku, log_tool_call
+from ._shared import get_backend, find_price_for_sku, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("catalog")
 def get_price_for_sku(sku: str) -> Optional[Dict[str, object]]:
     """Return price and currency information for a SKU, if found.
 
@@ -13,7 +14,6 @@ def get_price_for_sku(sku: str) -> Optional[Dict[str, object]]:
     Returns:
         Dict with unitPriceCents and currency if found, else None.
     """
-    products = load_catalog()
-    return find_price_for_sku(products, sku)
+    return find_price_for_sku(get_backend(), sku)
 
 
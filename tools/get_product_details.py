@@ -1,22 +1,31 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from ._shared import load_catalog, _find_product_by_id, log_tool_call
+from ._shared import get_backend, _find_product_by_id, log_tool_call, cached_tool
+from ._shaping import compact_enabled, compact_variants, project
 
 
 @log_tool_call
-def get_product_details(product_id: str) -> Optional[Dict[str, Any]]:
+@cached_tool("catalog")
+def get_product_details(product_id: str, *, fields: List[str] | None = None) -> Optional[Dict[str, Any]]:
     """Return full product details by product id.
 
     Args:
         product_id: The canonical id of the product.
+        fields: Optional fields to return (e.g. ["name", "specs.weightGrams", "variants"]);
+            id is always included.
 
     Returns:
-        The product object from the catalog, or None if not found.
+        The product object from the catalog, or None if not found. When every
+        variant has the same currency it is given once as `currency`.
     """
-    products = load_catalog()
-    product = _find_product_by_id(products, product_id)
+    product = _find_product_by_id(get_backend(), product_id)
     if not product:
         return None
-    return product
-
-
+    if not compact_enabled():
+        return project(product, fields)
+    variants, currency = compact_variants(product.get("variants", []))
+    details = {k: v for k, v in product.items() if k != "variants" and v not in (None, "", [], {})}
+    details["variants"] = variants
+    if currency is not None:
+        details["currency"] = currency
+    return project(details, fields)
@@ -1,13 +1,12 @@
 from typing import List
 
-from ._shared import load_catalog, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("catalog")
 def list_categories() -> List[str]:
     """Return the set of distinct product categories in the catalog."""
-    products = load_catalog()
-    cats = sorted({(p.get("category") or "").strip() for p in products if p.get("category")})
-    return cats
+    return get_backend().categories()
 
 
@@ -1,28 +1,34 @@
 from typing import Any, Dict, List
 
-from ._shared import load_catalog, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
+from ._shaping import decode_cursor, page, page_limit, project
 
 
 @log_tool_call
-def list_products(*, limit: int = 20) -> List[Dict[str, Any]]:
+@cached_tool("catalog")
+def list_products(*, limit: int = 20, fields: List[str] | None = None, cursor: str | None = None) -> Dict[str, Any]:
     """List a compact set of product summaries for browsing.
 
     Args:
         limit: Maximum number of products to return.
+        fields: Optional product fields to return (e.g. ["name", "category"]); id is always included.
+        cursor: nextCursor from a previous call, to get the next page.
 
     Returns:
-        A list of products with id, name, category, shortDescription, and tags.
+        {"results": [...], "total": int, "hasMore": bool, "nextCursor"?: str}: products with
+        id, name, category, shortDescription, and tags; total counts the whole catalog.
     """
-    products = load_catalog()
-    results: List[Dict[str, Any]] = []
-    for p in products[:limit]:
-        results.append({
+    after = decode_cursor(cursor, "list_products")["after"] if cursor else None
+    limit = page_limit(limit)
+    store = get_backend()
+    version = store.catalog_version()
+    rows = []
+    for key, p in store.page_products(after=after, limit=limit + 1):
+        rows.append((project({
             "id": p.get("id"),
             "name": p.get("name"),
             "category": p.get("category"),
             "shortDescription": p.get("shortDescription"),
             "tags": p.get("tags", []),
-        })
-    return results
-
-
+        }, fields), {"id": p.get("id"), "key": key, "version": version}))
+    return page("list_products", rows, limit=limit, total=store.count_products())
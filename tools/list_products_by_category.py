@@ -1,32 +1,39 @@
 from typing import Any, Dict, List
 
-from ._shared import load_catalog, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
+from ._shaping import decode_cursor, page, page_limit, project
 
 
 @log_tool_call
-def list_products_by_category(category: str, *, limit: int = 20) -> List[Dict[str, Any]]:
+@cached_tool("catalog")
+def list_products_by_category(
+    category: str, *, limit: int = 20, fields: List[str] | None = None, cursor: str | None = None
+) -> Dict[str, Any]:
     """List products within a specific category.
 
     Args:
         category: Category name to filter by.
         limit: Maximum number of products to return.
+        fields: Optional product fields to return (e.g. ["name"]); id is always included.
+        cursor: nextCursor from a previous call with the same category, to get the next page.
 
     Returns:
-        A list of product summaries within the category.
+        {"results": [...], "total": int, "hasMore": bool, "nextCursor"?: str}: product
+        summaries within the category; total counts the whole category.
     """
-    products = load_catalog()
-    results: List[Dict[str, Any]] = []
-    for p in products:
-        if (p.get("category") or "").strip().lower() == (category or "").strip().lower():
-            results.append({
-                "id": p.get("id"),
-                "name": p.get("name"),
-                "category": p.get("category"),
-                "shortDescription": p.get("shortDescription"),
-                "tags": p.get("tags", []),
-            })
-            if len(results) >= limit:
-                break
-    return results
-
-
+    after = decode_cursor(cursor, "list_products_by_category", category=category)["after"] if cursor else None
+    limit = page_limit(limit)
+    store = get_backend()
+    version = store.catalog_version()
+    rows = []
+    for key, p in store.page_products(category=category or "", after=after, limit=limit + 1):
+        rows.append((project({
+            "id": p.get("id"),
+            "name": p.get("name"),
+            "category": p.get("category"),
+            "shortDescription": p.get("shortDescription"),
+            "tags": p.get("tags", []),
+        }, fields), {"id": p.get("id"), "key": key, "version": version}))
+    return page(
+        "list_products_by_category", rows, limit=limit, total=store.count_products(category or ""), category=category
+    )
@@ -1,12 +1,12 @@
 from typing import Dict
 
-from ._shared import load_catalog, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("catalog")
 def list_products_count() -> Dict[str, int]:
     """Return the total number of products in the catalog."""
-    products = load_catalog()
-    return {"count": len(products)}
+    return {"count": get_backend().count_products()}
 
 
@@ -1,18 +1,38 @@
-from typing import Dict, List
+from typing import Any, Dict
 
-from ._shared import list_supported_destinations as _list, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
+from ._shaping import decode_cursor, page, page_limit
 
 
 @log_tool_call
-def list_supported_destinations(limit: int = 20) -> List[Dict[str, str]]:
-    """Return example supported destinations for shipping/pricing logic.
+@cached_tool("destinations")
+def list_supported_destinations(
+    limit: int = 20, *, country: str | None = None, cursor: str | None = None
+) -> Dict[str, Any]:
+    """Return supported destinations for shipping/pricing logic.
 
     Args:
         limit: Maximum number of destinations to return.
+        country: Optional country code or name to list only its cities.
+        cursor: nextCursor from a previous call with the same country, to get the next page.
 
     Returns:
-        A list of {city, country} objects.
+        {"results": [...], "total": int, "hasMore": bool, "nextCursor"?: str}: {city, country}
+        objects in a stable order; total counts every supported destination (in the country).
     """
-    return _list(limit=limit)
-
-
+    after = decode_cursor(cursor, "list_supported_destinations", country=country)["after"] if cursor else None
+    limit = page_limit(limit)
+    table = get_backend().destinations()
+    after_index = -1
+    if after:
+        after_index = after["key"][-1]
+        if after.get("version") != table.version:
+            # The file changed: resume after the same city if it is still listed.
+            hit = table.resolve(after["id"]["city"], after["id"]["country"])
+            if hit is not None and hit[1] == "exact":
+                after_index = hit[0]
+    rows = [
+        (dict(table.destinations[i]), {"id": table.destinations[i], "key": [i], "version": table.version})
+        for i in table.page(country=country, after=after_index, limit=limit + 1)
+    ]
+    return page("list_supported_destinations", rows, limit=limit, total=table.count(country), country=country)
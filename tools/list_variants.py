@@ -1,9 +1,10 @@
 from typing import Any, Dict, List
 
-from ._shared import _find_product_by_id, load_catalog, log_tool_call
+from ._shared import _find_product_by_id, get_backend, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("catalog")
 def list_variants(product_id: str) -> List[Dict[str, Any]]:
     """List variant SKUs and attributes for a product.
 
@@ -13,8 +14,7 @@ def list_variants(product_id: str) -> List[Dict[str, Any]]:
     Returns:
         A list of variants with sku, attributes, listPrice, and currency.
     """
-    products = load_catalog()
-    product = _find_product_by_id(products, product_id)
+    product = _find_product_by_id(get_backend(), product_id)
     if not product:
         return []
     out: List[Dict[str, Any]] = []
@@ -0,0 +1,22 @@
+import os
+from typing import Any, Dict
+
+from ._shared import get_backend, log_tool_call
+
+
+RESERVATION_TTL_S = int(os.getenv("SHOPTALK_RESERVATION_TTL_S", "900"))
+
+
+@log_tool_call
+def reserve_stock(items: list[dict]) -> Dict[str, Any]:
+    """Hold stock for cart items while the user confirms the order.
+
+    Args:
+        items: Cart items with sku and quantity.
+
+    Returns:
+        On success, a dict with reservationId, expiresAt, and the held items; pass
+        reservationId to create_order. Reservations expire automatically.
+        On failure, a dict with error and shortages (sku, requested, available).
+    """
+    return get_backend().reserve_stock(items or [], ttl_seconds=RESERVATION_TTL_S)
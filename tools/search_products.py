@@ -1,49 +1,54 @@
 from typing import Any, Dict, List
 
-from ._shared import load_catalog, log_tool_call
-
-
-def _matches(product: Dict[str, Any], query: str, tags: List[str]) -> bool:
-    q = query.lower().strip()
-    hay = " ".join([
-        product.get("name", ""),
-        product.get("category", ""),
-        product.get("shortDescription", ""),
-        " ".join(tags),
-    ]).lower()
-    return all(part in hay for part in q.split())
+from ._shared import get_backend, log_tool_call, cached_tool
+from ._shaping import compact_enabled, decode_cursor, page, page_limit, project, shape_variants
 
 
 @log_tool_call
-def search_products(query: str, *, category: str | None = None, limit: int = 10) -> List[Dict[str, Any]]:
+@cached_tool("catalog")
+def search_products(
+    query: str,
+    *,
+    category: str | None = None,
+    limit: int = 10,
+    fields: List[str] | None = None,
+    variants: str | None = None,
+    cursor: str | None = None,
+) -> Dict[str, Any]:
     """Search products by free-text query, optionally filtered by category.
 
     Args:
         query: Free-text search string; matches name, category, description, and tags.
         category: Optional category name to restrict results.
         limit: Maximum number of products to return.
+        fields: Optional product fields to return (e.g. ["name", "variantSummary"]); id is always included.
+        variants: "summary" (count, price range, options; the default), "full" (every SKU), or "none".
+        cursor: nextCursor from a previous call with the same query and category, to get the next results.
 
     Returns:
-        A list of product summaries including id, name, category, shortDescription,
-        tags, and basic variant info.
+        {"results": [...], "total": int, "hasMore": bool, "nextCursor"?: str}: product summaries
+        including id, name, category, shortDescription, tags, and variant info, best matches
+        first; total counts every match.
     """
-    products = load_catalog()
-    results: List[Dict[str, Any]] = []
-    for p in products:
-        if category and p.get("category") != category:
-            continue
-        tags = p.get("tags", [])
-        if _matches(p, query, tags):
-            results.append({
-                "id": p.get("id"),
-                "name": p.get("name"),
-                "category": p.get("category"),
-                "shortDescription": p.get("shortDescription"),
-                "tags": tags,
-                "variants": [{"sku": v.get("sku"), "attributes": v.get("attributes"), "listPrice": v.get("listPrice"), "currency": v.get("currency")} for v in p.get("variants", [])],
-            })
-            if len(results) >= limit:
-                break
-    return results
-
-
+    state = decode_cursor(cursor, "search_products", query=query, category=category) if cursor else {}
+    limit = page_limit(limit)
+    after = state.get("after")
+    mode = variants or ("summary" if compact_enabled() else "full")
+    store = get_backend()
+    version = store.catalog_version()
+    rows = []
+    for key, p in store.search_page(query or "", category=category, after=after, limit=limit + 1):
+        summary = {
+            "id": p.get("id"),
+            "name": p.get("name"),
+            "category": p.get("category"),
+            "shortDescription": p.get("shortDescription"),
+            "tags": p.get("tags", []),
+            **shape_variants(p.get("variants", []), mode),
+        }
+        rows.append((project(summary, fields), {"id": p.get("id"), "key": key, "version": version}))
+    # Counting every match costs as much as ranking them, so later pages reuse the first page's total.
+    total = state["total"] if after and after.get("version") == version and "total" in state else None
+    if total is None:
+        total = store.count_search(query or "", category=category)
+    return page("search_products", rows, limit=limit, total=total, query=query, category=category)
@@ -1,27 +1,37 @@
 from typing import Dict, Optional
 
-from ._shared import is_supported_destination, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("destinations")
 def validate_destination(city: Optional[str], country: Optional[str]) -> Dict[str, object]:
     """Validate whether a destination city/country is supported.
 
     Args:
-        city: Destination city name.
+        city: Destination city name; aliases (e.g., "NYC") and small typos are accepted.
         country: Destination country code or name.
 
     Returns:
-        Dict with keys: ok (bool), normalized (city/country), and optional hint string.
+        Dict with keys: ok (bool), normalized (canonical city/country), matchedBy ("exact",
+        "alias" or "fuzzy") and region when supported, and optional hint string.
     """
-    ok = is_supported_destination(city, country)
+    table = get_backend().destinations()
+    hit = table.resolve(city, country)
+    if hit is None:
+        return {
+            "ok": False,
+            "normalized": {
+                "city": (city or "").strip() if city else None,
+                "country": table.country(country),
+            },
+            "hint": "Use list_supported_destinations to see examples (e.g., New York, US)",
+        }
+    index, matched_by = hit
     return {
-        "ok": ok,
-        "normalized": {
-            "city": (city or "").strip() if city else None,
-            "country": (country or "").strip().upper() if country else None,
-        },
-        "hint": None if ok else "Use list_supported_destinations to see examples (e.g., New York, US)",
+        "ok": True,
+        "normalized": dict(table.destinations[index]),
+        "matchedBy": matched_by,
+        "region": table.region_of(index).name,
+        "hint": None,
     }
-
-
@@ -1,9 +1,10 @@
 from typing import Dict
 
-from ._shared import load_catalog, log_tool_call
+from ._shared import get_backend, log_tool_call, cached_tool
 
 
 @log_tool_call
+@cached_tool("catalog")
 def validate_sku(sku: str) -> Dict[str, object]:
     """Check whether a SKU exists in the catalog.
 
@@ -13,16 +14,8 @@ def validate_sku(sku: str) -> Dict[str, object]:
     Returns:
         Dict with ok (bool) and normalized sku.
     """
-    products = load_catalog()
     sku_norm = (sku or "").strip()
-    found = False
-    for p in products:
-        for v in p.get("variants", []):
-            if (v.get("sku") or "").strip() == sku_norm:
-                found = True
-                break
-        if found:
-            break
+    found = get_backend().variant(sku_norm) is not None
     return {"ok": found, "sku": sku_norm}
 
 